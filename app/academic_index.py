@@ -0,0 +1,69 @@
+"""
+學業成績門檻索引
+
+將「核心學業要求」標籤中的數值門檻（academic_metric 為 百分制 / GPA / 排名）依評估標準
+存成排序陣列。查詢時以 bisect 找出門檻高於學生成績的 group，供以 group 為單位運算的
+篩選引擎（matrix）直接排除，不需要逐筆掃描標籤。
+
+設計原則：
+1. 包容性過濾：group 沒有該評估標準的門檻，或學生未填寫該項成績 → 視為符合
+2. 百分制 / GPA：門檻 ≤ 學生成績才符合
+3. 排名：只索引百分比門檻（例如「前 30%」），學生排名百分比 ≤ 門檻才符合
+4. 以 group 為單位排除：門檻與類別條件必須由同一個 group 同時符合，
+   結果與 filters.check_academic_match 相同
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+from filters import HIGHER_IS_STRICTER, ACADEMIC_METRICS, extract_academic_thresholds, iter_match_groups
+
+
+class AcademicIndex:
+    """
+    各評估標準的排序門檻陣列
+
+    Attributes:
+        thresholds (Dict[str, List[float]]): 評估標準 → 遞增排序的門檻值
+        group_rows (Dict[str, List[int]]): 評估標準 → 與 thresholds 對應的 group 編號
+        group_scholarship (List[int]): group 編號 → 獎學金在語料中的位置
+    """
+
+    def __init__(self, scholarships: List[Dict]):
+        entries = {metric: [] for metric in ACADEMIC_METRICS}
+        self.group_scholarship = []
+        for idx, scholarship in enumerate(scholarships):
+            for group in iter_match_groups(scholarship):
+                row = len(self.group_scholarship)
+                self.group_scholarship.append(idx)
+                for metric, value in extract_academic_thresholds(group).items():
+                    entries[metric].append((value, row))
+
+        self.thresholds, self.group_rows = {}, {}
+        for metric, items in entries.items():
+            items.sort()
+            self.thresholds[metric] = [value for value, _ in items]
+            self.group_rows[metric] = [row for _, row in items]
+
+    def failing_groups(self, scores: Dict[str, Optional[float]]) -> set:
+        """
+        找出至少有一項門檻高於學生成績的 group
+
+        Args:
+            scores (Dict[str, Optional[float]]): 評估標準 → 學生成績（None 表示未填寫）
+
+        Returns:
+            set: 不符合的 group 編號
+        """
+        failing = set()
+        for metric, score in scores.items():
+            if score is None or metric not in self.thresholds:
+                continue
+            values, rows = self.thresholds[metric], self.group_rows[metric]
+            if metric in HIGHER_IS_STRICTER:
+                # 門檻 > 成績 的 group 不符合
+                failing.update(rows[bisect_right(values, score):])
+            else:
+                # 門檻 < 排名百分比 的 group 不符合
+                failing.update(rows[:bisect_left(values, score)])
+        return failing
@@ -1,23 +1,35 @@
 from collections import defaultdict
 import html
+import re
+import time
+import uuid
 import streamlit as st
-import pandas as pd
-from data_loader import load_scholarships
-from filters import check_scholarship_match, scholarship_amount_quota_filter, check_undetermined_amount
-from ui_components import extract_documents_from_group, extract_obligations_from_group, toggle_sort, get_sort_label, create_tooltip_html, render_requirements_grid
-from constants import FILTER_OPTIONS, EXCHANGE_RATES
-from utils import extract_numeric_info_from_tags, get_min_amount_and_quota, get_end_date, format_number
-
-st.set_page_config(
-    page_title="NTU Scholarship Finder",
-    layout="wide"
-)
+from data_loader import load_scholarships, load_corpus_version, load_static_text, load_corpus_manifest, get_partition_store, selection_cache_resource
+from filters import check_scholarship_match, scholarship_amount_quota_filter, check_undetermined_amount, filter_cache_key
+from ui_components import extract_documents_from_group, extract_obligations_from_group, toggle_sort, get_sort_label, create_tooltip_html, render_requirements_grid, extract_amounts_and_quotas, get_card_header, get_display_requirements, build_attachment_links_html, get_similar_scholarships, build_similar_link, build_search_snippet_html
+from selectivity import SelectivityStats
+from academic_index import AcademicIndex
+from ranking import build_sort_keys, page_indices
+from session_memory import SessionMemoryRegistry, session_state_footprint
+from query_log import QueryLogger
+from warm_cache import WarmCache, DEFAULT_CACHE_FILE
+from result_cache import ResultCache
+from url_state import restore_from_query_params, sync_query_params, apply_filters_to_widgets
+from card_html import build_scholarship_body_html
+from rejection_funnel import build_rejection_funnel
+from search_index import SearchIndex
+from corpus_partitions import locate_partition
+from render_stats import install_delta_counter
+from calendar_export import CalendarExporter
+from table_export import TableExporter, xlsx_available
+from profiles import ProfileStore, DEFAULT_DB_FILE as PROFILES_DB_FILE
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from constants import FILTER_OPTIONS, DEBUG_MODE, FILTER_ENGINE, QUERY_LOG_PATH, CARD_RENDER_MODE, SHARDED_MIN_CORPUS, SHARDED_WORKERS
+from utils import format_number
 
 def load_css(file_name):
-    with open(file_name, encoding='utf-8') as f:
-        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
-
-load_css("app/styles.css")
+    # 檔案內容只在 process 第一次使用時讀取，之後的 rerun 直接使用快取
+    st.markdown(f'<style>{load_static_text(file_name)}</style>', unsafe_allow_html=True)
 
 # ==================== Helper Functions ====================
 
@@ -39,6 +51,279 @@ load_css("app/styles.css")
 # --- 核心渲染函式 (負責分組與畫圖) ---
 # Moved to ui_components.py
 
+# 以下依語料分割區的選擇 (selection) 分別快取，預設檢視與未分割前使用同一份語料與索引；
+# 分割區被淘汰時，包含它的選擇一併從這些快取清除（見 data_loader.selection_cache_resource）
+
+# --- 篩選條件選擇率統計 (所有 session 共用) ---
+@selection_cache_resource()
+def get_selectivity_stats(selection):
+    return SelectivityStats.from_corpus(load_scholarships(selection))
+
+# --- SQLite 篩選引擎 (FILTER_ENGINE = "sqlite" 時使用) ---
+@selection_cache_resource()
+def get_sql_engine(selection):
+    # 選用引擎在第一次使用時才 import，不拖慢冷啟動
+    from sql_engine import SqliteFilterEngine
+    return SqliteFilterEngine.from_scholarships(load_scholarships(selection))
+
+# --- NumPy 矩陣篩選引擎 (FILTER_ENGINE = "matrix" 時使用) ---
+@selection_cache_resource()
+def get_matrix_engine(selection):
+    from matrix_engine import MatrixFilterEngine
+    return MatrixFilterEngine(load_scholarships(selection), get_search_index(selection), get_academic_index(selection))
+
+# --- 分片篩選引擎 (FILTER_ENGINE = "sharded" 且語料夠大時使用；快取淘汰時結束 worker process) ---
+@selection_cache_resource(on_release=lambda engine: engine.close())
+def get_sharded_engine(selection):
+    from sharded_engine import ShardedFilterEngine
+    return ShardedFilterEngine(load_scholarships(selection), SHARDED_WORKERS)
+
+# --- 關鍵字搜尋索引 (正規化的搜尋文字與查詢快取) ---
+@selection_cache_resource()
+def get_search_index(selection):
+    return SearchIndex(load_scholarships(selection))
+
+# --- 「最符合」排序的特徵欄位 (選擇該排序時才建立) ---
+@selection_cache_resource()
+def get_match_scorer(selection):
+    from match_score import MatchScorer
+    return MatchScorer(load_scholarships(selection))
+
+# --- 學業成績門檻索引 (matrix 引擎以 group 為單位排除未達門檻的 group) ---
+@selection_cache_resource()
+def get_academic_index(selection):
+    return AcademicIndex(load_scholarships(selection))
+
+# --- 預先計算的排序鍵 ---
+@selection_cache_resource()
+def get_sort_keys(selection):
+    return build_sort_keys(load_scholarships(selection))
+
+# --- Session 記憶體用量彙總 (所有 session 共用) ---
+@st.cache_resource
+def get_session_memory_registry():
+    return SessionMemoryRegistry()
+
+# --- 查詢紀錄 (QUERY_LOG_PATH 有設定時才啟用) ---
+@st.cache_resource
+def get_query_logger():
+    return QueryLogger(QUERY_LOG_PATH)
+
+# --- 熱門篩選組合預熱快取 (語料版本不符時為空) ---
+@selection_cache_resource()
+def get_warm_cache(selection):
+    return WarmCache.load(DEFAULT_CACHE_FILE, load_corpus_version(selection))
+
+# --- 跨 session 共用的篩選結果快取 ---
+@st.cache_resource
+def get_result_cache():
+    return ResultCache()
+
+# --- 申請期間行事曆匯出 (依結果集合快取 ICS 檔案) ---
+@selection_cache_resource()
+def get_calendar_exporter(selection):
+    return CalendarExporter(load_scholarships(selection))
+
+# --- 結果表格匯出 (CSV / XLSX) ---
+@selection_cache_resource()
+def get_table_exporter(selection):
+    return TableExporter(load_scholarships(selection))
+
+# --- 獎學金 ID → 資料 (相似獎學金與設定檔通知共用) ---
+@selection_cache_resource()
+def get_scholarships_by_id(selection):
+    return {str(s.get('id')): s for s in load_scholarships(selection)}
+
+# --- 已儲存的設定檔 ---
+@st.cache_resource
+def get_profile_store():
+    return ProfileStore(PROFILES_DB_FILE)
+
+# --- 設定檔與預設檢視的語料同步 (語料版本變動時重新同步，產生「新符合」) ---
+@st.cache_resource(max_entries=1)
+def sync_profile_store(corpus_version):
+    return get_profile_store().sync_corpus(load_scholarships())
+
+# --- 設定檔擁有者 (每個瀏覽器一個隨機代碼，存在 cookie；設定檔只對建立它的瀏覽器顯示) ---
+PROFILE_OWNER_COOKIE = "scholarship_finder_owner"
+
+def get_profile_owner():
+    owner = st.context.cookies.get(PROFILE_OWNER_COOKIE)
+    if not isinstance(owner, str) or not re.fullmatch(r"[0-9a-f]{32}", owner):
+        # 第一次使用：本 session 先以新代碼為準，並由瀏覽器寫入 cookie，下次開啟時沿用
+        owner = st.session_state.setdefault("profile_owner", uuid.uuid4().hex)
+        st.html(
+            f"<script>document.cookie = '{PROFILE_OWNER_COOKIE}={owner}; max-age=31536000; path=/; SameSite=Lax';</script>",
+            unsafe_allow_javascript=True,
+        )
+    return owner
+
+# --- 獎學金卡片內容 (只在卡片展開時建立) ---
+def render_scholarship_body(scholarship, similar=None):
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.markdown(f"**申請期間：** {scholarship.get('start_date', 'N/A')} ~ {scholarship.get('end_date', 'N/A')}")
+        # 金額與名額（同時掃描 Groups 與 Common Tags），格式為 [(數值, 原始文字), ...]
+        amounts, quotas = extract_amounts_and_quotas(scholarship)
+
+        # === 輔助函式：用來生成帶有 Tooltip 的 HTML ===
+        # create_tooltip_html moved to ui_components.py
+
+        # 3. 顯示金額 (取最小值 ~ 最大值)
+        if amounts:
+            # 解開 Tuple: nums 是數字列表, texts 是文字列表
+            nums = [a[0] for a in amounts]
+            texts = [a[1] for a in amounts]
+
+            min_amt = int(min(nums))
+            max_amt = int(max(nums))
+
+            if min_amt == max_amt:
+                display_str = f"{min_amt:,} 元"
+            else:
+                display_str = f"{min_amt:,} ~ {max_amt:,} 元"
+
+            # 生成 Tooltip
+            html_out = create_tooltip_html(display_str, texts)
+            st.markdown(f"**獎助金額：** {html_out}", unsafe_allow_html=True)
+        else:
+            st.markdown("**獎助金額：** 未定/詳見公告", unsafe_allow_html=True)
+
+        # 4. 顯示名額
+        # 【新增過濾邏輯】剔除 0 的數值，避免 AI 分析錯誤顯示 "0 名"
+        valid_items = [q for q in quotas if q[0] > 0]
+        if valid_items:
+            nums = [q[0] for q in valid_items]
+            texts = [q[1] for q in valid_items]
+
+            min_q = int(min(nums))
+            max_q = int(max(nums))
+
+            if min_q == max_q:
+                display_str = f"{min_q} 名"
+            else:
+                display_str = f"{min_q} ~ {max_q} 名"
+
+            html_out = create_tooltip_html(display_str, texts)
+            st.markdown(f"**獎助名額：** {html_out}", unsafe_allow_html=True)
+        else:
+            st.markdown("**獎助名額：** 未定/詳見公告", unsafe_allow_html=True)
+    with col2:
+        url = scholarship.get('url', '')
+        if url:
+            st.markdown(f"**[官方公告]({url})**")
+        app_loc = scholarship.get('application_location', None)
+        if app_loc:
+            st.markdown(f"**申請地點：** {app_loc}")
+        attachments = scholarship.get('attachments', None)
+        if attachments:
+            # 解析多個檔案，並列顯示
+            att_html = build_attachment_links_html(attachments)
+            st.markdown(f"**附加檔案：** {att_html}", unsafe_allow_html=True)
+
+    # st.divider() # 分隔線
+    st.markdown("<hr style='border:1px solid #D9B91A; margin:20px 0;'>", unsafe_allow_html=True)
+
+    # ==================== 顯示資格條件 (Requirements Rendering) ====================
+    groups = scholarship.get("tags", {}).get("groups", [])
+    common_tags = scholarship.get("tags", {}).get("common_tags", [])
+
+    # 特殊處理：如果只有一個組別且沒有共同條件，將該組別視為共同條件顯示
+    # 這樣可以避免出現「子組別適用」只有一個「通用組別」的奇怪顯示
+    if len(groups) == 1 and not common_tags:
+        common_tags = groups[0].get("requirements", [])
+        groups = [] # 清空 groups，這樣就不會重複顯示在下方
+
+    # ==================== 1. 處理共同適用條件 ====================
+    if common_tags:
+        st.markdown("""
+            <h3 style='margin-bottom:25px; color:#594C3B;'>共同適用</h3>
+        """, unsafe_allow_html=True)
+        # 過濾不需要顯示的 tags，並補上 AI 提取的金額與名額
+        requirements = get_display_requirements(common_tags, scholarship.get("tags", {}))
+
+        # 【修改點】直接呼叫函式渲染，取代原本冗長的 for loop
+        if requirements:
+            render_requirements_grid(requirements)
+        else:
+            st.info("無硬性條件")
+
+        st.markdown("")
+
+    st.markdown("<hr style='border:1px solid #D9B91A; margin:20px 0;'>", unsafe_allow_html=True)
+
+    # ==================== 2. 處理各組別 ====================
+    if groups:
+        st.markdown("""
+            <h3 style='margin-bottom:25px; color:#594C3B;'>子組別適用</h3>
+        """, unsafe_allow_html=True)
+
+        for group in groups:
+            group_name = group.get("group_name", "未命名組別")
+            st.markdown(f"""
+                <h4 style='margin-bottom:18px; color:#594C3B; font-size:1.2rem; font-weight:600; background:#FFF3D1; border-radius:8px; padding:6px 18px 6px 12px; display:inline-block;'>{group_name}</h4>
+            """, unsafe_allow_html=True)
+
+            # 同樣過濾並補上 AI 提取的金額與名額
+            requirements = get_display_requirements(group.get("requirements", []), {"groups": [group]})
+
+            # 【修改點】直接呼叫函式渲染
+            if requirements:
+                render_requirements_grid(requirements)
+            else:
+                st.info("此組別無特定資格要求（或僅有應繳文件/義務）")
+
+            st.markdown("---")
+
+    # ==================== 3. 表格與文件清單 (這部分保持不變) ====================
+    # (Legacy table rendering removed)
+
+    st.markdown("#### 領獎後義務")
+
+    pseudo_group = {"requirements": common_tags}
+    obligations = extract_obligations_from_group(pseudo_group)
+    if obligations:
+        st.markdown("**共同適用**")
+        for obl in obligations:
+            st.warning(obl)
+    for group in groups:
+        group_name = group.get("group_name", "未命名組別")
+        obligations = extract_obligations_from_group(group)
+        if obligations:
+            st.markdown(f"**{group_name}**")
+            for obl in obligations:
+                st.warning(obl)
+    st.markdown("")
+    st.markdown("#### 應繳文件清單")
+    docs = extract_documents_from_group(pseudo_group)
+    if docs:
+        st.markdown("**共同適用**")
+        for doc in docs:
+            st.markdown(f"- {doc}")
+    for group in groups:
+        group_name = group.get("group_name", "未命名組別")
+        docs = extract_documents_from_group(group)
+        if docs:
+            st.markdown(f"**{group_name}**")
+            for doc in docs:
+                st.markdown(f"- {doc}")
+    st.markdown("")
+    if similar:
+        st.markdown("#### 相似獎學金")
+        for neighbour in similar:
+            st.markdown(f"- [{get_card_header(neighbour)}]({build_similar_link(neighbour)})")
+    st.markdown("")
+    s_id = scholarship.get('id')
+    s_name = scholarship.get('scholarship_name', '')
+    mailto_link = (
+        f"mailto:b12305054@ntu.edu.tw?subject=[錯誤回報] ID: {s_id} - {s_name}"
+        f"&body=請描述您發現的錯誤：%0D%0A%0D%0A"
+        f"獎學金 ID: {s_id}%0D%0A"
+        f"獎學金名稱: {s_name}%0D%0A"
+        f"問題描述: "
+    )
+    st.link_button("回報錯誤", mailto_link)
+
 # ==================== Streamlit App ====================
 @st.dialog("歡迎使用 NTU Scholarship Finder 👋")
 def show_welcome_dialog():
@@ -69,6 +354,18 @@ def show_welcome_dialog():
         st.rerun()
 
 def main():
+    # 頁面設定與 CSS 放在 main() 內：streamlit run 以 __file__ 指向本檔的假 __main__ 模組執行本檔，
+    # 分片引擎的 spawn worker 因此會以 __mp_main__ 重新執行本檔的模組層級程式碼（main() 不會執行），
+    # 模組層級不能有 Streamlit 的副作用
+    st.set_page_config(
+        page_title="NTU Scholarship Finder",
+        layout="wide"
+    )
+    load_css("app/styles.css")
+
+    # 除錯模式下統計本次 rerun 送往瀏覽器的元素數
+    delta_counter = install_delta_counter() if DEBUG_MODE else None
+
     if 'has_seen_welcome' not in st.session_state:
         show_welcome_dialog()
 
@@ -91,11 +388,34 @@ def main():
             資料來源：<a href='https://advisory.ntu.edu.tw/CMS/Scholarship?pageId=232' target='_blank' class='source-link'>臺大獎學金公告一覽表</a>｜資料爬取時間：2025/11/8｜目前尚無即時更新獎學金資料功能
         </p>
     """, unsafe_allow_html=True)
-    scholarships = load_scholarships()
+    # 開啟分享連結時，以網址參數還原篩選條件、資料範圍、排序與頁碼
+    manifest = load_corpus_manifest()
+    restore_from_query_params(manifest.partitions)
+    # 資料範圍：manifest 有多個分割區（學年度 / 學校）時才顯示，未選擇時使用預設檢視
+    if len(manifest.partitions) > 1:
+        st.session_state.setdefault("corpus_partitions", list(manifest.default_selection))
+        chosen_partitions = st.sidebar.multiselect(
+            "資料範圍",
+            options=list(manifest.partitions),
+            format_func=manifest.label,
+            help="加選過去的學年度可查詢歷年的獎學金；第一次選擇時需要載入資料",
+            key="corpus_partitions",
+        )
+    else:
+        chosen_partitions = None
+    selection = manifest.normalize_selection(chosen_partitions)
+    # 分享連結與設定檔只記錄預設檢視以外的資料範圍
+    shared_partitions = selection if selection != manifest.default_selection else ()
+    scholarships = load_scholarships(selection)
     st.sidebar.header("篩選條件")
     filters = {}
-    filters["keyword"] = st.sidebar.text_input("關鍵字搜尋", placeholder="輸入欲查詢之關鍵字", key="sidebar_keyword")
-    filters["exclude_undetermined_amount"] = st.sidebar.checkbox("排除「金額未定」", value=False)
+    filters["keyword"] = st.sidebar.text_input(
+        "關鍵字搜尋",
+        placeholder="輸入欲查詢之關鍵字",
+        help="不分繁簡體與異體字（例如 台/臺）；4 個字以上的關鍵字可容許少量錯字",
+        key="sidebar_keyword",
+    )
+    filters["exclude_undetermined_amount"] = st.sidebar.checkbox("排除「金額未定」", key="filter_exclude_undetermined")
     
     st.sidebar.markdown("### 學業資格")
     filters["學制"] = st.sidebar.multiselect(
@@ -111,23 +431,14 @@ def main():
         key="filter_grade"
     )
     
-    # 學籍狀態：前端顯示名稱映射
-    status_display_map = {
-        "不限/未明定": "不限/未明定",
-        "在學生": "在學生",
-        "延畢生": "延畢生",
-        "休學生": "休學擬復學",  # 前端顯示「休學擬復學」，但實際值是「休學生」
-        "其他": "其他"
-    }
-    status_reverse_map = {v: k for k, v in status_display_map.items()}  # 反向映射
-    
-    selected_status_display = st.sidebar.multiselect(
+    # 學籍狀態：前端顯示「休學擬復學」，但實際值是「休學生」（URL 與儲存的條件都使用實際值）
+    status_map = {"休學生": "休學擬復學"}
+    filters["學籍狀態"] = st.sidebar.multiselect(
         "學籍狀態",
-        options=[status_display_map[opt] for opt in FILTER_OPTIONS["學籍狀態"]],
+        options=FILTER_OPTIONS["學籍狀態"],
+        format_func=lambda x: status_map.get(x, x),
         key="filter_status"
     )
-    # 將前端選擇的顯示名稱轉換回後端的實際值
-    filters["學籍狀態"] = [status_reverse_map[s] for s in selected_status_display]
     
     filters["學院"] = st.sidebar.multiselect(
         "學院",
@@ -136,6 +447,13 @@ def main():
     )
     
 
+    st.sidebar.markdown("### 學業成績")
+    filters["學業成績"] = {
+        "GPA": st.sidebar.number_input("GPA", min_value=0.0, max_value=4.3, value=None, step=0.01, placeholder="例如 3.7", key="filter_gpa"),
+        "百分制": st.sidebar.number_input("學業平均（百分制）", min_value=0.0, max_value=100.0, value=None, step=0.1, placeholder="例如 82.5", key="filter_average"),
+        "排名": st.sidebar.number_input("排名百分比（前 %）", min_value=0.0, max_value=100.0, value=None, step=1.0, placeholder="例如 20", key="filter_rank"),
+    }
+
     st.sidebar.markdown("### 國籍與地區")
     filters["國籍身分"] = st.sidebar.multiselect(
         "國籍身分",
@@ -172,24 +490,84 @@ def main():
 
     st.sidebar.markdown("### 其他限制")
     filters["補助/獎學金排斥"] = st.sidebar.multiselect("補助/獎學金排斥", FILTER_OPTIONS["補助/獎學金排斥"], key="filter_exclusion")
+    st.sidebar.caption("🔗 目前的篩選條件、排序與頁碼都會寫入網址，複製網址即可分享")
 
     # ==================== Filter Logic ====================
     
     # check_undetermined_amount moved to filters.py
 
-    filtered_scholarships = [
-        s for s in scholarships
-        if check_scholarship_match(s, filters) and (not filters.get("exclude_undetermined_amount") or not check_undetermined_amount(s))
-    ]
+    filter_start = time.perf_counter()
+    # 熱門篩選組合直接使用建置時預先計算的結果；其他組合先查詢跨 session 共用的結果快取
+    warm_entry = get_warm_cache(selection).get(filters)
+    result_cache_key = (load_corpus_version(selection), filter_cache_key(filters))
+    if warm_entry is not None:
+        filtered_indices = warm_entry.indices
+    else:
+        filtered_indices = get_result_cache().get(result_cache_key)
+    cache_hit = warm_entry is not None or filtered_indices is not None
+
+    # 分片引擎只在語料夠大時使用，較小的語料走下方的 python 引擎
+    sharded = FILTER_ENGINE == "sharded" and len(scholarships) >= SHARDED_MIN_CORPUS
+    if not cache_hit:
+        if sharded:
+            filtered_indices = get_sharded_engine(selection).filter_indices(filters)
+        elif FILTER_ENGINE == "sqlite":
+            filtered_indices = get_sql_engine(selection).filter_indices(filters)
+        elif FILTER_ENGINE == "matrix":
+            filtered_indices = get_matrix_engine(selection).filter_indices(filters)
+        else:
+            # 依選擇率排列條件檢查順序，最容易淘汰的條件先檢查
+            selectivity_stats = get_selectivity_stats(selection)
+            plan = selectivity_stats.plan(filters)
+            # 關鍵字以預先正規化的搜尋索引比對，其他條件只需檢查相符的獎學金
+            candidates = get_search_index(selection).search(filters["keyword"]) if filters.get("keyword") else range(len(scholarships))
+            category_filters = {k: v for k, v in filters.items() if k != "keyword"}
+            filtered_indices = [
+                i for i in candidates
+                if check_scholarship_match(scholarships[i], category_filters, plan) and (not filters.get("exclude_undetermined_amount") or not check_undetermined_amount(scholarships[i]))
+            ]
+            selectivity_stats.commit(plan)
+
+        filtered_indices = get_result_cache().put(result_cache_key, filtered_indices)
+    filter_ms = (time.perf_counter() - filter_start) * 1000
+
+    if DEBUG_MODE:
+        with st.sidebar.expander("🔧 除錯資訊"):
+            st.markdown(f"**篩選引擎：** {FILTER_ENGINE}")
+            st.markdown(f"**資料範圍：** {'、'.join(manifest.label(pid) for pid in selection)}")
+            st.table([get_partition_store().stats()])
+            st.caption(f"預熱快取：{get_warm_cache(selection).status}（本次{'命中' if warm_entry is not None else '未命中'}）")
+            st.markdown("**共用結果快取**")
+            st.table([get_result_cache().stats()])
+            if cache_hit:
+                st.caption("使用快取的結果，未執行篩選引擎")
+            elif sharded:
+                engine = get_sharded_engine(selection)
+                st.caption(f"分片：{len(engine.shard_bounds)} 個 worker process，各 {engine.shard_bounds[0][1] - engine.shard_bounds[0][0]} 筆")
+            elif FILTER_ENGINE == "sqlite":
+                from sql_engine import build_query
+                sql, params = build_query(filters)
+                st.code(sql, language="sql")
+                st.caption(f"參數：{params}")
+            elif FILTER_ENGINE == "matrix":
+                engine = get_matrix_engine(selection)
+                st.caption(f"資格矩陣：{engine.included.shape[0]} groups × {engine.included.shape[1]} 欄位")
+            else:
+                st.markdown(f"**查詢計畫**（條件評估次數：{plan.total_evaluations}）")
+                if plan.categories:
+                    st.table(plan.describe())
+                else:
+                    st.caption("未選擇任何類別條件")
 
     # --- Custom Sort Buttons ---
     # ======= 結果數與排序按鈕同列 =======
-    sort_cols = st.columns([6,1,1,0.2])
+    sort_cols = st.columns([5,1,1,1,0.2])
     with sort_cols[0]:
         # 檢查使用者是否有選擇任何篩選條件
         has_filters = any([
             filters.get("keyword"),
             filters.get("exclude_undetermined_amount"),
+            any(v is not None for v in filters["學業成績"].values()),
             filters.get("學制"),
             filters.get("年級"),
             filters.get("學籍狀態"),
@@ -205,10 +583,10 @@ def main():
         
         if has_filters:
             # 使用者有選擇篩選條件
-            message = f"找到 <span style='font-weight:800'>{len(filtered_scholarships)}</span> 筆符合條件的獎學金"
+            message = f"找到 <span style='font-weight:800'>{len(filtered_indices)}</span> 筆符合條件的獎學金"
         else:
             # 使用者沒有選擇任何篩選條件
-            message = f"瀏覽全部獎學金（共 <span style='font-weight:800'>{len(filtered_scholarships)}</span> 筆）"
+            message = f"瀏覽全部獎學金（共 <span style='font-weight:800'>{len(filtered_indices)}</span> 筆）"
         
         st.markdown(
             f"""
@@ -233,28 +611,32 @@ def main():
         if st.button(get_sort_label("截止日期", 'end_date'), key='sort_enddate'):
             toggle_sort('end_date')
             st.rerun()
+    with sort_cols[3]:
+        if st.button(get_sort_label("最符合", 'match'), key='sort_match', help="明確針對所選條件（尤其是家庭境遇、經濟相關證明）的獎學金優先，並參考金額與截止急迫度"):
+            toggle_sort('match')
+            st.rerun()
 
-    # 排序邏輯
-    sort_by = st.session_state['sort_by']
-    sort_order = st.session_state['sort_order']
-    if sort_by == 'amount':
-        filtered_scholarships = sorted(
-            filtered_scholarships,
-            key=lambda s: get_min_amount_and_quota(s)[0] if get_min_amount_and_quota(s)[0] is not None else -1,
-            reverse=(sort_order == 'desc')
-        )
-    elif sort_by == 'quota':
-        filtered_scholarships = sorted(
-            filtered_scholarships,
-            key=lambda s: get_min_amount_and_quota(s)[1] if get_min_amount_and_quota(s)[1] is not None else -1,
-            reverse=(sort_order == 'desc')
-        )
-    elif sort_by == 'end_date':
-        filtered_scholarships = sorted(
-            filtered_scholarships,
-            key=lambda s: get_end_date(s) if get_end_date(s) is not None else (9999, 12, 31),
-            reverse=(sort_order == 'desc')
-        )
+    # ==================== 淘汰漏斗 (Why So Few Results) ====================
+    # 展開時才額外掃描一次語料，記錄每個條件淘汰了多少獎學金；同一組條件的結果保留在 session 中
+    if has_filters:
+        with st.expander(
+            "🔍 為什麼結果這麼少？",
+            expanded=not filtered_indices,
+            key="rejection_funnel_panel",
+            on_change="rerun",
+        ) as funnel_panel:
+            if funnel_panel.open:
+                cached_funnel = st.session_state.get('rejection_funnel')
+                if cached_funnel is None or cached_funnel[0] != result_cache_key:
+                    funnel = build_rejection_funnel(scholarships, filters)
+                    st.session_state['rejection_funnel'] = (result_cache_key, funnel)
+                else:
+                    funnel = cached_funnel[1]
+                st.table(funnel.describe(filters, include_timing=DEBUG_MODE))
+                bottleneck = funnel.bottleneck()
+                if bottleneck:
+                    hint = "，或加選「不限/未明定」、「未提及」納入沒有設限的獎學金" if bottleneck in funnel.categories else ""
+                    st.caption(f"淘汰最多的條件是「{bottleneck}」（{funnel.rejected[bottleneck]} 筆）。可以放寬這個條件{hint}。")
 
     # ==================== 分頁邏輯 (Logic) ====================
     PAGE_SIZE = 10
@@ -263,7 +645,7 @@ def main():
         st.session_state['current_page'] = 1
 
     # 2. 計算總頁數
-    total_pages = max(1, (len(filtered_scholarships) + PAGE_SIZE - 1) // PAGE_SIZE)
+    total_pages = max(1, (len(filtered_indices) + PAGE_SIZE - 1) // PAGE_SIZE)
 
     # 3. 防呆：如果篩選條件改變導致總頁數變少，重置回第1頁
     if st.session_state['current_page'] > total_pages:
@@ -274,8 +656,122 @@ def main():
     start_idx = (page - 1) * PAGE_SIZE
     end_idx = start_idx + PAGE_SIZE
 
-    # 5. 取得當前頁面的資料
-    page_scholarships = filtered_scholarships[start_idx:end_idx]
+    # 5. 取得當前頁面的資料（第一頁部分選取，其他頁面重用快取的完整排序）
+    # 排序快取以結果位置為鍵，切換資料範圍後位置的意義不同，需重新排序
+    if 'result_order_cache' not in st.session_state or st.session_state.get('result_order_selection') != selection:
+        st.session_state['result_order_cache'] = {}
+        st.session_state['result_order_selection'] = selection
+    # 已有完整順序時（預熱快取的熱門組合、「最符合」評分）直接切片，否則部分排序
+    full_order = warm_entry.order(st.session_state['sort_by'], st.session_state['sort_order'] == 'desc') if warm_entry is not None else None
+    if st.session_state['sort_by'] == 'match':
+        # 分數取決於篩選條件，以預先計算的特徵欄位向量化評分後整體排序
+        full_order = get_match_scorer(selection).order(filtered_indices, filters, st.session_state['sort_order'] == 'desc')
+    if full_order is not None:
+        page_positions = full_order[start_idx:end_idx].tolist()
+    else:
+        page_positions = page_indices(
+            filtered_indices,
+            get_sort_keys(selection),
+            st.session_state['sort_by'],
+            st.session_state['sort_order'] == 'desc',
+            start_idx,
+            end_idx,
+            st.session_state['result_order_cache'],
+        )
+    page_scholarships = [scholarships[i] for i in page_positions]
+
+    # ==================== 已儲存的設定檔 ====================
+    profile_store = get_profile_store()
+    sync_profile_store(load_corpus_version(manifest.default_selection))
+    with st.sidebar.expander("💾 我的設定檔"):
+        profile_owner = get_profile_owner()
+        profile_name = st.text_input("設定檔名稱", placeholder="例如：碩士 + 工學院", key="profile_name")
+        if st.button("儲存目前條件", key="save_profile", disabled=not profile_name):
+            profile_store.save_profile(profile_owner, profile_name, filters, [scholarships[i].get('id') for i in filtered_indices], shared_partitions)
+            st.toast(f"已儲存設定檔「{profile_name}」")
+
+        saved_profiles = {p['profile_id']: p for p in profile_store.list_profiles(profile_owner)}
+        if saved_profiles:
+            selected_profile = st.selectbox(
+                "已儲存的設定檔",
+                list(saved_profiles),
+                format_func=lambda pid: saved_profiles[pid]['name'] + (f"（🆕 {saved_profiles[pid]['new_matches']}）" if saved_profiles[pid]['new_matches'] else ""),
+                key="profile_selected",
+            )
+            st.button(
+                "載入條件",
+                key="load_profile",
+                on_click=apply_filters_to_widgets,
+                args=(saved_profiles[selected_profile]['filters'],),
+                kwargs={"reset": True, "partitions": saved_profiles[selected_profile]['partitions']},
+            )
+            if saved_profiles[selected_profile]['new_matches']:
+                # 設定檔的「新符合」以預設檢視（目前學年度）的語料計算
+                scholarships_by_id = get_scholarships_by_id(manifest.default_selection)
+                st.markdown("**🆕 新符合的獎學金**")
+                for sid in profile_store.new_matches(profile_owner, selected_profile):
+                    if sid in scholarships_by_id:
+                        st.markdown(f"- {scholarships_by_id[sid].get('scholarship_name', '未命名獎學金')}")
+                st.button("標記為已讀", key="mark_profile_seen", on_click=profile_store.mark_seen, args=(profile_owner, selected_profile))
+
+    # ==================== 匯出結果 ====================
+    # 點擊時才在背景產生檔案；行事曆依結果集合快取，表格依目前排序輸出
+    st.sidebar.markdown("### 匯出結果")
+    calendar_exporter = get_calendar_exporter(selection)
+    table_exporter = get_table_exporter(selection)
+    export_indices = filtered_indices
+    export_sort = (get_sort_keys(selection), st.session_state['sort_by'], st.session_state['sort_order'] == 'desc')
+
+    def export_order():
+        if full_order is not None:
+            return full_order
+        sort_keys, sort_by, descending = export_sort
+        return page_indices(export_indices, sort_keys, sort_by, descending, 0, len(export_indices), {})
+
+    st.sidebar.download_button(
+        "📅 申請期間行事曆 (.ics)",
+        data=lambda: calendar_exporter.export(result_cache_key, export_indices),
+        file_name="ntu_scholarships.ics",
+        mime="text/calendar",
+        on_click="ignore",
+        disabled=not filtered_indices,
+        key="export_ics",
+    )
+    st.sidebar.download_button(
+        "📄 結果列表 (.csv)",
+        data=lambda: table_exporter.export_csv(export_order()),
+        file_name="ntu_scholarships.csv",
+        mime="text/csv",
+        on_click="ignore",
+        disabled=not filtered_indices,
+        key="export_csv",
+    )
+    if xlsx_available():
+        st.sidebar.download_button(
+            "📊 結果列表 (.xlsx)",
+            data=lambda: table_exporter.export_xlsx(export_order()),
+            file_name="ntu_scholarships.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            on_click="ignore",
+            disabled=not filtered_indices,
+            key="export_xlsx",
+        )
+
+    # 目前狀態寫回網址，複製網址即可分享
+    sync_query_params(filters, st.session_state['sort_by'], st.session_state['sort_order'], page, shared_partitions)
+
+    if QUERY_LOG_PATH:
+        ctx = get_script_run_ctx()
+        get_query_logger().log(
+            ctx.session_id if ctx else None,
+            filters,
+            st.session_state['sort_by'],
+            st.session_state['sort_order'],
+            page,
+            FILTER_ENGINE,
+            len(filtered_indices),
+            filter_ms,
+        )
 
     if not page_scholarships:
         st.info("沒有找到符合條件的獎學金。請調整篩選條件。")
@@ -283,261 +779,38 @@ def main():
 
     # ==================== 顯示獎學金列表 (List Rendering) ====================
 
-    for idx, scholarship in enumerate(page_scholarships, start=start_idx + 1):
-        # ...existing code for scholarship card rendering...
-        with st.expander(f"{scholarship.get('scholarship_name', '未命名獎學金')}", expanded=(idx == start_idx + 1)):
-            col1, col2 = st.columns([2, 1])
-            with col1:
-                st.markdown(f"**申請期間：** {scholarship.get('start_date', 'N/A')} ~ {scholarship.get('end_date', 'N/A')}")
-                # ---------------------------------------------------------
-                # 修正後的金額與名額提取邏輯 (同時掃描 Groups 與 Common Tags)
-                # ---------------------------------------------------------
-                groups = scholarship.get("tags", {}).get("groups", [])
-                common_tags = scholarship.get("tags", {}).get("common_tags", [])
-                
-                amounts = [] # 格式將變為: [(5000, "清寒組每名五千"), (10000, "優秀組每名一萬")]                quotas = []
-                quotas = []  # 格式將變為: [(10, "每組十名"), (5, "特殊名額五名")]
-
-                # Debug: 顯示 scholarship ID 和 requirements 數量
-                # st.write(f"Debug: ID={scholarship.get('id')}, Groups={len(groups)}, Common={len(common_tags)}")
-
-                # 1. 建立一個包含所有 requirements 的大列表
-                all_requirements = []
-                # 加入通用條件
-                all_requirements.extend(common_tags)
-                # 加入所有組別的條件
-                for group in groups:
-                    all_requirements.extend(group.get("requirements", []))
-
-                # 2. 遍歷所有條件，提取數值
-                for req in all_requirements:
-                    cat = req.get("tag_category")
-                    raw_text = req.get("tag_value", "") # 取得原始文字
-                    
-                    # 必須使用安全取值 (or {}) 來防止 NoneType Error
-                    numerical_data = req.get("numerical") or {}
-                    num_val = numerical_data.get("num_value")
-                    unit = numerical_data.get("unit", "")
-
-                    # 如果 numerical 沒值，嘗試從 standardized_value 補救
-                    if num_val is None:
-                        std_val = req.get("standardized_value")
-                        if std_val and str(std_val).replace(",", "").replace(".", "").isdigit():
-                            try:
-                                num_val = float(str(std_val).replace(",", ""))
-                            except:
-                                pass
-
-                    # 提取成功，分類存入
-                    if num_val is not None:
-                        # 判斷金額
-                        if cat == "獎助金額":
-                            # 匯率換算
-                            if unit:
-                                unit_clean = unit.strip().upper()
-                                rate = EXCHANGE_RATES.get(unit_clean)
-                                if not rate:
-                                    for key, r in EXCHANGE_RATES.items():
-                                        if key in unit_clean:
-                                            rate = r
-                                            break
-                                if rate:
-                                    num_val = num_val * rate
-                            
-                            if float(num_val) > 0:
-                                amounts.append((float(num_val), raw_text))
-                        # 判斷名額
-                        elif cat == "獎助名額":
-                            quotas.append((int(float(num_val)), raw_text))
-
-                # === 輔助函式：用來生成帶有 Tooltip 的 HTML ===
-                # create_tooltip_html moved to ui_components.py
-
-                # 3. 顯示金額 (取最小值 ~ 最大值)
-                if amounts:
-                    # 解開 Tuple: nums 是數字列表, texts 是文字列表
-                    nums = [a[0] for a in amounts]
-                    texts = [a[1] for a in amounts]
-                    
-                    min_amt = int(min(nums))
-                    max_amt = int(max(nums))
-                    
-                    if min_amt == max_amt:
-                        display_str = f"{min_amt:,} 元"
-                    else:
-                        display_str = f"{min_amt:,} ~ {max_amt:,} 元"
-                    
-                    # 生成 Tooltip
-                    html_out = create_tooltip_html(display_str, texts)
-                    st.markdown(f"**獎助金額：** {html_out}", unsafe_allow_html=True)
+    # 有關鍵字時，摘要直接取搜尋索引記錄的相符位置（與篩選共用同一份快取的查詢結果）
+    keyword_postings = get_search_index(selection).postings(filters["keyword"]) if filters.get("keyword") else {}
+
+    # 選擇多個分割區時，卡片標題標示來源學年度，key 也加上分割區以免不同學年度的相同 ID 衝突
+    partition_offsets = get_partition_store().offsets(selection) if len(selection) > 1 else None
+
+    for idx, (position, scholarship) in enumerate(zip(page_positions, page_scholarships), start=start_idx + 1):
+        span = keyword_postings.get(position)
+        snippet_html = build_search_snippet_html(scholarship, span) if span else None
+        if snippet_html:
+            st.markdown(snippet_html, unsafe_allow_html=True)
+        card_header = get_card_header(scholarship)
+        card_key = f"card_{scholarship.get('id', idx)}"
+        if partition_offsets is not None:
+            partition_id = locate_partition(partition_offsets, selection, position)
+            card_header = f"[{manifest.label(partition_id)}] {card_header}"
+            card_key = f"card_{partition_id}_{scholarship.get('id', idx)}"
+        # 收合的卡片只顯示標題列（名稱、截止日期、金額、名額），展開時才建立完整內容
+        with st.expander(
+            card_header,
+            expanded=(idx == start_idx + 1),
+            key=card_key,
+            on_change="rerun",
+        ) as card:
+            if card.open:
+                # 相似獎學金已離線計算，這裡只依 ID 查表
+                similar = get_similar_scholarships(scholarship, get_scholarships_by_id(selection))
+                if CARD_RENDER_MODE == "html":
+                    # 整張卡片以單一 HTML 區塊送出
+                    st.markdown(build_scholarship_body_html(scholarship, similar), unsafe_allow_html=True)
                 else:
-                    st.markdown("**獎助金額：** 未定/詳見公告", unsafe_allow_html=True)
-                
-                # 4. 顯示名額
-                # 【新增過濾邏輯】剔除 0 的數值，避免 AI 分析錯誤顯示 "0 名"
-                valid_items = [q for q in quotas if q[0] > 0]
-                if valid_items:
-                    nums = [q[0] for q in valid_items]
-                    texts = [q[1] for q in valid_items]
-                    
-                    min_q = int(min(nums))
-                    max_q = int(max(nums))
-                    
-                    if min_q == max_q:
-                        display_str = f"{min_q} 名"
-                    else:
-                        display_str = f"{min_q} ~ {max_q} 名"
-                        
-                    html_out = create_tooltip_html(display_str, texts)
-                    st.markdown(f"**獎助名額：** {html_out}", unsafe_allow_html=True)
-                else:
-                    st.markdown("**獎助名額：** 未定/詳見公告", unsafe_allow_html=True)
-            with col2:
-                url = scholarship.get('url', '')
-                if url:
-                    st.markdown(f"**[官方公告]({url})**")
-                app_loc = scholarship.get('application_location', None)
-                if app_loc:
-                    st.markdown(f"**申請地點：** {app_loc}")
-                attachments = scholarship.get('attachments', None)
-                if attachments:
-                    # 解析多個檔案，並列顯示
-                    att_links = []
-                    import re
-                    for att in attachments.split('|'):
-                        att = att.strip()
-                        m = re.match(r"(.+?)\s*\[(https?://[^\]]+)\]", att)
-                        if m:
-                            name, url = m.group(1), m.group(2)
-                            att_links.append(f"<a href='{url}' target='_blank'>{name}</a>")
-                        else:
-                            att_links.append(att)
-                    att_html = " | ".join(att_links)
-                    st.markdown(f"**附加檔案：** {att_html}", unsafe_allow_html=True)
-            
-            # st.divider() # 分隔線
-            st.markdown("<hr style='border:1px solid #D9B91A; margin:20px 0;'>", unsafe_allow_html=True)
-
-            # ==================== 顯示資格條件 (Requirements Rendering) ====================
-            groups = scholarship.get("tags", {}).get("groups", [])
-            common_tags = scholarship.get("tags", {}).get("common_tags", [])
-
-            # 特殊處理：如果只有一個組別且沒有共同條件，將該組別視為共同條件顯示
-            # 這樣可以避免出現「子組別適用」只有一個「通用組別」的奇怪顯示
-            if len(groups) == 1 and not common_tags:
-                common_tags = groups[0].get("requirements", [])
-                groups = [] # 清空 groups，這樣就不會重複顯示在下方
-
-            # ==================== 1. 處理共同適用條件 ====================
-            if common_tags:
-                st.markdown("""
-                    <h3 style='margin-bottom:25px; color:#594C3B;'>共同適用</h3>
-                """, unsafe_allow_html=True)
-                # 過濾不需要顯示的 tags
-                requirements = [req for req in common_tags if req.get("tag_category") not in ["應繳文件", "領獎學金後的義務", "其他（用於無法歸類的特殊要求）"]]
-                
-                # 檢查並補上 AI 提取的金額與名額 (維持你原本的邏輯)
-                tag_cats = [r.get("tag_category") for r in requirements]
-                
-                if "獎助金額" not in tag_cats:
-                    ai_amount, raw_amount = extract_numeric_info_from_tags(scholarship.get("tags", {}), "獎助金額")
-                    if ai_amount:
-                        requirements.append({"tag_category": "獎助金額", "standardized_value": ai_amount, "tag_value": raw_amount})
-                        
-                if "獎助名額" not in tag_cats:
-                    ai_quota, raw_quota = extract_numeric_info_from_tags(scholarship.get("tags", {}), "獎助名額")
-                    if ai_quota:
-                        requirements.append({"tag_category": "獎助名額", "standardized_value": ai_quota, "tag_value": raw_quota})
-                
-                # 【修改點】直接呼叫函式渲染，取代原本冗長的 for loop
-                if requirements:
-                    render_requirements_grid(requirements)
-                else:
-                    st.info("無硬性條件")
-                
-                st.markdown("")
-            
-            st.markdown("<hr style='border:1px solid #D9B91A; margin:20px 0;'>", unsafe_allow_html=True)
-
-            # ==================== 2. 處理各組別 ====================
-            if groups:
-                st.markdown("""
-                    <h3 style='margin-bottom:25px; color:#594C3B;'>子組別適用</h3>
-                """, unsafe_allow_html=True)
-
-                for group in groups:
-                    group_name = group.get("group_name", "未命名組別")
-                    st.markdown(f"""
-                        <h4 style='margin-bottom:18px; color:#594C3B; font-size:1.2rem; font-weight:600; background:#FFF3D1; border-radius:8px; padding:6px 18px 6px 12px; display:inline-block;'>{group_name}</h4>
-                    """, unsafe_allow_html=True)
-                    
-                    requirements = [req for req in group.get("requirements", []) if req.get("tag_category") not in ["應繳文件", "領獎學金後的義務", "其他（用於無法歸類的特殊要求）"]]
-                    
-                    # 同樣檢查並補上 AI 提取的金額與名額
-                    tag_cats = [r.get("tag_category") for r in requirements]
-                    
-                    if "獎助金額" not in tag_cats:
-                        ai_amount, raw_amount = extract_numeric_info_from_tags({"groups": [group]}, "獎助金額")
-                        if ai_amount:
-                            requirements.append({"tag_category": "獎助金額", "standardized_value": ai_amount, "tag_value": raw_amount})
-                    
-                    if "獎助名額" not in tag_cats:
-                        ai_quota, raw_quota = extract_numeric_info_from_tags({"groups": [group]}, "獎助名額")
-                        if ai_quota:
-                            requirements.append({"tag_category": "獎助名額", "standardized_value": ai_quota, "tag_value": raw_quota})
-                    
-                    # 【修改點】直接呼叫函式渲染
-                    if requirements:
-                        render_requirements_grid(requirements)
-                    else:
-                        st.info("此組別無特定資格要求（或僅有應繳文件/義務）")
-                        
-                    st.markdown("---")
-            
-            # ==================== 3. 表格與文件清單 (這部分保持不變) ====================
-            # (Legacy table rendering removed)
-
-            st.markdown("#### 領獎後義務")
-           
-            pseudo_group = {"requirements": common_tags}
-            obligations = extract_obligations_from_group(pseudo_group)
-            if obligations:
-                st.markdown("**共同適用**")
-                for obl in obligations:
-                    st.warning(obl)
-            for group in groups:
-                group_name = group.get("group_name", "未命名組別")
-                obligations = extract_obligations_from_group(group)
-                if obligations:
-                    st.markdown(f"**{group_name}**")
-                    for obl in obligations:
-                        st.warning(obl)
-            st.markdown("")
-            st.markdown("#### 應繳文件清單")
-            docs = extract_documents_from_group(pseudo_group)
-            if docs:
-                st.markdown("**共同適用**")
-                for doc in docs:
-                    st.markdown(f"- {doc}")
-            for group in groups:
-                group_name = group.get("group_name", "未命名組別")
-                docs = extract_documents_from_group(group)
-                if docs:
-                    st.markdown(f"**{group_name}**")
-                    for doc in docs:
-                        st.markdown(f"- {doc}")
-            st.markdown("")
-            st.markdown("")
-            s_id = scholarship.get('id')
-            s_name = scholarship.get('scholarship_name', '')
-            mailto_link = (
-                f"mailto:b12305054@ntu.edu.tw?subject=[錯誤回報] ID: {s_id} - {s_name}"
-                f"&body=請描述您發現的錯誤：%0D%0A%0D%0A"
-                f"獎學金 ID: {s_id}%0D%0A"
-                f"獎學金名稱: {s_name}%0D%0A"
-                f"問題描述: "
-            )
-            st.link_button("回報錯誤", mailto_link)
+                    render_scholarship_body(scholarship, similar)
 
     st.markdown("---")
 
@@ -559,5 +832,28 @@ def main():
             st.session_state['current_page'] += 1
             st.rerun()
 
+    # ==================== Session 記憶體統計 ====================
+    # session 只保存整數陣列（結果排序等），語料由所有 session 共用
+    footprint = session_state_footprint(st.session_state)
+    registry = get_session_memory_registry()
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        registry.record(ctx.session_id, sum(footprint.values()))
+
+    if DEBUG_MODE:
+        with st.sidebar.expander("🔧 Session 記憶體"):
+            st.markdown(f"**本 session：** {sum(footprint.values()):,} bytes")
+            st.table([{"鍵": k, "bytes": v} for k, v in footprint.items()])
+            summary = registry.summary()
+            st.markdown(
+                f"**所有 session：** {summary['sessions']} 個，共 {summary['total_bytes']:,} bytes"
+                f"（單一最大 {summary['max_session_bytes']:,}，尖峰 {summary['peak_total_bytes']:,}）"
+            )
+        if delta_counter is not None:
+            with st.sidebar.expander("🔧 渲染統計"):
+                st.markdown(f"**卡片渲染模式：** {CARD_RENDER_MODE}")
+                st.caption("本次 rerun 到此為止送往瀏覽器的 delta")
+                st.table([delta_counter.summary()])
+
 if __name__ == "__main__":
     main()
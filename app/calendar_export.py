@@ -0,0 +1,157 @@
+"""
+申請期間行事曆匯出（ICS）
+
+每筆獎學金的申請期間只在第一次匯出時解析一次，預先組成 VEVENT 片段（bytes）。
+匯出時依結果集合串接片段即可，不需要重新解析日期；
+同一個結果集合（語料版本 + 標準化篩選條件）的檔案會快取起來，重複點擊不會重新產生。
+
+事件格式：
+- 有開始與截止日期：全天事件，從開始日到截止日（DTEND 為截止日隔天）
+- 只有截止日期（或開始日晚於截止日）：截止日當天的全天事件
+- 截止日期無法解析：不匯出
+"""
+
+import datetime
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Sequence
+
+from utils import parse_date
+
+
+# ==================== 配置 ====================
+
+PRODID = "-//NTU Scholarship Finder//Scholarship Deadlines//ZH-TW"
+CALENDAR_NAME = "NTU 獎學金申請期間"
+UID_DOMAIN = "ntu-scholarship-finder"
+
+# 最多快取幾個結果集合的 ICS 檔案
+MAX_CACHED_FILES = 32
+
+
+# ==================== ICS 格式 ====================
+
+def escape_text(value: str) -> str:
+    """依 RFC 5545 跳脫 TEXT 欄位中的反斜線、分號、逗號與換行"""
+    return (
+        str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> bytes:
+    """依 RFC 5545 將超過 75 octets 的內容行折行（不切斷 UTF-8 字元），並加上 CRLF"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return encoded + b"\r\n"
+    chunks, current, limit = [], b"", 75
+    for char in line:
+        char_bytes = char.encode("utf-8")
+        if len(current) + len(char_bytes) > limit:
+            chunks.append(current)
+            current, limit = b"", 74  # 後續行開頭有一個空白
+        current += char_bytes
+    chunks.append(current)
+    return b"\r\n ".join(chunks) + b"\r\n"
+
+
+def build_event(scholarship: Dict, dtstamp: str) -> Optional[bytes]:
+    """
+    將一筆獎學金的申請期間轉為 VEVENT
+
+    Returns:
+        Optional[bytes]: VEVENT 片段；沒有可用的日期時回傳 None
+    """
+    start = parse_date(scholarship.get("start_date", ""))
+    end = parse_date(scholarship.get("end_date", ""))
+    if end is None:
+        return None
+    if start is None or start > end:
+        start = end
+    name = scholarship.get("scholarship_name", "未命名獎學金")
+    summary = f"{name} 申請期間" if start < end else f"{name} 申請截止"
+
+    description = [f"申請期間：{scholarship.get('start_date') or '未定'} ~ {scholarship.get('end_date')}"]
+    if scholarship.get("application_location"):
+        description.append(f"申請地點：{scholarship['application_location']}")
+    if scholarship.get("url"):
+        description.append(f"官方公告：{scholarship['url']}")
+    description_text = "\n".join(description)
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{scholarship.get('id')}@{UID_DOMAIN}",
+        f"DTSTAMP:{dtstamp}",
+        f"DTSTART;VALUE=DATE:{start:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{end + datetime.timedelta(days=1):%Y%m%d}",
+        f"SUMMARY:{escape_text(summary)}",
+        f"DESCRIPTION:{escape_text(description_text)}",
+    ]
+    if scholarship.get("url"):
+        lines.append(f"URL:{scholarship['url']}")
+    lines.append("END:VEVENT")
+    return b"".join(fold_line(line) for line in lines)
+
+
+# ==================== 匯出 ====================
+
+class CalendarExporter:
+    """
+    以預先組好的 VEVENT 片段產生 ICS 檔案（所有 session 共用，搭配 st.cache_resource）
+    """
+
+    def __init__(self, scholarships: List[Dict], max_cached_files: int = MAX_CACHED_FILES):
+        self.scholarships = scholarships
+        self.max_cached_files = max_cached_files
+        self._events: Optional[List[Optional[bytes]]] = None
+        self._files: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def events(self) -> List[Optional[bytes]]:
+        """依語料順序排列的 VEVENT 片段（第一次使用時建立）"""
+        if self._events is None:
+            with self._lock:
+                if self._events is None:
+                    dtstamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+                    self._events = [build_event(s, dtstamp) for s in self.scholarships]
+        return self._events
+
+    def iter_ics(self, indices: Iterable[int]) -> Iterator[bytes]:
+        """依序產生 ICS 檔案的各個片段"""
+        yield b"".join(fold_line(line) for line in [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{CALENDAR_NAME}",
+        ])
+        events = self.events
+        for i in indices:
+            if events[i] is not None:
+                yield events[i]
+        yield fold_line("END:VCALENDAR")
+
+    def export(self, key: Hashable, indices: Sequence[int]) -> bytes:
+        """
+        取得結果集合的 ICS 檔案
+
+        Args:
+            key (Hashable): 結果集合的鍵（語料版本, 標準化篩選條件）
+            indices (Sequence[int]): 結果集合（獎學金在語料中的位置）
+
+        Returns:
+            bytes: ICS 檔案內容；同一個鍵只產生一次
+        """
+        with self._lock:
+            cached = self._files.get(key)
+            if cached is not None:
+                self._files.move_to_end(key)
+                return cached
+        content = b"".join(self.iter_ics(indices))
+        with self._lock:
+            self._files[key] = content
+            while len(self._files) > self.max_cached_files:
+                self._files.popitem(last=False)
+        return content
@@ -0,0 +1,135 @@
+"""
+單一區塊的獎學金卡片渲染
+
+一般模式下，卡片內容由數十個 st.markdown / st.columns / st.warning 組成，每個都是一個
+送往瀏覽器的 delta。本模組把整張卡片的內容組成一段 HTML，以一次 st.markdown 送出，
+樣式使用 app/styles.css 中的 .card-* 類別。
+
+由 constants.CARD_RENDER_MODE（環境變數 SCHOLARSHIP_CARD_RENDER=html）啟用，
+內容與 app.render_scholarship_body 相同。
+"""
+
+import html
+from typing import Dict, List, Optional
+
+from ui_components import (
+    create_tooltip_html, extract_amounts_and_quotas, build_requirement_cells, get_display_requirements,
+    build_attachment_links_html, extract_obligations_from_group, extract_documents_from_group,
+    get_card_header, build_similar_link
+)
+
+
+def _range_html(items, unit: str) -> str:
+    """金額 / 名額範圍（帶 Tooltip），沒有資料時為「未定/詳見公告」"""
+    if not items:
+        return "未定/詳見公告"
+    nums = [item[0] for item in items]
+    min_v, max_v = int(min(nums)), int(max(nums))
+    if unit == "元":
+        display_str = f"{min_v:,} 元" if min_v == max_v else f"{min_v:,} ~ {max_v:,} 元"
+    else:
+        display_str = f"{min_v} {unit}" if min_v == max_v else f"{min_v} ~ {max_v} {unit}"
+    return create_tooltip_html(display_str, [item[1] for item in items])
+
+
+def _grid_html(requirements: List[Dict], empty_message: str) -> str:
+    if not requirements:
+        return f"<div class='card-info'>{empty_message}</div>"
+    cells = "".join(f"<div class='card-grid-cell'>{cell}</div>" for cell in build_requirement_cells(requirements))
+    return f"<div class='card-grid'>{cells}</div>"
+
+
+def _named_list_html(sections, item_class: str) -> str:
+    """依組別列出義務或文件：sections 為 [(標題, [項目, ...]), ...]"""
+    parts = []
+    for title, items in sections:
+        if not items:
+            continue
+        parts.append(f"<p><b>{html.escape(title)}</b></p>")
+        if item_class == "card-obligation":
+            parts.extend(f"<div class='card-obligation'>{html.escape(item)}</div>" for item in items)
+        else:
+            parts.append("<ul>" + "".join(f"<li>{html.escape(item)}</li>" for item in items) + "</ul>")
+    return "".join(parts)
+
+
+def build_scholarship_body_html(scholarship: Dict, similar: Optional[List[Dict]] = None) -> str:
+    """
+    將一張卡片的完整內容組成單一 HTML 區塊
+
+    Args:
+        scholarship (Dict): 獎學金資料
+        similar (Optional[List[Dict]]): 相似獎學金（見 ui_components.get_similar_scholarships）
+
+    Returns:
+        str: 可直接交給 st.markdown(..., unsafe_allow_html=True) 的 HTML
+    """
+    amounts, quotas = extract_amounts_and_quotas(scholarship)
+    # 剔除 0 的數值，避免 AI 分析錯誤顯示 "0 名"
+    quotas = [q for q in quotas if q[0] > 0]
+
+    main = [
+        f"<p><b>申請期間：</b> {html.escape(str(scholarship.get('start_date', 'N/A')))} ~ {html.escape(str(scholarship.get('end_date', 'N/A')))}</p>",
+        f"<p><b>獎助金額：</b> {_range_html(amounts, '元')}</p>",
+        f"<p><b>獎助名額：</b> {_range_html(quotas, '名')}</p>",
+    ]
+    side = []
+    if scholarship.get('url'):
+        side.append(f"<p><b><a href='{html.escape(scholarship['url'], quote=True)}' target='_blank'>官方公告</a></b></p>")
+    if scholarship.get('application_location'):
+        side.append(f"<p><b>申請地點：</b> {html.escape(scholarship['application_location'])}</p>")
+    if scholarship.get('attachments'):
+        side.append(f"<p><b>附加檔案：</b> {build_attachment_links_html(scholarship['attachments'])}</p>")
+
+    parts = [
+        f"<div class='card-columns'><div class='card-col-main'>{''.join(main)}</div><div class='card-col-side'>{''.join(side)}</div></div>",
+        "<hr class='card-divider'>",
+    ]
+
+    # 資格條件：只有一個組別且沒有共同條件時，將該組別視為共同條件顯示
+    groups = scholarship.get("tags", {}).get("groups", [])
+    common_tags = scholarship.get("tags", {}).get("common_tags", [])
+    if len(groups) == 1 and not common_tags:
+        common_tags = groups[0].get("requirements", [])
+        groups = []
+
+    if common_tags:
+        parts.append("<h3 class='card-section-title'>共同適用</h3>")
+        parts.append(_grid_html(get_display_requirements(common_tags, scholarship.get("tags", {})), "無硬性條件"))
+    parts.append("<hr class='card-divider'>")
+
+    if groups:
+        parts.append("<h3 class='card-section-title'>子組別適用</h3>")
+        for group in groups:
+            parts.append(f"<h4 class='card-group-name'>{html.escape(group.get('group_name', '未命名組別'))}</h4>")
+            parts.append(_grid_html(
+                get_display_requirements(group.get("requirements", []), {"groups": [group]}),
+                "此組別無特定資格要求（或僅有應繳文件/義務）"
+            ))
+            parts.append("<hr>")
+
+    pseudo_group = {"requirements": common_tags}
+    named_groups = [("共同適用", pseudo_group)] + [(g.get("group_name", "未命名組別"), g) for g in groups]
+    parts.append("<h4>領獎後義務</h4>")
+    parts.append(_named_list_html([(name, extract_obligations_from_group(g)) for name, g in named_groups], "card-obligation"))
+    parts.append("<h4>應繳文件清單</h4>")
+    parts.append(_named_list_html([(name, extract_documents_from_group(g)) for name, g in named_groups], "card-document"))
+
+    if similar:
+        parts.append("<h4>相似獎學金</h4>")
+        parts.append("<ul>" + "".join(
+            f"<li><a href='{html.escape(build_similar_link(n), quote=True)}' target='_blank'>{html.escape(get_card_header(n))}</a></li>"
+            for n in similar
+        ) + "</ul>")
+
+    s_id = scholarship.get('id')
+    s_name = scholarship.get('scholarship_name', '')
+    mailto_link = (
+        f"mailto:b12305054@ntu.edu.tw?subject=[錯誤回報] ID: {s_id} - {s_name}"
+        f"&body=請描述您發現的錯誤：%0D%0A%0D%0A"
+        f"獎學金 ID: {s_id}%0D%0A"
+        f"獎學金名稱: {s_name}%0D%0A"
+        f"問題描述: "
+    )
+    parts.append(f"<a class='card-report-link' href='{html.escape(mailto_link, quote=True)}' target='_blank'>回報錯誤</a>")
+    return f"<div class='card-html'>{''.join(parts)}</div>"
@@ -1,3 +1,5 @@
+import os
+
 FILTER_OPTIONS = {
     "學制": ["不限/未明定", "大學", "碩士", "博士", "其他"],
     "年級": ["不限/未明定", "1", "2", "3", "4", "4以上", "其他"],
@@ -51,3 +53,29 @@ EXCHANGE_RATES = {
     "CNY": 4.5, "人民幣": 4.5,
     "HKD": 4.2, "港幣": 4.2
 }
+
+# 除錯模式：設定環境變數 SCHOLARSHIP_FINDER_DEBUG=1 後，sidebar 會顯示查詢計畫等除錯資訊
+DEBUG_MODE = os.environ.get("SCHOLARSHIP_FINDER_DEBUG") == "1"
+
+# 篩選引擎：python（預設，逐筆比對）、sqlite（見 sql_engine.py）、matrix（見 matrix_engine.py）或 sharded（見 sharded_engine.py），
+# 以環境變數 SCHOLARSHIP_FILTER_ENGINE 切換
+FILTER_ENGINE = os.environ.get("SCHOLARSHIP_FILTER_ENGINE", "python")
+
+# 分片篩選引擎（見 sharded_engine.py）：FILTER_ENGINE = "sharded" 且語料筆數達到 SHARDED_MIN_CORPUS 時才使用，
+# 較小的語料仍使用 python 引擎；worker 數預設為 CPU 核心數。以環境變數 SCHOLARSHIP_SHARDED_MIN_CORPUS、SCHOLARSHIP_SHARDED_WORKERS 調整
+SHARDED_MIN_CORPUS = int(os.environ.get("SCHOLARSHIP_SHARDED_MIN_CORPUS", "20000"))
+SHARDED_WORKERS = int(os.environ.get("SCHOLARSHIP_SHARDED_WORKERS", str(os.cpu_count() or 1)))
+
+# 查詢紀錄：設定環境變數 SCHOLARSHIP_QUERY_LOG=<檔案路徑> 後記錄匿名化查詢（見 query_log.py），預設關閉
+QUERY_LOG_PATH = os.environ.get("SCHOLARSHIP_QUERY_LOG")
+
+# 卡片渲染模式：elements（預設，逐一建立 Streamlit 元素）或 html（整張卡片組成單一 HTML 區塊，見 card_html.py），
+# 以環境變數 SCHOLARSHIP_CARD_RENDER 切換
+CARD_RENDER_MODE = os.environ.get("SCHOLARSHIP_CARD_RENDER", "elements")
+
+# 分割語料：manifest 路徑（見 corpus_partitions.py，不存在時只使用預設的單一語料檔），
+# 以環境變數 SCHOLARSHIP_CORPUS_MANIFEST 切換
+CORPUS_MANIFEST = os.environ.get("SCHOLARSHIP_CORPUS_MANIFEST", "data/corpus/manifest.json")
+
+# 分割區的估計記憶體上限（MB），超過時淘汰最久未使用的非預設分割區，以環境變數 SCHOLARSHIP_PARTITION_MEMORY_MB 調整
+PARTITION_MEMORY_BUDGET_MB = int(os.environ.get("SCHOLARSHIP_PARTITION_MEMORY_MB", "512"))
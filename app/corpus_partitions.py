@@ -0,0 +1,330 @@
+"""
+依學校與學年度分割的語料（manifest + 延遲載入）
+
+同一個部署要服務多個學年度、日後也包含其他學校，因此語料依 (學校, 學年度) 分割成多個 JSON 檔，
+由 manifest 列出所有分割區：
+
+    {
+        "partitions": [
+            {"id": "ntu-114", "institution": "NTU", "institution_name": "國立臺灣大學",
+             "academic_year": 114, "path": "data/merged/scholarships_merged_300.json", "default": true},
+            {"id": "ntu-113", "institution": "NTU", "institution_name": "國立臺灣大學",
+             "academic_year": 113, "path": "data/corpus/ntu-113.json"}
+        ]
+    }
+
+- default 為 true 的分割區組成預設檢視（目前學年度），啟動時只載入這些分割區
+- 其他分割區在使用者第一次選擇時才載入；估計記憶體超過上限時，淘汰最久未使用的非預設分割區
+- 選擇單一分割區時直接回傳該分割區的列表，預設檢視與未分割前完全相同，不會因為加入歷史資料而變慢
+- manifest 不存在時，以 data_loader.DATA_FILE 作為唯一的預設分割區
+
+記憶體以檔案大小 × JSON_MEMORY_FACTOR 估計（JSON 解析成 Python 物件後約為檔案大小的數倍），
+避免每次載入都走訪整個物件樹計算實際大小。
+
+使用方式（在專案根目錄執行）：
+    python app/corpus_partitions.py list
+    python app/corpus_partitions.py add --institution NTU --institution-name 國立臺灣大學 --year 113 --input data/corpus/ntu-113.json
+    python app/corpus_partitions.py add --institution NTU --year 114 --input data/merged/scholarships_merged_300.json --default
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from utils import compute_corpus_version
+
+
+# ==================== 配置 ====================
+
+DEFAULT_MANIFEST_FILE = os.path.join("data", "corpus", "manifest.json")
+
+# 預設記憶體上限 512 MB（以估計值計算，預設分割區不受上限淘汰）
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+
+# JSON 檔案大小 → 解析後記憶體用量的估計倍數
+JSON_MEMORY_FACTOR = 6
+
+
+# ==================== Manifest ====================
+
+class CorpusManifest:
+    """
+    分割區清單
+
+    Attributes:
+        partitions (Dict[str, Dict]): 分割區 ID → 設定（institution, institution_name, academic_year, path, default）
+        default_selection (Tuple[str, ...]): 預設檢視的分割區 ID（依 manifest 順序）
+    """
+
+    def __init__(self, partitions: List[Dict]):
+        if not partitions:
+            raise ValueError("manifest 至少需要一個分割區")
+        self.partitions = OrderedDict((p["id"], p) for p in partitions)
+        defaults = tuple(pid for pid, p in self.partitions.items() if p.get("default"))
+        self.default_selection = defaults or (next(iter(self.partitions)),)
+
+    @classmethod
+    def load(cls, path: str, fallback_file: str) -> "CorpusManifest":
+        """
+        讀取 manifest
+
+        Args:
+            path (str): manifest 路徑
+            fallback_file (str): manifest 不存在時作為唯一分割區的語料檔
+
+        Returns:
+            CorpusManifest: 分割區清單
+        """
+        if not os.path.exists(path):
+            return cls([{"id": "default", "institution": "NTU", "institution_name": "國立臺灣大學",
+                         "academic_year": None, "path": fallback_file, "default": True}])
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f)["partitions"])
+
+    def label(self, partition_id: str) -> str:
+        """分割區的顯示名稱，例如「國立臺灣大學 114 學年度」"""
+        partition = self.partitions[partition_id]
+        name = partition.get("institution_name") or partition.get("institution") or partition_id
+        year = partition.get("academic_year")
+        return f"{name} {year} 學年度" if year is not None else name
+
+    def normalize_selection(self, selection: Optional[Sequence[str]]) -> Tuple[str, ...]:
+        """
+        依 manifest 順序整理選擇的分割區，忽略不存在的 ID；沒有任何有效選擇時回傳預設檢視
+
+        Note:
+            回傳的 tuple 作為 st.cache_resource 的快取鍵，相同的選擇必須得到相同的 tuple
+        """
+        chosen = set(selection or ())
+        normalized = tuple(pid for pid in self.partitions if pid in chosen)
+        return normalized or self.default_selection
+
+
+# ==================== 分割區載入與淘汰 ====================
+
+class PartitionStore:
+    """
+    延遲載入分割區，並以估計記憶體做 LRU 淘汰（thread-safe，搭配 st.cache_resource 由整個 process 共用）
+
+    Note:
+        呼叫端不可修改回傳的資料。衍生的快取（合併語料、搜尋索引、篩選引擎等）也引用分割區的資料，
+        因此淘汰時記錄包含被淘汰分割區的選擇，由呼叫端以 pop_stale_selections() 取得並清除那些快取
+        （見 data_loader.release_stale_selections），記憶體才會真正釋放。
+    """
+
+    def __init__(self, manifest: CorpusManifest, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        self.manifest = manifest
+        self.memory_budget = memory_budget
+        self._loaded: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._versions: Dict[str, str] = {}
+        # 曾經取得過的選擇，以及因分割區被淘汰而需要清除衍生快取的選擇
+        self._selections: Set[Tuple[str, ...]] = set()
+        self._stale: Set[Tuple[str, ...]] = set()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def _load_partition(self, partition_id: str) -> List[Dict]:
+        path = self.manifest.partitions[partition_id]["path"]
+        with open(path, "r", encoding="utf-8") as f:
+            scholarships = json.load(f)
+        self._sizes[partition_id] = os.path.getsize(path) * JSON_MEMORY_FACTOR
+        self.loads += 1
+        return scholarships
+
+    def _evict(self, keep: Sequence[str]):
+        """淘汰最久未使用的分割區，直到估計記憶體不超過上限（預設分割區與 keep 不淘汰）"""
+        pinned = set(keep) | set(self.manifest.default_selection)
+        for partition_id in list(self._loaded):
+            if self.nbytes <= self.memory_budget:
+                break
+            if partition_id in pinned:
+                continue
+            del self._loaded[partition_id]
+            self.nbytes -= self._sizes[partition_id]
+            self.evictions += 1
+            stale = {selection for selection in self._selections if partition_id in selection}
+            self._selections -= stale
+            self._stale |= stale
+
+    def get(self, selection: Sequence[str]) -> List[List[Dict]]:
+        """
+        取得選擇的分割區（未載入的分割區在此時載入）
+
+        Args:
+            selection (Sequence[str]): 已整理的分割區 ID
+
+        Returns:
+            List[List[Dict]]: 與 selection 對應的獎學金列表
+        """
+        with self._lock:
+            self._selections.add(tuple(selection))
+            self._stale.discard(tuple(selection))
+            parts = []
+            for partition_id in selection:
+                scholarships = self._loaded.get(partition_id)
+                if scholarships is None:
+                    scholarships = self._load_partition(partition_id)
+                    self._loaded[partition_id] = scholarships
+                    self.nbytes += self._sizes[partition_id]
+                self._loaded.move_to_end(partition_id)
+                parts.append(scholarships)
+            self._evict(keep=selection)
+            return parts
+
+    def load_selection(self, selection: Sequence[str]) -> List[Dict]:
+        """
+        取得選擇的分割區合併後的語料（依 selection 順序串接）
+
+        Note:
+            只選擇一個分割區時直接回傳該分割區的列表，不複製
+        """
+        parts = self.get(selection)
+        if len(parts) == 1:
+            return parts[0]
+        return [scholarship for part in parts for scholarship in part]
+
+    def pop_stale_selections(self) -> List[Tuple[str, ...]]:
+        """
+        取出因分割區被淘汰而需要清除衍生快取的選擇（取出後清空）
+
+        Returns:
+            List[Tuple[str, ...]]: 包含已淘汰分割區的選擇
+        """
+        with self._lock:
+            stale = list(self._stale)
+            self._stale.clear()
+            return stale
+
+    def offsets(self, selection: Sequence[str]) -> List[int]:
+        """
+        每個分割區在合併語料中的起始位置
+
+        Returns:
+            List[int]: 與 selection 對應的起始位置
+        """
+        lengths = [len(part) for part in self.get(selection)]
+        return [0] + list(accumulate(lengths))[:-1]
+
+    def version(self, selection: Sequence[str]) -> str:
+        """
+        選擇的語料版本
+
+        Note:
+            單一分割區的版本即為該檔案的 compute_corpus_version()，與未分割前相同，
+            因此預設檢視仍可使用以該檔案建置的預熱快取
+        """
+        with self._lock:
+            for partition_id in selection:
+                if partition_id not in self._versions:
+                    self._versions[partition_id] = compute_corpus_version(self.manifest.partitions[partition_id]["path"])
+            versions = [self._versions[pid] for pid in selection]
+        if len(versions) == 1:
+            return versions[0]
+        return hashlib.sha256("+".join(versions).encode("utf-8")).hexdigest()[:16]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        目前的載入統計
+
+        Returns:
+            Dict[str, float]: 已載入分割區數、估計記憶體、載入與淘汰次數
+        """
+        with self._lock:
+            return {
+                "已載入分割區": len(self._loaded),
+                "估計記憶體 (MB)": round(self.nbytes / 1024 / 1024, 1),
+                "上限 (MB)": round(self.memory_budget / 1024 / 1024, 1),
+                "載入": self.loads,
+                "淘汰": self.evictions,
+            }
+
+
+def locate_partition(offsets: List[int], selection: Sequence[str], position: int) -> str:
+    """
+    合併語料中的位置屬於哪個分割區
+
+    Args:
+        offsets (List[int]): PartitionStore.offsets() 的結果
+        selection (Sequence[str]): 與 offsets 對應的分割區 ID
+        position (int): 獎學金在合併語料中的位置
+
+    Returns:
+        str: 分割區 ID
+    """
+    return selection[bisect_right(offsets, position) - 1]
+
+
+# ==================== CLI ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="管理依學校與學年度分割的語料 manifest")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_FILE, help="manifest 檔案路徑")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="列出所有分割區")
+
+    add_parser = subparsers.add_parser("add", help="新增或更新分割區")
+    add_parser.add_argument("--institution", required=True, help="學校代碼，例如 NTU")
+    add_parser.add_argument("--institution-name", default=None, help="學校顯示名稱，例如 國立臺灣大學")
+    add_parser.add_argument("--year", type=int, required=True, help="學年度，例如 114")
+    add_parser.add_argument("--input", required=True, help="該分割區的整合後 JSON")
+    add_parser.add_argument("--id", default=None, help="分割區 ID（預設為 <學校代碼小寫>-<學年度>）")
+    add_parser.add_argument("--default", action="store_true", help="設為預設檢視（同一學校的其他分割區取消預設）")
+    args = parser.parse_args()
+
+    partitions = []
+    if os.path.exists(args.manifest):
+        with open(args.manifest, "r", encoding="utf-8") as f:
+            partitions = json.load(f)["partitions"]
+
+    if args.command == "list":
+        if not partitions:
+            print(f"❌ 找不到 manifest：{args.manifest}")
+            return
+        manifest = CorpusManifest(partitions)
+        for pid, partition in manifest.partitions.items():
+            exists = "✓" if os.path.exists(partition["path"]) else "❌"
+            default = "（預設）" if pid in manifest.default_selection else ""
+            print(f"{exists} {pid}：{manifest.label(pid)}{default} → {partition['path']}")
+        return
+
+    if not os.path.exists(args.input):
+        print(f"❌ 找不到檔案：{args.input}")
+        return
+    with open(args.input, "r", encoding="utf-8") as f:
+        count = len(json.load(f))
+
+    partition_id = args.id or f"{args.institution.lower()}-{args.year}"
+    entry = {
+        "id": partition_id,
+        "institution": args.institution,
+        "institution_name": args.institution_name or args.institution,
+        "academic_year": args.year,
+        "path": args.input,
+        "default": args.default,
+    }
+    if args.default:
+        for partition in partitions:
+            if partition.get("institution") == args.institution:
+                partition["default"] = False
+    partitions = [p for p in partitions if p["id"] != partition_id] + [entry]
+    # 新的學年度排在前面，合併語料時目前學年度的獎學金優先
+    partitions.sort(key=lambda p: (p.get("institution", ""), -(p.get("academic_year") or 0)))
+
+    os.makedirs(os.path.dirname(args.manifest) or ".", exist_ok=True)
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump({"partitions": partitions}, f, indent=4, ensure_ascii=False)
+    print(f"✓ 已寫入 {args.manifest}：{partition_id}（{count} 筆獎學金）")
+
+
+if __name__ == "__main__":
+    main()
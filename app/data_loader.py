@@ -1,12 +1,92 @@
-import json
 import streamlit as st
+from corpus_partitions import CorpusManifest, PartitionStore
+from constants import CORPUS_MANIFEST, PARTITION_MEMORY_BUDGET_MB
 
-def load_scholarships():
+DATA_FILE = 'data/merged/scholarships_merged_300.json'
+
+# 同時保留幾種分割區選擇的合併語料與衍生索引（預設檢視也是其中一種）
+CORPUS_CACHE_ENTRIES = 8
+
+def load_corpus_manifest():
+    """
+    讀取分割區 manifest（不存在時以 DATA_FILE 作為唯一分割區），使用 Streamlit cache。
+    """
+    @st.cache_resource
+    def _manifest():
+        return CorpusManifest.load(CORPUS_MANIFEST, DATA_FILE)
+    return _manifest()
+
+def get_partition_store():
+    """
+    取得所有 session 共用的分割區載入器，使用 Streamlit cache。
+    """
+    @st.cache_resource
+    def _store():
+        return PartitionStore(load_corpus_manifest(), PARTITION_MEMORY_BUDGET_MB * 1024 * 1024)
+    return _store()
+
+# 以分割區選擇為鍵的衍生快取：函式名稱 → 快取後的函式（app 每次 rerun 重新定義時覆寫同一個項目）
+_selection_caches = {}
+
+def selection_cache_resource(**kwargs):
+    """
+    以分割區選擇 (selection) 為唯一參數的 st.cache_resource，最多保留 CORPUS_CACHE_ENTRIES 種選擇。
+
+    Note:
+        - 分割區被 PartitionStore 淘汰時，release_stale_selections() 清除所有以此註冊的快取中
+          包含該分割區的選擇；否則這些快取仍引用被淘汰的資料，記憶體上限不會生效
+        - kwargs 直接傳給 st.cache_resource（例如 on_release）
+    """
+    def decorator(func):
+        cached = st.cache_resource(max_entries=CORPUS_CACHE_ENTRIES, **kwargs)(func)
+        _selection_caches[f"{func.__module__}.{func.__qualname__}"] = cached
+        return cached
+    return decorator
+
+def release_stale_selections():
+    """
+    清除包含已淘汰分割區的選擇在所有衍生快取中的項目（使用中的 session 仍保有自己的參照，用完後釋放）。
+    """
+    for selection in get_partition_store().pop_stale_selections():
+        for cached in list(_selection_caches.values()):
+            cached.clear(selection)
+
+@selection_cache_resource()
+def _load_selection(selection):
+    return get_partition_store().load_selection(selection)
+
+def load_scholarships(selection=None):
+    """
+    載入選擇的分割區合併後的獎學金資料，使用 Streamlit cache。
+
+    Args:
+        selection (Tuple[str, ...], optional): CorpusManifest.normalize_selection() 的結果，預設為預設檢視
+
+    Note:
+        - 使用 st.cache_resource：所有 session 共用同一份唯讀語料，
+          不像 st.cache_data 每次讀取都複製一份完整語料
+        - 呼叫端不可修改回傳的資料；session 只保存指向語料位置的整數陣列
+        - 載入新的分割區可能淘汰其他分割區，此時一併清除受影響選擇的衍生快取
+    """
+    scholarships = _load_selection(selection or load_corpus_manifest().default_selection)
+    release_stale_selections()
+    return scholarships
+
+def load_corpus_version(selection=None):
+    """
+    取得選擇的語料版本（檔案內容雜湊），使用 Streamlit cache。
+    """
+    @st.cache_resource(max_entries=CORPUS_CACHE_ENTRIES)
+    def _version(selection):
+        return get_partition_store().version(selection)
+    return _version(selection or load_corpus_manifest().default_selection)
+
+def load_static_text(path):
     """
-    載入獎學金資料，使用 Streamlit cache。
+    讀取靜態文字檔（CSS 等），每個 process 只讀取一次，使用 Streamlit cache。
     """
-    @st.cache_data
-    def _load():
-        with open('data/merged/scholarships_merged_300.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return _load()
+    @st.cache_resource
+    def _read(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    return _read(path)
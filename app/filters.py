@@ -8,7 +8,9 @@
 """
 
 from typing import List, Dict, Set, Optional
+from urllib.parse import urlencode
 from utils import get_min_amount_and_quota
+from search_index import keyword_matches
 
 
 # ==================== 配置 ====================
@@ -19,6 +21,46 @@ SPECIAL_STUDENT_STATUS = {"延畢生", "休學生"}
 # 一般條件欄位：未標註視為不限（包容性邏輯）
 INCLUSIVE_FIELDS = {"學制", "年級", "學院", "設籍地", "就讀地"}
 
+# sidebar 的篩選類別（未提供查詢計畫時，check_group_match 依此順序檢查）
+FILTER_CATEGORIES = [
+    "學制", "年級", "學籍狀態", "學院",
+    "國籍身分", "設籍地", "就讀地",
+    "特殊身份", "家庭境遇", "經濟相關證明", "補助/獎學金排斥"
+]
+
+# 篩選條件在網址與快取鍵中的短參數名稱（順序即編碼順序）
+FILTER_PARAM_NAMES = {
+    "keyword": "q",
+    "exclude_undetermined_amount": "xu",
+    "學制": "deg",
+    "年級": "grade",
+    "學籍狀態": "status",
+    "學院": "college",
+    "國籍身分": "nat",
+    "設籍地": "dom",
+    "就讀地": "loc",
+    "特殊身份": "special",
+    "家庭境遇": "family",
+    "經濟相關證明": "econ",
+    "補助/獎學金排斥": "excl",
+}
+SCORE_PARAM_NAMES = {"GPA": "gpa", "百分制": "avg", "排名": "rank"}
+
+# 淘汰漏斗中關鍵字搜尋與學業成績的階段名稱
+KEYWORD_STAGE = "關鍵字"
+ACADEMIC_STAGE = "學業成績"
+
+# 學業成績門檻的評估標準：門檻越高越嚴格（百分制、GPA）/ 越低越嚴格（排名百分比）
+ACADEMIC_METRICS = ["GPA", "百分制", "排名"]
+HIGHER_IS_STRICTER = {"百分制", "GPA"}
+LOWER_IS_STRICTER = {"排名"}
+
+# 以「未提及」（而非「不限/未明定」）代表未標註的欄位
+UNMENTIONED_FIELDS = {"特殊身份", "家庭境遇", "經濟相關證明", "補助/獎學金排斥"}
+
+# 標註「不限」視為未標註的欄位
+UNLIMITED_AS_UNLABELED_FIELDS = {"學院", "國籍身分", "設籍地", "就讀地"}
+
 
 # ==================== 核心過濾函數 ====================
 
@@ -307,11 +349,183 @@ def check_multi_select_match(group_tags: List[str], user_selections: List[str])
     return bool(group_set & user_set)
 
 
-def check_group_match(group: Dict, filters: Dict) -> bool:
+def _check_selection_field(group: Dict, category: str, selections: List[str]) -> bool:
+    """
+    檢查一般篩選類別（學制、年級、學院、國籍身分、設籍地、就讀地、特殊身份、家庭境遇、經濟相關證明、補助/獎學金排斥）
+    
+    Args:
+        group (Dict): 獎學金的 group 資料，包含 requirements 列表
+        category (str): 篩選類別
+        selections (List[str]): 使用者在該類別的選擇列表
+    
+    Returns:
+        bool: 如果符合則返回 True，否則返回 False
+        
+    Note:
+        - 「不限/未明定」或「未提及」代表使用者也接受未標註該類別的獎學金（OR 邏輯）
+        - 學院、國籍身分、設籍地、就讀地：標註「不限」視為未標註
+    """
+    group_values = extract_tags_from_group(group, category)
+    excluded_values = extract_excluded_tags_from_group(group, category)
+    
+    user_set = set(selections)
+    
+    # 1. 檢查排除條件（改進邏輯）
+    # 只有當使用者選擇的所有選項都在排除列表中時，才排除
+    # 例如：使用者選「大學」+「其他」，獎學金排除「其他」但有「大學」→ 應該顯示
+    if not (user_set - set(excluded_values)):
+        return False
+    
+    # 2. 處理「不限/未明定」或「未提及」選項（OR 邏輯）
+    marker = "未提及" if category in UNMENTIONED_FIELDS else "不限/未明定"
+    has_marker = marker in user_set
+    other_values = user_set - {marker}
+    
+    # 將標註「不限」的獎學金視為未標註
+    if category in UNLIMITED_AS_UNLABELED_FIELDS:
+        group_values = [v for v in group_values if v != "不限"]
+    
+    # 情況 1: 只選「不限/未明定」或「未提及」→ 只顯示沒有標註的獎學金
+    if has_marker and not other_values:
+        return not group_values
+    # 情況 2: 只選具體選項 → 只顯示有標註且與使用者選擇有交集的獎學金
+    if not has_marker and other_values:
+        return bool(other_values & set(group_values))
+    # 情況 3: 同時選兩者 → 顯示沒有標註的 OR 有標註且符合的
+    return not group_values or bool(other_values & set(group_values))
+
+
+def _check_student_status_field(group: Dict, selections: List[str]) -> bool:
+    """
+    檢查學籍狀態（含特殊邏輯和「不限/未明定」）
+    
+    Args:
+        group (Dict): 獎學金的 group 資料，包含 requirements 列表
+        selections (List[str]): 使用者選擇的學籍狀態列表
+    
+    Returns:
+        bool: 如果符合則返回 True，否則返回 False
+        
+    Note:
+        - 延畢生和休學擬復學需要獎學金明確標註才會顯示（白名單邏輯）
+    """
+    group_status = extract_tags_from_group(group, "學籍狀態")
+    excluded_status = extract_excluded_tags_from_group(group, "學籍狀態")
+    
+    user_status_set = set(selections)
+    
+    # 1. 檢查排除條件（改進邏輯）
+    if not (user_status_set - set(excluded_status)):
+        # 使用者選擇的所有學籍狀態都在排除列表中，不顯示
+        return False
+    
+    # 2. 處理「不限/未明定」選項（OR 邏輯）
+    has_undetermined = "不限/未明定" in user_status_set
+    other_status = user_status_set - {"不限/未明定"}
+    user_special = other_status & SPECIAL_STUDENT_STATUS
+    
+    # 情況 1: 只選「不限/未明定」→ 只顯示沒有標註學籍狀態的獎學金
+    if has_undetermined and not other_status:
+        return not group_status
+    # 情況 2: 只選具體學籍狀態
+    # 特殊學籍（延畢生、休學擬復學）與一般學籍分別比對，任一符合即顯示；
+    # 獎學金未標註學籍狀態時預設僅限在學生，兩者皆不符合
+    if not has_undetermined and other_status:
+        user_normal = other_status - SPECIAL_STUDENT_STATUS
+        special_match = bool(user_special & set(group_status))
+        normal_match = bool(user_normal & set(group_status))
+        return special_match or normal_match
+    # 情況 3: 同時選「不限/未明定」和具體學籍狀態 → 沒有標註的 OR 有標註且符合的
+    if not group_status:
+        return True
+    if user_special:
+        # 使用者選了特殊學籍，必須明確包含
+        return bool(user_special & set(group_status))
+    return bool(other_status & set(group_status))
+
+
+def check_category_match(group: Dict, category: str, selections: List[str]) -> bool:
+    """
+    檢查獎學金的 group 在單一篩選類別上是否符合使用者的選擇
+    
+    Args:
+        group (Dict): 獎學金的 group 資料，包含 requirements 列表
+        category (str): 篩選類別（FILTER_CATEGORIES 之一）
+        selections (List[str]): 使用者在該類別的選擇列表（不可為空）
+    
+    Returns:
+        bool: 如果符合則返回 True，否則返回 False
+    """
+    if category == "學籍狀態":
+        return _check_student_status_field(group, selections)
+    return _check_selection_field(group, category, selections)
+
+
+def extract_academic_thresholds(group: Dict) -> Dict[str, float]:
+    """
+    從 group 中提取各評估標準最嚴格的學業門檻
+
+    Args:
+        group (Dict): 獎學金的 group 資料，包含 requirements 列表
+
+    Returns:
+        Dict[str, float]: 評估標準 → 門檻值（例如 {"GPA": 3.5}）
+
+    Note:
+        - 排名只採用單位含「%」的門檻，名次（例如「前 3 名」）無法與百分比比較
+    """
+    thresholds = {}
+    for req in group.get("requirements", []):
+        if req.get("tag_category") != "核心學業要求":
+            continue
+        numerical = req.get("numerical") or {}
+        metric = numerical.get("academic_metric")
+        value = numerical.get("num_value")
+        if metric not in ACADEMIC_METRICS or value is None or value <= 0:
+            continue
+        if metric == "排名" and "%" not in (numerical.get("unit") or ""):
+            continue
+        value = float(value)
+        if metric in HIGHER_IS_STRICTER:
+            thresholds[metric] = max(value, thresholds.get(metric, value))
+        else:
+            thresholds[metric] = min(value, thresholds.get(metric, value))
+    return thresholds
+
+
+def check_academic_match(group: Dict, scores: Dict[str, Optional[float]]) -> bool:
+    """
+    檢查學生成績是否達到 group 的學業門檻
+
+    Args:
+        group (Dict): 獎學金的 group 資料，包含 requirements 列表
+        scores (Dict[str, Optional[float]]): 評估標準 → 學生成績（None 表示未填寫）
+
+    Returns:
+        bool: 如果符合則返回 True，否則返回 False
+
+    Note:
+        - 包容性過濾：group 沒有該評估標準的門檻，或學生未填寫該項成績 → 視為符合
+        - 百分制 / GPA：門檻 ≤ 學生成績才符合；排名：學生排名百分比 ≤ 門檻才符合
+    """
+    active = {metric: score for metric, score in scores.items() if score is not None}
+    if not active:
+        return True
+    thresholds = extract_academic_thresholds(group)
+    for metric, score in active.items():
+        threshold = thresholds.get(metric)
+        if threshold is None:
+            continue
+        if threshold > score if metric in HIGHER_IS_STRICTER else score > threshold:
+            return False
+    return True
+
+
+def check_group_match(group: Dict, filters: Dict, plan=None) -> bool:
     """
     檢查獎學金的 group 是否符合使用者的所有篩選條件
     
-    這是核心的過濾邏輯函數，會依序檢查以下條件：
+    這是核心的過濾邏輯函數，會檢查以下條件：
     - 學制（大學部、碩士班等）
     - 年級
     - 學籍狀態（在學生、延畢生、休學擬復學等，含特殊邏輯處理）
@@ -323,10 +537,13 @@ def check_group_match(group: Dict, filters: Dict) -> bool:
     - 家庭境遇
     - 經濟相關證明
     - 補助/獎學金排斥
+    - 學業成績門檻（見 check_academic_match）
     
     Args:
         group (Dict): 獎學金的 group 資料，包含 requirements 列表
         filters (Dict): 使用者在 sidebar 選擇的篩選條件字典
+        plan (QueryPlan, optional): 由 selectivity.SelectivityStats.plan() 產生的查詢計畫，
+            決定類別的檢查順序並記錄每個類別的通過率；未提供時依 FILTER_CATEGORIES 順序檢查
     
     Returns:
         bool: 如果所有條件都符合則返回 True，任一條件不符合則返回 False
@@ -335,507 +552,62 @@ def check_group_match(group: Dict, filters: Dict) -> bool:
         - 使用新的包容性過濾邏輯
         - 學籍狀態有特殊處理：延畢生和休學擬復學需要獎學金明確標註才會顯示
         - 會檢查排除條件：如果使用者選擇的值在排除列表中，則不顯示該獎學金
+        - 各類別之間為 AND 邏輯，檢查順序不影響結果，只影響需要評估的條件數量
+        - 學業成績門檻也在 group 層級檢查：同一個 group 必須同時符合類別條件與門檻
     """
-    # 學制檢查（精確匹配邏輯）
-    if filters.get("學制"):
-        group_degrees = extract_tags_from_group(group, "學制")
-        excluded_degrees = extract_excluded_tags_from_group(group, "學制")
-        
-        user_degrees_set = set(filters["學制"])
-        excluded_set = set(excluded_degrees)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        # 只有當使用者選擇的所有選項都在排除列表中時，才排除
-        # 例如：使用者選「大學」+「其他」，獎學金排除「其他」但有「大學」→ 應該顯示
-        non_excluded_degrees = user_degrees_set - excluded_set
-        if not non_excluded_degrees:
-            # 使用者選擇的所有學制都在排除列表中，不顯示
-            return False
-        
-        # 2. 處理「不限/未明定」選項（OR 邏輯）
-        has_undetermined = "不限/未明定" in user_degrees_set
-        other_degrees = user_degrees_set - {"不限/未明定"}
-        
-        # 情況 1: 只選「不限/未明定」
-        if has_undetermined and not other_degrees:
-            # 只顯示沒有標註學制的獎學金
-            if group_degrees:
-                return False
-        # 情況 2: 只選具體學制（沒選「不限/未明定」）
-        elif not has_undetermined and other_degrees:
-            # 只顯示有標註且與使用者選擇有交集的獎學金
-            if not group_degrees:
-                return False
-            if not (other_degrees & set(group_degrees)):
-                return False
-        # 情況 3: 同時選「不限/未明定」和具體學制（OR 邏輯）
-        elif has_undetermined and other_degrees:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if group_degrees:
-                # 有標註，檢查是否符合使用者選擇的具體學制
-                if not (other_degrees & set(group_degrees)):
-                    return False
-            # 沒有標註的會通過（符合「不限/未明定」）
-    
-    # 年級檢查（精確匹配邏輯）
-    if filters.get("年級"):
-        group_grades = extract_tags_from_group(group, "年級")
-        excluded_grades = extract_excluded_tags_from_group(group, "年級")
-        
-        user_grades = filters["年級"]  # 這已經是列表了，不需要再包裝
-        user_grades_set = set(user_grades)
-        excluded_set = set(excluded_grades)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        # 只有當使用者選擇的所有選項都在排除列表中時，才排除
-        non_excluded_grades = user_grades_set - excluded_set
-        if not non_excluded_grades:
-            # 使用者選擇的所有年級都在排除列表中，不顯示
-            return False
-        
-        # 2. 處理「不限/未明定」選項（OR 邏輯）
-        has_undetermined = "不限/未明定" in user_grades_set
-        other_grades = user_grades_set - {"不限/未明定"}
-        
-        # 情況 1: 只選「不限/未明定」
-        if has_undetermined and not other_grades:
-            # 只顯示沒有標註年級的獎學金
-            if group_grades:
-                return False
-        # 情況 2: 只選具體年級（沒選「不限/未明定」）
-        elif not has_undetermined and other_grades:
-            # 只顯示有標註且與使用者選擇有交集的獎學金
-            if not group_grades:
-                return False
-            if not (other_grades & set(group_grades)):
+    if plan is None:
+        for category in FILTER_CATEGORIES:
+            selections = filters.get(category)
+            if selections and not check_category_match(group, category, selections):
                 return False
-        # 情況 3: 同時選「不限/未明定」和具體年級（OR 邏輯）
-        elif has_undetermined and other_grades:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if group_grades:
-                # 有標註，檢查是否符合使用者選擇的具體年級
-                if not (other_grades & set(group_grades)):
-                    return False
-            # 沒有標註的會通過（符合「不限/未明定」）
-    
-    # 學籍狀態檢查（含特殊邏輯和「不限/未明定」）
-    if filters.get("學籍狀態"):
-        group_status = extract_tags_from_group(group, "學籍狀態")
-        excluded_status = extract_excluded_tags_from_group(group, "學籍狀態")
-        
-        user_status_list = filters["學籍狀態"]
-        user_status_set = set(user_status_list)
-        excluded_set = set(excluded_status)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        non_excluded_status = user_status_set - excluded_set
-        if not non_excluded_status:
-            # 使用者選擇的所有學籍狀態都在排除列表中，不顯示
-            return False
-        
-        # 2. 處理「不限/未明定」選項（OR 邏輯）
-        has_undetermined = "不限/未明定" in user_status_set
-        other_status = user_status_set - {"不限/未明定"}
-        
-        # 情況 1: 只選「不限/未明定」
-        if has_undetermined and not other_status:
-            # 只顯示沒有標註學籍狀態的獎學金
-            if group_status:
-                return False
-        # 情況 2: 只選具體學籍狀態（沒選「不限/未明定」）
-        elif not has_undetermined and other_status:
-            # 3. 特殊身份白名單邏輯（延畢生、休學擬復學）
-            user_special = other_status & SPECIAL_STUDENT_STATUS
-            user_normal = other_status - SPECIAL_STUDENT_STATUS
-            
-            # 分別檢查特殊學籍和一般學籍
-            special_match = False
-            normal_match = False
-            
-            if user_special:
-                # 使用者選了特殊學籍（延畢生或休學擬復學）
-                if group_status:
-                    # 獎學金有標註學籍狀態，檢查是否包含特殊學籍
-                    if user_special & set(group_status):
-                        special_match = True
-                # 如果獎學金沒有標註學籍狀態，特殊學籍不符合（預設僅限在學生）
-            
-            if user_normal:
-                # 使用者選了一般學籍
-                if not group_status:
-                    # 獎學金未標註學籍狀態，不顯示
-                    pass  # normal_match 保持 False
-                else:
-                    # 獎學金有標註學籍狀態，檢查是否有交集
-                    if user_normal & set(group_status):
-                        normal_match = True
-            
-            # OR 邏輯：只要特殊學籍或一般學籍有一個符合就顯示
-            if user_special and user_normal:
-                # 同時選了特殊和一般學籍
-                if not (special_match or normal_match):
-                    return False
-            elif user_special:
-                # 只選了特殊學籍
-                if not special_match:
-                    return False
-            elif user_normal:
-                # 只選了一般學籍
-                if not normal_match:
-                    return False
-        # 情況 3: 同時選「不限/未明定」和具體學籍狀態（OR 邏輯）
-        elif has_undetermined and other_status:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if group_status:
-                # 有標註，需要檢查特殊邏輯
-                user_special = other_status & SPECIAL_STUDENT_STATUS
-                
-                if user_special:
-                    # 使用者選了特殊學籍，必須明確包含
-                    if not (user_special & set(group_status)):
-                        return False
-                else:
-                    # 一般學籍，檢查交集
-                    if not (other_status & set(group_status)):
-                        return False
-            # 沒有標註的會通過（符合「不限/未明定」）
-    
-    # 學院檢查（精確匹配邏輯）
-    if filters.get("學院"):
-        group_colleges = extract_tags_from_group(group, "學院")
-        excluded_colleges = extract_excluded_tags_from_group(group, "學院")
-        
-        user_colleges_set = set(filters["學院"])
-        excluded_set = set(excluded_colleges)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        non_excluded_colleges = user_colleges_set - excluded_set
-        if not non_excluded_colleges:
-            # 使用者選擇的所有學院都在排除列表中，不顯示
-            return False
-        
-        # 2. 處理「不限/未明定」選項（OR 邏輯）
-        has_undetermined = "不限/未明定" in user_colleges_set
-        other_colleges = user_colleges_set - {"不限/未明定"}
-        
-        # 將標註「不限」的獎學金視為未標註
-        effective_colleges = [c for c in group_colleges if c != "不限"]
-        
-        # 情況 1: 只選「不限/未明定」
-        if has_undetermined and not other_colleges:
-            # 只顯示沒有標註學院的獎學金（或只標註「不限」的）
-            if effective_colleges:
-                return False
-        # 情況 2: 只選具體學院（沒選「不限/未明定」）
-        elif not has_undetermined and other_colleges:
-            # 只顯示有標註且與使用者選擇有交集的獎學金
-            if not effective_colleges:
+    else:
+        for category in plan.categories:
+            matched = check_category_match(group, category, filters[category])
+            plan.record(category, matched)
+            if not matched:
                 return False
-            if not (other_colleges & set(effective_colleges)):
-                return False
-        # 情況 3: 同時選「不限/未明定」和具體學院（OR 邏輯）
-        elif has_undetermined and other_colleges:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if effective_colleges:
-                # 有標註，檢查是否符合使用者選擇的具體學院
-                if not (other_colleges & set(effective_colleges)):
-                    return False
-            # 沒有標註的會通過（符合「不限/未明定」）
-    
-    # 國籍身分檢查（精確匹配邏輯）
-    if filters.get("國籍身分"):
-        group_identities = extract_tags_from_group(group, "國籍身分")
-        excluded_identities = extract_excluded_tags_from_group(group, "國籍身分")
-        
-        user_identities_set = set(filters["國籍身分"])
-        excluded_set = set(excluded_identities)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        non_excluded_identities = user_identities_set - excluded_set
-        if not non_excluded_identities:
-            # 使用者選擇的所有國籍身分都在排除列表中，不顯示
-            return False
-        
-        # 2. 處理「不限/未明定」選項（OR 邏輯）
-        has_undetermined = "不限/未明定" in user_identities_set
-        other_identities = user_identities_set - {"不限/未明定"}
-        
-        # 將標註「不限」的獎學金視為未標註
-        effective_identities = [i for i in group_identities if i != "不限"]
-        
-        # 情況 1: 只選「不限/未明定」
-        if has_undetermined and not other_identities:
-            # 只顯示沒有標註國籍身分的獎學金（或只標註「不限」的）
-            if effective_identities:
-                return False
-        # 情況 2: 只選具體國籍身分（沒選「不限/未明定」）
-        elif not has_undetermined and other_identities:
-            # 只顯示有標註且與使用者選擇有交集的獎學金
-            if not effective_identities:
-                return False
-            if not (other_identities & set(effective_identities)):
-                return False
-        # 情況 3: 同時選「不限/未明定」和具體國籍身分（OR 邏輯）
-        elif has_undetermined and other_identities:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if effective_identities:
-                # 有標註，檢查是否符合使用者選擇的具體國籍身分
-                if not (other_identities & set(effective_identities)):
-                    return False
-            # 沒有標註的會通過（符合「不限/未明定」）
-    
-    # 設籍地檢查（精確匹配邏輯，支援多選）
-    if filters.get("設籍地"):
-        group_domicile = extract_tags_from_group(group, "設籍地")
-        excluded_domicile = extract_excluded_tags_from_group(group, "設籍地")
-        
-        user_domiciles = filters["設籍地"]  # 這是一個列表
-        user_domiciles_set = set(user_domiciles)
-        excluded_set = set(excluded_domicile)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        non_excluded_domiciles = user_domiciles_set - excluded_set
-        if not non_excluded_domiciles:
-            # 使用者選擇的所有設籍地都在排除列表中，不顯示
-            return False
-        
-        # 2. 處理「不限/未明定」選項（OR 邏輯）
-        has_undetermined = "不限/未明定" in user_domiciles_set
-        other_domiciles = user_domiciles_set - {"不限/未明定"}
-        
-        # 將標註「不限」的獎學金視為未標註
-        effective_domiciles = [d for d in group_domicile if d != "不限"]
-        
-        # 情況 1: 只選「不限/未明定」
-        if has_undetermined and not other_domiciles:
-            # 只顯示沒有標註設籍地的獎學金（或只標註「不限」的）
-            if effective_domiciles:
-                return False
-        # 情況 2: 只選具體設籍地（沒選「不限/未明定」）
-        elif not has_undetermined and other_domiciles:
-            # 只顯示有標註且與使用者選擇有交集的獎學金
-            if not effective_domiciles:
-                return False
-            if not (other_domiciles & set(effective_domiciles)):
-                return False
-        # 情況 3: 同時選「不限/未明定」和具體設籍地（OR 邏輯）
-        elif has_undetermined and other_domiciles:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if effective_domiciles:
-                # 有標註，檢查是否符合使用者選擇的具體設籍地
-                if not (other_domiciles & set(effective_domiciles)):
-                    return False
-            # 沒有標註的會通過（符合「不限/未明定」）
-    
-    # 就讀地檢查（精確匹配邏輯，支援多選）
-    if filters.get("就讀地"):
-        group_study_loc = extract_tags_from_group(group, "就讀地")
-        excluded_study_loc = extract_excluded_tags_from_group(group, "就讀地")
-        
-        user_study_locs = filters["就讀地"]  # 這是一個列表
-        user_study_locs_set = set(user_study_locs)
-        excluded_set = set(excluded_study_loc)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        non_excluded_study_locs = user_study_locs_set - excluded_set
-        if not non_excluded_study_locs:
-            # 使用者選擇的所有就讀地都在排除列表中，不顯示
-            return False
-        
-        # 2. 處理「不限/未明定」選項（OR 邏輯）
-        has_undetermined = "不限/未明定" in user_study_locs_set
-        other_study_locs = user_study_locs_set - {"不限/未明定"}
-        
-        # 將標註「不限」的獎學金視為未標註
-        effective_study_locs = [s for s in group_study_loc if s != "不限"]
-        
-        # 情況 1: 只選「不限/未明定」
-        if has_undetermined and not other_study_locs:
-            # 只顯示沒有標註就讀地的獎學金（或只標註「不限」的）
-            if effective_study_locs:
-                return False
-        # 情況 2: 只選具體就讀地（沒選「不限/未明定」）
-        elif not has_undetermined and other_study_locs:
-            # 只顯示有標註且與使用者選擇有交集的獎學金
-            if not effective_study_locs:
-                return False
-            if not (other_study_locs & set(effective_study_locs)):
-                return False
-        # 情況 3: 同時選「不限/未明定」和具體就讀地（OR 邏輯）
-        elif has_undetermined and other_study_locs:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if effective_study_locs:
-                # 有標註，檢查是否符合使用者選擇的具體就讀地
-                if not (other_study_locs & set(effective_study_locs)):
-                    return False
-            # 沒有標註的會通過（符合「不限/未明定」）
-    
-    # 特殊身份檢查（精確匹配邏輯，支援多選）
-    if filters.get("特殊身份"):
-        group_special = extract_tags_from_group(group, "特殊身份")
-        excluded_special = extract_excluded_tags_from_group(group, "特殊身份")
-        
-        user_special = filters["特殊身份"]  # 這是一個列表
-        user_special_set = set(user_special)
-        excluded_set = set(excluded_special)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        non_excluded_special = user_special_set - excluded_set
-        if not non_excluded_special:
-            # 使用者選擇的所有特殊身份都在排除列表中，不顯示
-            return False
-        
-        # 2. 處理「未提及」選項（OR 邏輯）
-        has_unmentioned = "未提及" in user_special_set
-        other_special = user_special_set - {"未提及"}
-        
-        # 情況 1: 只選「未提及」
-        if has_unmentioned and not other_special:
-            # 只顯示沒有標註特殊身份的獎學金
-            if group_special:
-                return False
-        # 情況 2: 只選具體特殊身份（沒選「未提及」）
-        elif not has_unmentioned and other_special:
-            # 只顯示有標註且與使用者選擇有交集的獎學金
-            if not group_special:
-                return False
-            if not (other_special & set(group_special)):
-                return False
-        # 情況 3: 同時選「未提及」和具體特殊身份（OR 邏輯）
-        elif has_unmentioned and other_special:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if group_special:
-                # 有標註，檢查是否符合使用者選擇的具體特殊身份
-                if not (other_special & set(group_special)):
-                    return False
-            # 沒有標註的會通過（符合「未提及」）
-    
-    # 家庭境遇檢查（精確匹配邏輯，支援多選）
-    if filters.get("家庭境遇"):
-        group_family = extract_tags_from_group(group, "家庭境遇")
-        excluded_family = extract_excluded_tags_from_group(group, "家庭境遇")
-        
-        user_family = filters["家庭境遇"]  # 這是一個列表
-        user_family_set = set(user_family)
-        excluded_set = set(excluded_family)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        non_excluded_family = user_family_set - excluded_set
-        if not non_excluded_family:
-            # 使用者選擇的所有家庭境遇都在排除列表中，不顯示
-            return False
-        
-        # 2. 處理「未提及」選項（OR 邏輯）
-        has_unmentioned = "未提及" in user_family_set
-        other_family = user_family_set - {"未提及"}
-        
-        # 情況 1: 只選「未提及」
-        if has_unmentioned and not other_family:
-            # 只顯示沒有標註家庭境遇的獎學金
-            if group_family:
-                return False
-        # 情況 2: 只選具體家庭境遇（沒選「未提及」）
-        elif not has_unmentioned and other_family:
-            # 只顯示有標註且與使用者選擇有交集的獎學金
-            if not group_family:
-                return False
-            if not (other_family & set(group_family)):
-                return False
-        # 情況 3: 同時選「未提及」和具體家庭境遇（OR 邏輯）
-        elif has_unmentioned and other_family:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if group_family:
-                # 有標註，檢查是否符合使用者選擇的具體家庭境遇
-                if not (other_family & set(group_family)):
-                    return False
-            # 沒有標註的會通過（符合「未提及」）
     
+    scores = filters.get("學業成績")
+    return not scores or check_academic_match(group, scores)
+
+
+def iter_match_groups(scholarship: Dict):
+    """
+    產生獎學金實際用來比對的 group（每個 group 皆已結合 common_tags）
     
-    # 經濟相關證明檢查（精確匹配邏輯，支援多選）
-    if filters.get("經濟相關證明"):
-        group_economic = extract_tags_from_group(group, "經濟相關證明")
-        excluded_economic = extract_excluded_tags_from_group(group, "經濟相關證明")
-        
-        user_economic = filters["經濟相關證明"]  # 這是一個列表
-        user_economic_set = set(user_economic)
-        excluded_set = set(excluded_economic)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        non_excluded_economic = user_economic_set - excluded_set
-        if not non_excluded_economic:
-            # 使用者選擇的所有經濟相關證明都在排除列表中，不顯示
-            return False
-        
-        # 2. 處理「未提及」選項（OR 邏輯）
-        has_unmentioned = "未提及" in user_economic_set
-        other_economic = user_economic_set - {"未提及"}
-        
-        # 情況 1: 只選「未提及」
-        if has_unmentioned and not other_economic:
-            # 只顯示沒有標註經濟相關證明的獎學金
-            if group_economic:
-                return False
-        # 情況 2: 只選具體經濟相關證明（沒選「未提及」）
-        elif not has_unmentioned and other_economic:
-            # 只顯示有標註且與使用者選擇有交集的獎學金
-            if not group_economic:
-                return False
-            if not (other_economic & set(group_economic)):
-                return False
-        # 情況 3: 同時選「未提及」和具體經濟相關證明（OR 邏輯）
-        elif has_unmentioned and other_economic:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if group_economic:
-                # 有標註，檢查是否符合使用者選擇的具體經濟相關證明
-                if not (other_economic & set(group_economic)):
-                    return False
-            # 沒有標註的會通過（符合「未提及」）
+    Args:
+        scholarship (Dict): 獎學金完整資料
     
-    # 補助/獎學金排斥檢查（精確匹配邏輯，支援多選）
-    if filters.get("補助/獎學金排斥"):
-        group_exclusion = extract_tags_from_group(group, "補助/獎學金排斥")
-        excluded_exclusion = extract_excluded_tags_from_group(group, "補助/獎學金排斥")
-        
-        user_exclusion = filters["補助/獎學金排斥"]  # 這是一個列表
-        user_exclusion_set = set(user_exclusion)
-        excluded_set = set(excluded_exclusion)
-        
-        # 1. 檢查排除條件（改進邏輯）
-        non_excluded_exclusion = user_exclusion_set - excluded_set
-        if not non_excluded_exclusion:
-            # 使用者選擇的所有選項都在排除列表中，不顯示
-            return False
+    Yields:
+        Dict: 包含 requirements 列表的 group
         
-        # 2. 處理「未提及」選項（OR 邏輯）
-        has_unmentioned = "未提及" in user_exclusion_set
-        other_exclusion = user_exclusion_set - {"未提及"}
-        
-        # 情況 1: 只選「未提及」
-        if has_unmentioned and not other_exclusion:
-            # 只顯示沒有標註補助/獎學金排斥的獎學金
-            if group_exclusion:
-                return False
-        # 情況 2: 只選具體選項（沒選「未提及」）
-        elif not has_unmentioned and other_exclusion:
-            # 只顯示有標註且與使用者選擇有交集的獎學金
-            if not group_exclusion:
-                return False
-            if not (other_exclusion & set(group_exclusion)):
-                return False
-        # 情況 3: 同時選「未提及」和具體選項（OR 邏輯）
-        elif has_unmentioned and other_exclusion:
-            # 顯示：沒有標註的 OR 有標註且符合的
-            if group_exclusion:
-                # 有標註，檢查是否符合使用者選擇的具體選項
-                if not (other_exclusion & set(group_exclusion)):
-                    return False
-            # 沒有標註的會通過（符合「未提及」）
+    Note:
+        - 如果沒有 groups，只產生一個由 common_tags 組成的 pseudo_group
+    """
+    groups = scholarship.get("tags", {}).get("groups", [])
+    common_tags = scholarship.get("tags", {}).get("common_tags", [])
     
+    # 如果沒有 groups，使用 common_tags 建立 pseudo_group
+    if not groups:
+        yield {"requirements": common_tags}
+        return
     
-    return True
+    for group in groups:
+        yield {"requirements": group.get("requirements", []) + common_tags}
+
+
+def check_keyword_match(scholarship: Dict, keyword: str) -> bool:
+    """
+    關鍵字搜尋：在獎學金名稱和資格條件中搜尋
 
+    Note:
+        - 不區分大小寫、全半形，繁簡體與異體字（台/臺）視為相同
+        - 較長的關鍵字容許少量錯字（見 search_index.py）
+    """
+    return keyword_matches(scholarship, keyword)
 
-def check_scholarship_match(scholarship: Dict, filters: Dict) -> bool:
+
+def check_scholarship_match(scholarship: Dict, filters: Dict, plan=None, funnel=None) -> bool:
     """
     檢查獎學金是否符合使用者的篩選條件（最上層的過濾函數）
     
@@ -849,40 +621,126 @@ def check_scholarship_match(scholarship: Dict, filters: Dict) -> bool:
     Args:
         scholarship (Dict): 獎學金完整資料
         filters (Dict): 使用者在 sidebar 選擇的篩選條件字典
+        plan (QueryPlan, optional): 查詢計畫，見 check_group_match
+        funnel (RejectionFunnel, optional): 淘汰漏斗計數器（見 rejection_funnel.py），
+            提供時會檢查所有 group 並記錄每個條件淘汰的 group 與獎學金數；未提供時沒有額外開銷
     
     Returns:
         bool: 如果獎學金符合篩選條件則返回 True，否則返回 False
         
     Note:
-        - 關鍵字搜尋不區分大小寫
+        - 關鍵字搜尋不區分大小寫與繁簡體，見 check_keyword_match
         - 獎學金只要有一個 group 符合條件即可顯示（OR 邏輯）
     """
+    if funnel is not None:
+        return _check_scholarship_with_funnel(scholarship, filters, funnel)
+
     # 關鍵字搜尋
-    if filters.get("keyword"):
-        keyword = filters["keyword"].lower()
-        searchable_text = f"{scholarship.get('scholarship_name', '')} {scholarship.get('eligibility', '')}".lower()
-        if keyword not in searchable_text:
-            return False
-    
-    groups = scholarship.get("tags", {}).get("groups", [])
-    common_tags = scholarship.get("tags", {}).get("common_tags", [])
-    
-    # 如果沒有 groups，使用 common_tags 建立 pseudo_group
-    if not groups:
-        pseudo_group = {"requirements": common_tags}
-        return check_group_match(pseudo_group, filters)
+    if filters.get("keyword") and not check_keyword_match(scholarship, filters["keyword"]):
+        return False
     
-    # 檢查每個 group（結合 common_tags）
-    for group in groups:
-        combined_group = {
-            "requirements": group.get("requirements", []) + common_tags
-        }
-        if check_group_match(combined_group, filters):
+    for group in iter_match_groups(scholarship):
+        if check_group_match(group, filters, plan):
             return True
     
     return False
 
 
+def _check_scholarship_with_funnel(scholarship: Dict, filters: Dict, funnel) -> bool:
+    """
+    check_scholarship_match 的計數版本：依 funnel.categories 的順序檢查每個 group
+
+    Note:
+        - 不在第一個符合的 group 停止，每個 group 都記錄淘汰它的第一個類別
+        - 學業成績門檻是類別之後的最後一個 group 階段（ACADEMIC_STAGE）
+        - 不符合的獎學金歸給「走得最遠」的 group 被淘汰的階段，
+          因此第 k 階段之後剩下的獎學金 = 至少有一個 group 通過前 k 個階段的獎學金
+    """
+    if filters.get("keyword") and not check_keyword_match(scholarship, filters["keyword"]):
+        funnel.record_scholarship(KEYWORD_STAGE)
+        return False
+
+    scores = filters.get("學業成績") or {}
+    stages = funnel.categories + [ACADEMIC_STAGE]
+    furthest = -1
+    for group in iter_match_groups(scholarship):
+        for stage, category in enumerate(funnel.categories):
+            start = funnel.clock()
+            matched = check_category_match(group, category, filters[category])
+            funnel.record_group(category, matched, funnel.clock() - start)
+            if not matched:
+                furthest = max(furthest, stage)
+                break
+        else:
+            if check_academic_match(group, scores):
+                funnel.record_scholarship(None)
+                return True
+            furthest = len(funnel.categories)
+    funnel.record_scholarship(stages[furthest])
+    return False
+
+
+def canonicalize_filters(filters: Dict) -> Dict:
+    """
+    將篩選條件字典轉換為標準形式（只保留有效條件，多選值排序）
+    
+    Args:
+        filters (Dict): 使用者在 sidebar 選擇的篩選條件字典
+    
+    Returns:
+        Dict: 標準化的篩選條件；語意相同的篩選條件會得到相同的結果
+        
+    Note:
+        - 用於查詢紀錄、快取鍵等需要比較篩選條件的地方
+        - 空的多選、空字串關鍵字、未填寫的成績都會被移除
+    """
+    canonical = {}
+    if filters.get("keyword"):
+        canonical["keyword"] = filters["keyword"]
+    if filters.get("exclude_undetermined_amount"):
+        canonical["exclude_undetermined_amount"] = True
+    for category in FILTER_CATEGORIES:
+        if filters.get(category):
+            canonical[category] = sorted(set(filters[category]))
+    scores = {k: v for k, v in (filters.get("學業成績") or {}).items() if v is not None}
+    if scores:
+        canonical["學業成績"] = dict(sorted(scores.items()))
+    return canonical
+
+
+def filter_cache_key(filters: Dict) -> str:
+    """
+    將篩選條件編碼為精簡的查詢字串，同時作為分享網址的參數與伺服器端快取鍵
+    
+    Args:
+        filters (Dict): 篩選條件字典（原始或已標準化皆可）
+    
+    Returns:
+        str: 標準化篩選條件的查詢字串，例如 deg=碩士&college=工學院&econ=低收入戶（已做 URL 編碼）
+        
+    Note:
+        - 參數依 FILTER_PARAM_NAMES、SCORE_PARAM_NAMES 的固定順序排列，多選值以逗號連接
+        - 語意相同的篩選條件一定得到相同的字串
+    """
+    canonical = canonicalize_filters(filters)
+    pairs = []
+    for field, param in FILTER_PARAM_NAMES.items():
+        if field not in canonical:
+            continue
+        value = canonical[field]
+        if field == "exclude_undetermined_amount":
+            pairs.append((param, "1"))
+        elif field == "keyword":
+            pairs.append((param, value))
+        else:
+            pairs.append((param, ",".join(value)))
+    for metric, param in SCORE_PARAM_NAMES.items():
+        score = canonical.get("學業成績", {}).get(metric)
+        if score is not None:
+            pairs.append((param, repr(float(score))))
+    return urlencode(pairs)
+
+
 # ==================== 金額與名額過濾 ====================
 
 def scholarship_amount_quota_filter(scholarship, amount_range, quota_range):
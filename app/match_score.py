@@ -0,0 +1,125 @@
+"""
+「最符合」排序：依資格條件的針對性評分（選用，需要 NumPy）
+
+篩選只有符合 / 不符合兩種結果；勾選多個特殊身份或經濟條件的學生會拿到一堆沒有先後的結果。
+本模組為每筆獎學金打分數，把「明確針對所選條件」的獎學金排在前面：
+
+    分數 = Σ 類別權重 × [獎學金明確列出所選的某個值]
+         + AMOUNT_WEIGHT × 金額特徵 + URGENCY_WEIGHT × 截止急迫度
+
+- 明確列出：任一比對 group（已結合 common_tags）的包含標籤中有該值；「不限」「未提及」等值不計分
+- 家庭境遇、經濟相關證明的權重大於金額與急迫度的總和，因此明確符合一定排在未標註而通過的獎學金之前
+- 金額特徵：log(1 + 最低金額) 以語料最大值正規化到 [0, 1]，金額未定為 0
+- 截止急迫度：1 / (1 + 剩餘天數 / URGENCY_DAYS)，已截止或日期未定為 0
+
+所有特徵在語料載入時預先計算成欄位，排序時只做向量化的加權總和與一次 argsort。
+"""
+
+import datetime
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from filters import iter_match_groups, extract_tags_from_group
+from utils import get_min_amount_and_quota, get_end_date
+
+
+# ==================== 配置 ====================
+
+CATEGORY_WEIGHTS = {
+    "家庭境遇": 3.0,
+    "經濟相關證明": 3.0,
+    "特殊身份": 2.0,
+    "學院": 1.0,
+    "設籍地": 1.0,
+    "就讀地": 1.0,
+    "國籍身分": 0.5,
+    "學制": 0.5,
+    "年級": 0.5,
+    "學籍狀態": 0.5,
+}
+AMOUNT_WEIGHT = 1.0
+URGENCY_WEIGHT = 1.0
+URGENCY_DAYS = 14
+
+# 不代表針對性的選項
+NON_SPECIFIC_VALUES = {"不限/未明定", "不限", "未提及", "其他"}
+
+
+# ==================== 評分 ====================
+
+class MatchScorer:
+    """
+    以預先計算的特徵欄位為篩選結果評分（所有 session 共用，搭配 st.cache_resource）
+
+    Attributes:
+        columns (Dict[tuple, int]): (類別, 值) → 欄位索引
+        explicit (np.ndarray): 獎學金 × 欄位 的明確列出矩陣
+        amount (np.ndarray): 金額特徵（0 ~ 1）
+        end_ordinal (np.ndarray): 截止日期的 ordinal，未定為 -1
+    """
+
+    def __init__(self, scholarships: List[Dict]):
+        self.columns = {}
+        cells = []
+        amounts, end_ordinals = [], []
+        for position, scholarship in enumerate(scholarships):
+            for group in iter_match_groups(scholarship):
+                for category in CATEGORY_WEIGHTS:
+                    for value in extract_tags_from_group(group, category):
+                        if value not in NON_SPECIFIC_VALUES:
+                            column = self.columns.setdefault((category, value), len(self.columns))
+                            cells.append((position, column))
+            min_amount, _ = get_min_amount_and_quota(scholarship)
+            amounts.append(math.log1p(min_amount) if min_amount and min_amount > 0 else 0.0)
+            end_date = get_end_date(scholarship)
+            end_ordinals.append(end_date.toordinal() if end_date is not None else -1)
+
+        self.explicit = np.zeros((len(scholarships), max(len(self.columns), 1)), dtype=bool, order="F")
+        if cells:
+            rows, cols = zip(*cells)
+            self.explicit[list(rows), list(cols)] = True
+
+        amount = np.asarray(amounts, dtype=np.float32)
+        self.amount = amount / amount.max() if len(amount) and amount.max() > 0 else amount
+        self.end_ordinal = np.asarray(end_ordinals, dtype=np.int64)
+
+    def scores(self, indices: Sequence[int], filters: Dict, today: Optional[datetime.date] = None) -> np.ndarray:
+        """
+        計算篩選結果的分數
+
+        Args:
+            indices (Sequence[int]): 篩選結果（獎學金在語料中的位置）
+            filters (Dict): 篩選條件
+            today (Optional[datetime.date]): 計算急迫度的基準日（預設今天）
+
+        Returns:
+            np.ndarray: 與 indices 對應的分數
+        """
+        positions = np.asarray(indices, dtype=np.intp)
+        score = np.zeros(len(positions), dtype=np.float32)
+
+        for category, weight in CATEGORY_WEIGHTS.items():
+            cols = [self.columns[(category, v)] for v in filters.get(category) or [] if (category, v) in self.columns]
+            if cols:
+                score += weight * self.explicit[positions[:, None], cols].any(axis=1)
+
+        score += AMOUNT_WEIGHT * self.amount[positions]
+
+        today_ordinal = (today or datetime.date.today()).toordinal()
+        days = self.end_ordinal[positions] - today_ordinal
+        upcoming = (self.end_ordinal[positions] >= 0) & (days >= 0)
+        score += URGENCY_WEIGHT * np.where(upcoming, 1.0 / (1.0 + np.maximum(days, 0) / URGENCY_DAYS), 0.0).astype(np.float32)
+        return score
+
+    def order(self, indices: Sequence[int], filters: Dict, descending: bool = True) -> np.ndarray:
+        """
+        依分數排序篩選結果（同分時保持語料順序，與其他排序方式一致）
+
+        Returns:
+            np.ndarray: 排序後的獎學金位置
+        """
+        score = self.scores(indices, filters)
+        ranking = np.argsort(-score if descending else score, kind="stable")
+        return np.asarray(indices, dtype=np.intp)[ranking]
@@ -0,0 +1,193 @@
+"""
+NumPy one-hot 篩選引擎（選用）
+
+將每個比對用 group（見 filters.iter_match_groups）編碼為布林矩陣的一列：
+- included[g, c]：group g 的包含標籤中有欄位 c 的 (類別, 值)
+- excluded[g, c]：group g 的否定條件中有欄位 c 的 (類別, 值)
+- unlabeled[g, k]：group g 未標註類別 k（學院等類別的「不限」視為未標註）
+
+篩選條件字典會被編譯為欄位選擇，再以向量化的 any/all 運算求出符合的 group；
+學業成績門檻以 academic_index.AcademicIndex 找出不符合的 group 一併排除，
+最後以 np.maximum.reduceat 依 group → 獎學金的 offsets 合併。關鍵字以 search_index.SearchIndex
+的 posting list（字元集合預先過濾，查詢結果跨 session 快取）轉為遮罩。結果與
+filters.check_scholarship_match 完全一致。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from filters import (
+    FILTER_CATEGORIES, UNMENTIONED_FIELDS, UNLIMITED_AS_UNLABELED_FIELDS, SPECIAL_STUDENT_STATUS,
+    extract_tags_from_group, extract_excluded_tags_from_group, iter_match_groups, check_undetermined_amount
+)
+from academic_index import AcademicIndex
+from search_index import SearchIndex
+
+
+# 每個引擎最多快取的類別遮罩數
+MAX_CACHED_MASKS = 256
+
+
+class MatrixFilterEngine:
+    """
+    以 one-hot 資格矩陣執行篩選的引擎
+
+    Attributes:
+        columns (Dict[tuple, int]): (類別, 值) → 欄位索引
+        included (np.ndarray): groups × 欄位 的包含標籤矩陣
+        excluded (np.ndarray): groups × 欄位 的排除標籤矩陣
+        unlabeled (np.ndarray): groups × 類別 的未標註矩陣
+        offsets (np.ndarray): 每筆獎學金第一個 group 的列索引
+        search_index (SearchIndex): 關鍵字搜尋索引
+        academic_index (AcademicIndex): 學業成績門檻索引（group 編號與矩陣列相同）
+    """
+
+    def __init__(self, scholarships: List[Dict], search_index: Optional[SearchIndex] = None,
+                 academic_index: Optional[AcademicIndex] = None):
+        """
+        Args:
+            scholarships (List[Dict]): 獎學金資料列表
+            search_index (Optional[SearchIndex]): 同一份語料的搜尋索引（app 傳入與 python 引擎共用的索引），預設自行建立
+            academic_index (Optional[AcademicIndex]): 同一份語料的學業成績索引，預設自行建立
+        """
+        self.columns = {}
+        included_cells, excluded_cells, unlabeled_cells = [], [], []
+        offsets, undetermined = [], []
+
+        row = 0
+        for scholarship in scholarships:
+            offsets.append(row)
+            undetermined.append(check_undetermined_amount(scholarship))
+            for group in iter_match_groups(scholarship):
+                for k, category in enumerate(FILTER_CATEGORIES):
+                    values = set(extract_tags_from_group(group, category))
+                    for value in values:
+                        included_cells.append((row, self._column(category, value)))
+                    if category in UNLIMITED_AS_UNLABELED_FIELDS:
+                        values.discard("不限")
+                    if not values:
+                        unlabeled_cells.append((row, k))
+                    for value in set(extract_excluded_tags_from_group(group, category)):
+                        excluded_cells.append((row, self._column(category, value)))
+                row += 1
+
+        # 以 Fortran order 儲存，篩選時逐欄取用較快
+        self.included = self._build_matrix(row, len(self.columns), included_cells)
+        self.excluded = self._build_matrix(row, len(self.columns), excluded_cells)
+        self.unlabeled = self._build_matrix(row, len(FILTER_CATEGORIES), unlabeled_cells)
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+        self.search_index = search_index or SearchIndex(scholarships)
+        self.academic_index = academic_index or AcademicIndex(scholarships)
+        self.undetermined = np.asarray(undetermined, dtype=bool)
+        # 類別遮罩快取隨引擎一起釋放（st.cache_resource 淘汰引擎後不會被全域快取留住）
+        self._mask_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _column(self, category: str, value: str) -> int:
+        return self.columns.setdefault((category, value), len(self.columns))
+
+    @staticmethod
+    def _build_matrix(n_rows: int, n_cols: int, cells: List[tuple]) -> np.ndarray:
+        matrix = np.zeros((n_rows, n_cols), dtype=bool, order="F")
+        if cells:
+            rows, cols = np.asarray(cells, dtype=np.intp).T
+            matrix[rows, cols] = True
+        return matrix
+
+    def _select(self, category: str, values) -> List[int]:
+        """將 (類別, 值) 編譯為欄位索引（語料中未出現的值沒有欄位，一律不符合）"""
+        return [self.columns[(category, v)] for v in values if (category, v) in self.columns]
+
+    def _category_mask(self, category: str, key: tuple) -> np.ndarray:
+        """
+        取得單一類別的 group 遮罩
+
+        Note:
+            - 以 (類別, 排序後的選擇) 快取；輸入關鍵字時類別遮罩不需重算
+        """
+        cache_key = (category, key)
+        with self._lock:
+            cached = self._mask_cache.get(cache_key)
+            if cached is not None:
+                self._mask_cache.move_to_end(cache_key)
+                return cached
+        mask = self._compute_category_mask(category, key)
+        with self._lock:
+            self._mask_cache[cache_key] = mask
+            while len(self._mask_cache) > MAX_CACHED_MASKS:
+                self._mask_cache.popitem(last=False)
+        return mask
+
+    def _compute_category_mask(self, category: str, key: tuple) -> np.ndarray:
+        """計算單一類別的 group 遮罩（語意與 filters.check_category_match 相同）"""
+        user_set = set(key)
+
+        # 1. 排除條件：使用者選擇的所有選項都在排除列表中時不顯示
+        excluded_count = self.excluded[:, self._select(category, user_set)].sum(axis=1)
+        mask = excluded_count < len(user_set)
+
+        # 2. 處理「不限/未明定」或「未提及」選項（OR 邏輯）
+        marker = "未提及" if category in UNMENTIONED_FIELDS else "不限/未明定"
+        has_marker = marker in user_set
+        other_values = user_set - {marker}
+        if category == "學籍狀態" and has_marker and other_values & SPECIAL_STUDENT_STATUS:
+            # 特殊學籍（延畢生、休學擬復學）必須明確標註
+            other_values = other_values & SPECIAL_STUDENT_STATUS
+
+        unlabeled = self.unlabeled[:, FILTER_CATEGORIES.index(category)]
+        matched = self.included[:, self._select(category, other_values)].any(axis=1)
+        if has_marker and not other_values:
+            mask &= unlabeled
+        elif not has_marker:
+            mask &= matched
+        else:
+            mask &= unlabeled | matched
+        mask.flags.writeable = False
+        return mask
+
+    def match_mask(self, filters: Dict) -> np.ndarray:
+        """
+        Args:
+            filters (Dict): 使用者在 sidebar 選擇的篩選條件字典
+
+        Returns:
+            np.ndarray: 長度為獎學金數的布林遮罩
+        """
+        group_mask = np.ones(self.included.shape[0], dtype=bool)
+        for category in FILTER_CATEGORIES:
+            if filters.get(category):
+                group_mask &= self._category_mask(category, tuple(sorted(filters[category])))
+
+        # 學業成績門檻與類別條件必須由同一個 group 符合
+        scores = filters.get("學業成績")
+        if scores:
+            failing = self.academic_index.failing_groups(scores)
+            if failing:
+                group_mask[list(failing)] = False
+
+        # 只要有任一 group 符合即可顯示
+        if len(self.offsets):
+            mask = np.maximum.reduceat(group_mask, self.offsets)
+        else:
+            mask = np.zeros(0, dtype=bool)
+
+        if filters.get("exclude_undetermined_amount"):
+            mask &= ~self.undetermined
+        if filters.get("keyword"):
+            keyword_mask = np.zeros(len(mask), dtype=bool)
+            keyword_mask[self.search_index.search(filters["keyword"])] = True
+            mask &= keyword_mask
+        return mask
+
+    def filter_indices(self, filters: Dict) -> List[int]:
+        """
+        Args:
+            filters (Dict): 使用者在 sidebar 選擇的篩選條件字典
+
+        Returns:
+            List[int]: 符合條件的獎學金在語料中的位置（依語料順序）
+        """
+        return np.flatnonzero(self.match_mask(filters)).tolist()
@@ -0,0 +1,315 @@
+"""
+已儲存的篩選條件設定檔與「新符合」通知
+
+學生可以把 sidebar 的篩選條件存成設定檔（保存在本機 SQLite），下次直接載入。
+設定檔屬於建立它的瀏覽器（owner 為 app 存在 cookie 中的隨機代碼），其他學生看不到也無法覆寫。
+爬蟲每週更新語料後，只把新增或內容有變動的獎學金拿來和設定檔比對，
+產生每個設定檔的「新符合」清單，而不是把每個設定檔對整份語料重新篩選一次。
+
+反向比對索引（ProfileIndex）：
+- 以 (類別, 選擇值組合) 將設定檔分組，例如 ("學制", ("碩士",)) → {設定檔 1, 3, 8}
+- 比對一筆獎學金時，每個 group 對每個「不同的選擇值組合」只呼叫一次
+  filters.check_category_match，不通過的組合整批淘汰對應的設定檔
+- 通過類別條件的候選設定檔，再以 check_scholarship_match 等完整檢查確認（關鍵字、學業成績、金額未定）
+
+資料表：
+- profiles：設定檔擁有者、名稱、標準化的篩選條件（JSON）與資料範圍（分割區 ID 的 JSON 列表，空列表為預設檢視）；
+  名稱只在同一擁有者內唯一。「新符合」一律以預設檢視（目前學年度）的語料計算
+- scholarship_fingerprints：每筆獎學金內容的雜湊，用來找出新增或變動的獎學金
+- profile_matches：設定檔的符合紀錄（seen = 0 表示尚未看過的新符合）
+
+使用方式（語料更新後執行，也會在 app 啟動時自動執行）：
+    python app/profiles.py --input data/merged/scholarships_merged_300.json --db-file data/profiles.db
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Sequence, Set, Tuple
+
+from filters import (
+    FILTER_CATEGORIES, canonicalize_filters, check_category_match, check_scholarship_match,
+    check_undetermined_amount, iter_match_groups
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    profile_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    filters TEXT NOT NULL,
+    partitions TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (owner, name)
+);
+CREATE TABLE IF NOT EXISTS scholarship_fingerprints (
+    scholarship_id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profile_matches (
+    profile_id INTEGER NOT NULL,
+    scholarship_id TEXT NOT NULL,
+    matched_at TEXT NOT NULL,
+    seen INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile_id, scholarship_id)
+);
+CREATE INDEX IF NOT EXISTS idx_profile_matches_unseen ON profile_matches(profile_id, seen);
+"""
+
+DEFAULT_DB_FILE = "data/profiles.db"
+
+# 離線計算的衍生欄位（重新計算時不視為獎學金內容變動）
+DERIVED_FIELDS = ("similar_scholarships",)
+
+
+def fingerprint(scholarship: Dict) -> str:
+    """獎學金內容的雜湊（任何欄位變動都會改變；離線衍生的欄位不計入）"""
+    content = {k: v for k, v in scholarship.items() if k not in DERIVED_FIELDS}
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def matches_profile(scholarship: Dict, filters: Dict) -> bool:
+    """
+    完整檢查一筆獎學金是否符合設定檔的篩選條件（與 app 的篩選結果一致）
+
+    Args:
+        scholarship (Dict): 獎學金資料
+        filters (Dict): 標準化的篩選條件（學業成績門檻由 check_scholarship_match 逐 group 檢查）
+    """
+    if not check_scholarship_match(scholarship, filters):
+        return False
+    return not (filters.get("exclude_undetermined_amount") and check_undetermined_amount(scholarship))
+
+
+# ==================== 反向比對索引 ====================
+
+class ProfileIndex:
+    """
+    以類別條件分組的設定檔索引，用來找出可能符合某筆獎學金的設定檔
+    """
+
+    def __init__(self, profiles: Dict[int, Dict]):
+        """
+        Args:
+            profiles (Dict[int, Dict]): 設定檔 id → 標準化的篩選條件
+        """
+        self.profiles = profiles
+        # 類別 → 選擇值組合 → 設定檔 id
+        self.by_constraint: Dict[str, Dict[Tuple[str, ...], Set[int]]] = defaultdict(lambda: defaultdict(set))
+        for profile_id, filters in profiles.items():
+            for category in FILTER_CATEGORIES:
+                if filters.get(category):
+                    self.by_constraint[category][tuple(filters[category])].add(profile_id)
+
+    def candidates(self, scholarship: Dict) -> Set[int]:
+        """
+        找出類別條件符合的設定檔（只評估每個不同的選擇值組合一次）
+
+        Returns:
+            Set[int]: 至少有一個 group 通過所有類別條件的設定檔 id
+        """
+        all_ids = set(self.profiles)
+        matched = set()
+        for group in iter_match_groups(scholarship):
+            remaining = all_ids - matched
+            if not remaining:
+                break
+            for category, selection_sets in self.by_constraint.items():
+                for selections, profile_ids in selection_sets.items():
+                    if remaining.isdisjoint(profile_ids):
+                        continue
+                    if not check_category_match(group, category, list(selections)):
+                        remaining -= profile_ids
+                if not remaining:
+                    break
+            matched |= remaining
+        return matched
+
+    def match(self, scholarships: List[Dict]) -> Dict[int, List[str]]:
+        """
+        將一批（新增或變動的）獎學金與所有設定檔比對
+
+        Returns:
+            Dict[int, List[str]]: 設定檔 id → 符合的獎學金 id
+        """
+        result = defaultdict(list)
+        for scholarship in scholarships:
+            for profile_id in self.candidates(scholarship):
+                if matches_profile(scholarship, self.profiles[profile_id]):
+                    result[profile_id].append(str(scholarship.get("id")))
+        return dict(result)
+
+
+# ==================== 設定檔儲存 ====================
+
+class ProfileStore:
+    """
+    SQLite 設定檔儲存（所有 session 共用，搭配 st.cache_resource；寫入以 lock 保護）
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_FILE):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS changed_ids (scholarship_id TEXT PRIMARY KEY)")
+        self.lock = threading.Lock()
+
+    def _now(self) -> str:
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime())
+
+    def load_profiles(self) -> Dict[int, Dict]:
+        """所有設定檔：id → 標準化的篩選條件"""
+        with self.lock:
+            rows = self.conn.execute("SELECT profile_id, filters FROM profiles").fetchall()
+        return {profile_id: json.loads(filters) for profile_id, filters in rows}
+
+    def list_profiles(self, owner: str) -> List[Dict]:
+        """
+        列出擁有者的設定檔與尚未看過的新符合數
+
+        Args:
+            owner (str): 設定檔擁有者（瀏覽器代碼）
+
+        Returns:
+            List[Dict]: [{"profile_id", "name", "filters", "partitions", "new_matches"}, ...]（依名稱排序）
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                """
+                SELECT p.profile_id, p.name, p.filters, p.partitions, COUNT(m.scholarship_id)
+                FROM profiles p LEFT JOIN profile_matches m ON m.profile_id = p.profile_id AND m.seen = 0
+                WHERE p.owner = ?
+                GROUP BY p.profile_id ORDER BY p.name
+                """,
+                (owner,)
+            ).fetchall()
+        return [
+            {"profile_id": pid, "name": name, "filters": json.loads(filters), "partitions": json.loads(partitions), "new_matches": count}
+            for pid, name, filters, partitions, count in rows
+        ]
+
+    def save_profile(self, owner: str, name: str, filters: Dict, current_matches: List[str], partitions: Sequence[str] = ()) -> int:
+        """
+        新增或覆寫設定檔；目前已符合的獎學金記為已看過，之後語料更新才會出現「新符合」
+
+        Args:
+            owner (str): 設定檔擁有者（只會覆寫同一擁有者的同名設定檔）
+            name (str): 設定檔名稱
+            filters (Dict): 篩選條件（會先標準化）
+            current_matches (List[str]): 目前語料中符合的獎學金 id（即 app 當下的篩選結果）
+            partitions (Sequence[str]): 預設檢視以外的資料範圍（選擇預設檢視時為空）
+
+        Returns:
+            int: 設定檔 id
+        """
+        canonical = canonicalize_filters(filters)
+        now = self._now()
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO profiles (owner, name, filters, partitions, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(owner, name) DO UPDATE SET
+                    filters = excluded.filters, partitions = excluded.partitions, updated_at = excluded.updated_at
+                """,
+                (owner, name, json.dumps(canonical, ensure_ascii=False), json.dumps(list(partitions)), now, now)
+            )
+            profile_id = self.conn.execute("SELECT profile_id FROM profiles WHERE owner = ? AND name = ?", (owner, name)).fetchone()[0]
+            self.conn.execute("DELETE FROM profile_matches WHERE profile_id = ?", (profile_id,))
+            self.conn.executemany(
+                "INSERT INTO profile_matches (profile_id, scholarship_id, matched_at, seen) VALUES (?, ?, ?, 1)",
+                [(profile_id, str(sid), now) for sid in current_matches]
+            )
+        return profile_id
+
+    def delete_profile(self, owner: str, profile_id: int):
+        with self.lock, self.conn:
+            if self.conn.execute("DELETE FROM profiles WHERE profile_id = ? AND owner = ?", (profile_id, owner)).rowcount:
+                self.conn.execute("DELETE FROM profile_matches WHERE profile_id = ?", (profile_id,))
+
+    def new_matches(self, owner: str, profile_id: int) -> List[str]:
+        """擁有者的設定檔尚未看過的新符合獎學金 id（依比對時間排序；不是該擁有者的設定檔時為空）"""
+        with self.lock:
+            rows = self.conn.execute(
+                """
+                SELECT m.scholarship_id FROM profile_matches m JOIN profiles p ON p.profile_id = m.profile_id
+                WHERE m.profile_id = ? AND p.owner = ? AND m.seen = 0 ORDER BY m.matched_at, m.scholarship_id
+                """,
+                (profile_id, owner)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def mark_seen(self, owner: str, profile_id: int):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE profile_matches SET seen = 1 WHERE profile_id = (SELECT profile_id FROM profiles WHERE profile_id = ? AND owner = ?)",
+                (profile_id, owner)
+            )
+
+    def sync_corpus(self, scholarships: List[Dict]) -> Dict[str, int]:
+        """
+        與目前語料同步：找出新增或變動的獎學金，只拿這些獎學金比對設定檔索引
+
+        Args:
+            scholarships (List[Dict]): 目前的語料
+
+        Returns:
+            Dict[str, int]: {"changed": 新增或變動的獎學金數, "new_matches": 新增的符合紀錄數}
+
+        Note:
+            - 第一次同步（沒有任何指紋）只記錄指紋，不產生新符合
+            - 變動後仍符合、且之前已看過的獎學金不會重新通知
+            - 變動的獎學金 id 寫入暫存表再 JOIN，不受 SQLite 單一查詢參數數量的上限影響
+        """
+        with self.lock:
+            known = dict(self.conn.execute("SELECT scholarship_id, fingerprint FROM scholarship_fingerprints").fetchall())
+        fingerprints = {str(s.get("id")): fingerprint(s) for s in scholarships}
+        changed = [s for s in scholarships if known.get(str(s.get("id"))) != fingerprints[str(s.get("id"))]]
+        removed = [sid for sid in known if sid not in fingerprints]
+
+        profiles = self.load_profiles()
+        matches = ProfileIndex(profiles).match(changed) if known and changed and profiles else {}
+        matched_pairs = {(profile_id, sid) for profile_id, sids in matches.items() for sid in sids}
+        now = self._now()
+        new_match_count = 0
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scholarship_fingerprints (scholarship_id, fingerprint) VALUES (?, ?)",
+                [(str(s.get("id")), fingerprints[str(s.get("id"))]) for s in changed]
+            )
+            # 移除已下架的獎學金，以及變動後不再符合的紀錄
+            self.conn.executemany("DELETE FROM scholarship_fingerprints WHERE scholarship_id = ?", [(sid,) for sid in removed])
+            self.conn.executemany("DELETE FROM profile_matches WHERE scholarship_id = ?", [(sid,) for sid in removed])
+            self.conn.execute("DELETE FROM changed_ids")
+            self.conn.executemany("INSERT OR IGNORE INTO changed_ids (scholarship_id) VALUES (?)", [(str(s.get("id")),) for s in changed])
+            stale = [
+                (profile_id, sid) for profile_id, sid in self.conn.execute(
+                    "SELECT profile_id, scholarship_id FROM profile_matches WHERE scholarship_id IN (SELECT scholarship_id FROM changed_ids)"
+                ).fetchall()
+                if (profile_id, sid) not in matched_pairs
+            ]
+            self.conn.executemany("DELETE FROM profile_matches WHERE profile_id = ? AND scholarship_id = ?", stale)
+            # 變動後仍符合且已看過的紀錄保留原狀，不重新通知
+            for profile_id, sid in sorted(matched_pairs):
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO profile_matches (profile_id, scholarship_id, matched_at, seen) VALUES (?, ?, ?, 0)",
+                    (profile_id, sid, now)
+                )
+                new_match_count += cursor.rowcount
+        return {"changed": len(changed), "new_matches": new_match_count}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="語料更新後，將新增或變動的獎學金與已儲存的設定檔比對")
+    parser.add_argument("--input", default="data/merged/scholarships_merged_300.json", help="合併後的 JSON 檔案")
+    parser.add_argument("--db-file", default=DEFAULT_DB_FILE, help="設定檔 SQLite 資料庫")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    result = ProfileStore(args.db_file).sync_corpus(data)
+    print(f"✓ 新增或變動 {result['changed']} 筆獎學金，產生 {result['new_matches']} 筆新符合")
@@ -0,0 +1,139 @@
+"""
+查詢紀錄（選用）
+
+設定環境變數 SCHOLARSHIP_QUERY_LOG=<檔案路徑> 後，每次 rerun 會將匿名化的篩選條件、
+排序方式與頁碼以 JSONL 寫入本機檔案（超過大小上限自動輪替）。
+紀錄可用 scripts/benchmarks/replay_queries.py 對任一篩選引擎重播，以真實流量評估效能。
+
+匿名化：
+- 不記錄 session id，只記錄以 process 內隨機 salt 雜湊後的短代碼（同一 process 內可串起同一 session 的操作）
+- 時間只保留到分鐘
+- 學業成績四捨五入到一位小數
+"""
+
+import hashlib
+import json
+import logging
+import os
+import secrets
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+
+from filters import canonicalize_filters
+
+
+# ==================== 配置 ====================
+
+# 單一紀錄檔大小上限與保留的輪替檔數
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+_SALT = secrets.token_hex(16)
+
+
+def anonymize_session(session_id: str) -> str:
+    """將 session id 雜湊為短代碼（salt 每個 process 不同，無法還原或跨 process 比對）"""
+    return hashlib.sha256(f"{_SALT}:{session_id}".encode("utf-8")).hexdigest()[:12]
+
+
+def anonymize_filters(filters: Dict) -> Dict:
+    """
+    將篩選條件標準化並去除可識別資訊
+
+    Args:
+        filters (Dict): 使用者在 sidebar 選擇的篩選條件字典
+
+    Returns:
+        Dict: 可寫入紀錄、也可直接交給篩選引擎重播的篩選條件
+    """
+    canonical = canonicalize_filters(filters)
+    if "學業成績" in canonical:
+        canonical["學業成績"] = {k: round(float(v), 1) for k, v in canonical["學業成績"].items()}
+    return canonical
+
+
+class QueryLogger:
+    """
+    將每次 rerun 的查詢寫入輪替 JSONL 檔案（由所有 session 共用，搭配 st.cache_resource）
+    """
+
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # 每個檔案路徑使用獨立的 logger，RotatingFileHandler 本身是 thread-safe 的
+        self._logger = logging.getLogger(f"scholarship_finder.query_log.{os.path.abspath(path)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        if not self._logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+    def log(
+        self,
+        session_id: Optional[str],
+        filters: Dict,
+        sort_by: str,
+        sort_order: str,
+        page: int,
+        engine: str,
+        result_count: int,
+        filter_ms: float
+    ):
+        """
+        寫入一筆查詢紀錄
+
+        Args:
+            session_id (Optional[str]): Streamlit session id（只寫入雜湊後的代碼）
+            filters (Dict): 篩選條件字典
+            sort_by (str): 排序欄位
+            sort_order (str): 排序方向（asc / desc）
+            page (int): 目前頁碼
+            engine (str): 使用的篩選引擎
+            result_count (int): 結果筆數
+            filter_ms (float): 篩選耗時（毫秒）
+        """
+        record = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M", time.localtime()),
+            "session": anonymize_session(session_id) if session_id else None,
+            "filters": anonymize_filters(filters),
+            "sort_by": sort_by,
+            "sort_order": sort_order,
+            "page": page,
+            "engine": engine,
+            "result_count": result_count,
+            "filter_ms": round(filter_ms, 3),
+        }
+        self._logger.info(json.dumps(record, ensure_ascii=False))
+
+
+def read_query_log(path: str) -> List[Dict]:
+    """
+    讀取查詢紀錄（包含 RotatingFileHandler 產生的 .1、.2 … 輪替檔，依時間先後排列）
+
+    Args:
+        path (str): 紀錄檔路徑
+
+    Returns:
+        List[Dict]: 查詢紀錄列表
+    """
+    paths = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        paths.append(f"{path}.{i}")
+        i += 1
+    paths.reverse()  # 編號越大越舊
+    if os.path.exists(path):
+        paths.append(path)
+
+    records = []
+    for p in paths:
+        with open(p, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+    return records
@@ -0,0 +1,87 @@
+"""
+結果排序與分頁
+
+排序鍵在語料載入時預先計算成陣列（以獎學金在語料中的位置為索引）。
+第一頁只需要前 k 筆，以 heapq 部分選取（O(n log k)）；翻到後面的頁面時才完整排序一次，
+並快取排序結果給同一組結果的後續頁面使用。
+"""
+
+import datetime
+import heapq
+from array import array
+from typing import Dict, List
+
+from utils import get_min_amount_and_quota, get_end_date
+
+
+# ==================== 排序鍵 ====================
+
+def build_sort_keys(scholarships: List[Dict]) -> Dict[str, list]:
+    """
+    預先計算每筆獎學金的排序鍵
+
+    Args:
+        scholarships (List[Dict]): 獎學金資料列表
+
+    Returns:
+        Dict[str, list]: 排序欄位（amount / quota / end_date）→ 依語料順序排列的排序鍵
+
+    Note:
+        - 金額、名額未定時為 -1
+        - 截止日期未定或無法解析時為 datetime.max（遞增排序時排在最後）
+    """
+    amount_keys, quota_keys, end_date_keys = [], [], []
+    for scholarship in scholarships:
+        min_amount, min_quota = get_min_amount_and_quota(scholarship)
+        end_date = get_end_date(scholarship)
+        amount_keys.append(min_amount if min_amount is not None else -1)
+        quota_keys.append(min_quota if min_quota is not None else -1)
+        end_date_keys.append(end_date if end_date is not None else datetime.datetime.max)
+    return {"amount": amount_keys, "quota": quota_keys, "end_date": end_date_keys}
+
+
+# ==================== 部分排序 ====================
+
+def page_indices(
+    indices: List[int],
+    sort_keys: Dict[str, list],
+    sort_by: str,
+    descending: bool,
+    start: int,
+    stop: int,
+    order_cache: Dict
+) -> List[int]:
+    """
+    取得排序後 [start, stop) 範圍內的獎學金位置
+
+    Args:
+        indices (List[int]): 篩選結果（獎學金在語料中的位置，依語料順序）
+        sort_keys (Dict[str, list]): build_sort_keys() 的結果
+        sort_by (str): 排序欄位（amount / quota / end_date）
+        descending (bool): 是否遞減排序
+        start (int): 頁面起始位置
+        stop (int): 頁面結束位置（不含）
+        order_cache (Dict): 存放完整排序結果的快取（通常是 session_state 中的 dict）
+
+    Returns:
+        List[int]: 該頁的獎學金位置
+
+    Note:
+        - 結果與 sorted(indices, key=..., reverse=descending)[start:stop] 完全相同（穩定排序）
+        - 第一頁以 heapq.nsmallest / nlargest 部分選取，不寫入快取
+        - 其他頁面完整排序一次後以 array('I') 快取，鍵為 (結果內容, 排序欄位, 方向)
+    """
+    cache_key = (len(indices), hash(tuple(indices)), sort_by, descending)
+    if order_cache.get("key") == cache_key:
+        return order_cache["order"][start:stop].tolist()
+
+    key = sort_keys[sort_by].__getitem__
+    if start == 0:
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(stop, indices, key=key)
+
+    # 以 array('I') 保存，每筆只佔 4 bytes
+    order = array("I", sorted(indices, key=key, reverse=descending))
+    order_cache["key"] = cache_key
+    order_cache["order"] = order
+    return order[start:stop].tolist()
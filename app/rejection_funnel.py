@@ -0,0 +1,132 @@
+"""
+篩選條件淘汰漏斗
+
+篩選結果為 0 筆或很少時，說明是哪個條件淘汰了大部分獎學金。
+RejectionFunnel 由 filters.check_scholarship_match(..., funnel=...) 填入，記錄：
+- 每個類別淘汰的 group 數與評估次數、累計耗時（可看出哪個條件的評估最花時間）
+- 每個階段淘汰的獎學金數：依序套用 關鍵字 → 各類別 → 學業成績 → 排除金額未定，
+  每個階段只計算「前面的階段都通過、卡在這一關」的獎學金
+  （學業成績門檻與類別條件一樣在 group 層級檢查，由 filters 記錄）
+
+一般篩選不傳入 funnel，沒有任何額外開銷；只有使用者打開漏斗面板時才以 build_rejection_funnel 額外掃描一次。
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from filters import ACADEMIC_STAGE, FILTER_CATEGORIES, KEYWORD_STAGE, check_scholarship_match, check_undetermined_amount
+
+
+# ==================== 配置 ====================
+
+UNDETERMINED_AMOUNT_STAGE = "排除金額未定"
+
+
+# ==================== 漏斗計數 ====================
+
+class RejectionFunnel:
+    """
+    單次查詢的淘汰漏斗
+
+    Attributes:
+        categories (List[str]): 類別的檢查順序（只包含有選擇的類別）
+        total (int): 進入漏斗的獎學金數
+        rejected (Dict[str, int]): 階段 → 淘汰的獎學金數
+        groups_rejected (Dict[str, int]): 類別 → 淘汰的 group 數
+        evaluations (Dict[str, int]): 類別 → 評估次數
+        elapsed_ns (Dict[str, int]): 類別 → 累計評估耗時（奈秒）
+    """
+
+    clock = staticmethod(time.perf_counter_ns)
+
+    def __init__(self, categories: List[str]):
+        self.categories = categories
+        self.total = 0
+        self.rejected: Dict[str, int] = {}
+        self.groups_rejected = dict.fromkeys(categories, 0)
+        self.evaluations = dict.fromkeys(categories, 0)
+        self.elapsed_ns = dict.fromkeys(categories, 0)
+
+    def record_group(self, category: str, matched: bool, elapsed_ns: int):
+        """記錄一次 group 條件評估（由 filters 呼叫）"""
+        self.evaluations[category] += 1
+        self.elapsed_ns[category] += elapsed_ns
+        if not matched:
+            self.groups_rejected[category] += 1
+
+    def record_scholarship(self, stage: Optional[str]):
+        """記錄一筆獎學金的結果：stage 為淘汰它的階段，通過時為 None（由 filters 呼叫）"""
+        self.total += 1
+        if stage is not None:
+            self.rejected[stage] = self.rejected.get(stage, 0) + 1
+
+    def record_stage(self, stage: str, before: int, after: int):
+        """記錄 group 條件之後的階段（排除金額未定）"""
+        if before > after:
+            self.rejected[stage] = self.rejected.get(stage, 0) + before - after
+
+    @property
+    def stages(self) -> List[str]:
+        return [KEYWORD_STAGE] + self.categories + [ACADEMIC_STAGE, UNDETERMINED_AMOUNT_STAGE]
+
+    def describe(self, filters: Dict, include_timing: bool = False) -> List[Dict]:
+        """
+        回傳可直接顯示的漏斗內容（只列出有啟用的階段）
+
+        Args:
+            filters (Dict): 篩選條件（用來顯示各階段的選擇）
+            include_timing (bool): 是否包含評估次數與耗時欄位
+
+        Returns:
+            List[Dict]: 依套用順序排列，每列包含階段、選擇、淘汰數與剩餘筆數
+        """
+        selections = {
+            KEYWORD_STAGE: filters.get("keyword") or "",
+            UNDETERMINED_AMOUNT_STAGE: "是" if filters.get("exclude_undetermined_amount") else "",
+            ACADEMIC_STAGE: "、".join(f"{k} {v:g}" for k, v in (filters.get("學業成績") or {}).items() if v is not None),
+        }
+        rows, remaining = [], self.total
+        for stage in self.stages:
+            selection = "、".join(filters[stage]) if stage in self.categories else selections[stage]
+            if not selection:
+                continue
+            rejected = self.rejected.get(stage, 0)
+            remaining -= rejected
+            row = {"階段": stage, "選擇": selection, "淘汰獎學金": rejected, "剩餘": remaining}
+            if stage in self.categories:
+                row["淘汰 group"] = self.groups_rejected[stage]
+                if include_timing:
+                    row["評估次數"] = self.evaluations[stage]
+                    row["耗時 (ms)"] = round(self.elapsed_ns[stage] / 1e6, 2)
+            rows.append(row)
+        return rows
+
+    def bottleneck(self) -> Optional[str]:
+        """淘汰最多獎學金的階段；沒有淘汰任何獎學金時為 None"""
+        if not self.rejected:
+            return None
+        return max(self.stages, key=lambda stage: self.rejected.get(stage, 0))
+
+
+def build_rejection_funnel(scholarships: List[Dict], filters: Dict, categories: Optional[List[str]] = None) -> RejectionFunnel:
+    """
+    對整個語料額外掃描一次，建立淘汰漏斗
+
+    Args:
+        scholarships (List[Dict]): 獎學金資料列表
+        filters (Dict): 篩選條件
+        categories (Optional[List[str]]): 類別的檢查順序（例如查詢計畫的順序），預設依 FILTER_CATEGORIES
+
+    Returns:
+        RejectionFunnel: 填好的漏斗；通過所有階段的筆數與 app 的篩選結果相同
+    """
+    if categories is None:
+        categories = [c for c in FILTER_CATEGORIES if filters.get(c)]
+    funnel = RejectionFunnel(categories)
+    passed = [i for i, s in enumerate(scholarships) if check_scholarship_match(s, filters, funnel=funnel)]
+
+    if filters.get("exclude_undetermined_amount"):
+        before = len(passed)
+        passed = [i for i in passed if not check_undetermined_amount(scholarships[i])]
+        funnel.record_stage(UNDETERMINED_AMOUNT_STAGE, before, len(passed))
+    return funnel
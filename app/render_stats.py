@@ -0,0 +1,56 @@
+"""
+每次 rerun 送往瀏覽器的 delta 計數（除錯用）
+
+Streamlit 的每個 st.markdown、st.columns 等呼叫都會產生一則 ForwardMsg delta，
+網路較慢時每則訊息的往返時間會直接影響畫面完成的時間。
+本模組包裝 ScriptRunContext 的訊息佇列，統計本次 rerun 已送出的元素數、容器數與位元組數。
+"""
+
+from typing import Callable, Dict, Optional
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+class DeltaCounter:
+    """統計送出的 delta（元素 / 容器）數與序列化後的位元組數"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.elements = 0
+        self.blocks = 0
+        self.nbytes = 0
+
+    def wrap(self, enqueue: Callable) -> Callable:
+        def counting_enqueue(msg):
+            if msg.HasField("delta"):
+                if msg.delta.HasField("add_block"):
+                    self.blocks += 1
+                else:
+                    self.elements += 1
+                self.nbytes += msg.ByteSize()
+            enqueue(msg)
+        return counting_enqueue
+
+    def summary(self) -> Dict[str, float]:
+        return {"元素": self.elements, "容器": self.blocks, "大小 (KB)": round(self.nbytes / 1024, 1)}
+
+
+def install_delta_counter() -> Optional[DeltaCounter]:
+    """
+    在目前 session 的 ScriptRunContext 上安裝計數器並歸零（每次 rerun 開始時呼叫）
+
+    Returns:
+        Optional[DeltaCounter]: 計數器；不在 Streamlit 執行環境中時回傳 None
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None or not hasattr(ctx, "_enqueue"):
+        return None
+    counter = getattr(ctx, "_delta_counter", None)
+    if counter is None:
+        counter = DeltaCounter()
+        ctx._enqueue = counter.wrap(ctx._enqueue)
+        ctx._delta_counter = counter
+    counter.reset()
+    return counter
@@ -0,0 +1,116 @@
+"""
+跨 session 共用的篩選結果快取
+
+不同學生送出相同的篩選條件時，只需計算一次。快取鍵為 (語料版本, 標準化篩選條件)，
+值為篩選結果的 array('I')（獎學金在語料中的位置，依語料順序），
+以項目數與總位元組數兩種上限做 LRU 淘汰。搭配 st.cache_resource 由整個 process 共用。
+"""
+
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+
+# ==================== 配置 ====================
+
+# 預設上限：最多 512 組篩選結果、合計 32 MB
+MAX_ENTRIES = 512
+MAX_BYTES = 32 * 1024 * 1024
+
+
+class ResultCache:
+    """
+    以 LRU 淘汰的篩選結果快取（thread-safe）
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _entry_size(key: Tuple[str, str], value: array) -> int:
+        return sys.getsizeof(value) + sum(sys.getsizeof(part) for part in key)
+
+    def get(self, key: Tuple[str, str]) -> Optional[array]:
+        """
+        查詢快取
+
+        Args:
+            key (Tuple[str, str]): (語料版本, filters.filter_cache_key() 的結果)
+
+        Returns:
+            Optional[array]: 篩選結果；未命中時回傳 None（呼叫端不可修改回傳的陣列）
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple[str, str], indices: Sequence[int]) -> array:
+        """
+        寫入篩選結果，超過上限時淘汰最久未使用的項目
+
+        Args:
+            key (Tuple[str, str]): (語料版本, filters.filter_cache_key() 的結果)
+            indices (Sequence[int]): 篩選結果
+
+        Returns:
+            array: 實際存入快取的 array('I')
+
+        Note:
+            單一結果超過 max_bytes 時不寫入快取
+        """
+        value = indices if isinstance(indices, array) else array("I", indices)
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= self._entry_size(key, old)
+            self._entries[key] = value
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                old_key, old_value = self._entries.popitem(last=False)
+                self.nbytes -= self._entry_size(old_key, old_value)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        """清空快取（統計數字保留）"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        目前的快取統計
+
+        Returns:
+            Dict[str, float]: 項目數、位元組數、命中 / 未命中 / 淘汰次數與命中率
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "項目數": len(self._entries),
+                "記憶體 (KB)": round(self.nbytes / 1024, 1),
+                "命中": self.hits,
+                "未命中": self.misses,
+                "淘汰": self.evictions,
+                "命中率": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,246 @@
+"""
+關鍵字搜尋：繁簡體 / 異體字正規化與容錯比對
+
+1. 正規化（建立索引與查詢時都套用）：英文轉小寫、全形英數轉半形、異體字（台→臺、着→著…）
+   與常見簡體字（学→學、奖→獎、侨→僑…）轉為臺灣常用的繁體字。每個字元一對一轉換，
+   正規化前後長度相同，位置可直接對應回原文。
+2. 完全比對：正規化後的子字串比對（涵蓋原本的小寫子字串比對）
+3. 容錯比對：查詢長度達 FUZZY_MIN_LENGTH 時，允許 max_edits_for() 個錯字（替換、插入、刪除）。
+   中文沒有詞的邊界，因此不建立詞彙表，而以鴿籠原理產生候選：把查詢切成 k + 1 段，
+   距離 ≤ k 的相符子字串一定完整包含其中一段。先以 C 實作的子字串搜尋找出各段出現的位置，
+   只在附近長度 m + 2k 的視窗內以 Myers 位元平行演算法驗證；SearchIndex 另以字元集合先排除
+   缺字太多的獎學金，成本與完全比對相近。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# ==================== 配置 ====================
+
+# 查詢長度（字元數）達到門檻才允許錯字：4~7 字允許 1 個，8 字以上允許 2 個
+# （3 字以下不容錯，避免「原住民」比對到「新住民」這類只差一字但意思不同的詞）
+FUZZY_MIN_LENGTH = 4
+FUZZY_TWO_EDITS_LENGTH = 8
+
+# 最多快取幾個查詢的結果
+MAX_CACHED_QUERIES = 256
+
+# 異體字 → 臺灣常用字
+VARIANT_PAIRS = "台臺 着著 裏裡 爲為 衆眾 啓啟 峯峰 羣群 綫線 眞真 敎教 卽即 旣既 説說 戸戶 淸清 靑青 録錄 徳德"
+
+# 簡體字 → 繁體字（只收錄不會與繁體字混淆的簡體字形，例如不收「里」「系」「范」「于」）
+SIMPLIFIED_PAIRS = (
+    "学學 奖獎 励勵 贫貧 穷窮 户戶 证證 级級 硕碩 业業 毕畢 届屆 侨僑 陆陸 湾灣 华華 国國 际際 语語 医醫 "
+    "药藥 护護 师師 农農 资資 讯訊 电電 机機 计計 经經 济濟 财財 务務 会會 统統 营營 销銷 银銀 设設 艺藝 "
+    "术術 体體 乐樂 历歷 宁寧 单單 亲親 双雙 遗遺 属屬 残殘 碍礙 灾災 难難 变變 庄莊 乡鄉 镇鎮 县縣 区區 "
+    "长長 门門 东東 兰蘭 义義 园園 龙龍 凤鳳 岛島 马馬 连連 苏蘇 杨楊 陈陳 刘劉 张張 黄黃 赵趙 吴吳 郑鄭 "
+    "许許 谢謝 邓鄧 冯馮 韩韓 罗羅 萧蕭 叶葉 团團 员員 职職 荣榮 誉譽 优優 绩績 书書 类類 项項 额額 领領 "
+    "补補 贴貼 费費 给給 发發 须須 应應 缴繳 检檢 报報 请請 审審 办辦 处處 课課 实實 习習 训訓 练練 试試 "
+    "读讀 写寫 题題 论論 规規 则則 条條 满滿 岁歲 龄齡 儿兒 妇婦 产產 众眾 爱愛 关關 怀懷 闻聞 传傳 网網 "
+    "络絡 软軟 数數 据據 环環 态態 气氣 矿礦 质質 动動 兽獸 渔漁 卫衛 疗療 复復 庙廟 协協 进進 创創 时時 "
+    "间間 内內 与與 为為 并並 后後 对對 将將 从從 让讓 这這 个個 们們 来來 见見 说說 话話 认認 识識 觉覺 "
+    "样樣 过過 还還 边邊 达達 选選 适適 迁遷 运運 远遠 递遞 邮郵 号號 码碼 联聯 线線 纸紙 页頁 签簽 盖蓋 "
+    "笔筆 记記 录錄 获獲 举舉 荐薦 导導 厅廳 总總 岗崗 异異 测測 验驗 积積 极極 势勢 状狀 况況 贷貸 债債 "
+    "负負 担擔 亏虧 损損 险險 临臨 紧緊 伤傷 丧喪 离離 养養 抚撫 监監 楼樓 馆館 阶階 层層 组組 织織 构構 "
+    "万萬 亿億 圆圓 币幣 汇匯 价價 钱錢 钟鐘 点點 击擊 专專 讲講 图圖 视視 听聽 声聲 戏戲 剧劇 画畫 摄攝 "
+    "备備 购購 买買 卖賣 宾賓 饭飯 厨廚 车車 轨軌 铁鐵 飞飛 舰艦 军軍 灵靈 梦夢 愿願 圣聖 诞誕 节節 庆慶 "
+    "纪紀 税稅 脱脫 温溫 问問 弃棄 贵貴 废廢 欢歡 晋晉 杂雜 缘緣 观觀 权權 细細 兴興"
+)
+
+
+def _build_translation_table() -> Dict[int, str]:
+    table = {}
+    # 英文大寫轉小寫、全形英數符號（！～）轉半形、全形空白轉半形
+    for code in range(ord("A"), ord("Z") + 1):
+        table[code] = chr(code).lower()
+    for code in range(0xFF01, 0xFF5F):
+        table[code] = chr(code - 0xFEE0).lower()
+    table[0x3000] = " "
+    for pair in (VARIANT_PAIRS + " " + SIMPLIFIED_PAIRS).split():
+        if pair[0] != pair[1]:
+            table[ord(pair[0])] = pair[1]
+    return table
+
+
+TRANSLATION_TABLE = _build_translation_table()
+
+
+# ==================== 正規化與比對 ====================
+
+def normalize_text(text: str) -> str:
+    """
+    正規化搜尋文字（一對一轉換字元，長度不變）
+
+    Examples:
+        >>> normalize_text("台大奖学金 ＡＢＣ")
+        '臺大獎學金 abc'
+    """
+    return (text or "").translate(TRANSLATION_TABLE)
+
+
+def max_edits_for(query: str) -> int:
+    """依查詢長度決定允許的錯字數"""
+    if len(query) < FUZZY_MIN_LENGTH:
+        return 0
+    if len(query) < FUZZY_TWO_EDITS_LENGTH:
+        return 1
+    return 2
+
+
+def _match_end(query: str, text: str, max_edits: int) -> int:
+    """
+    text 中第一個與 query 編輯距離不超過 max_edits 的子字串的結束位置（不含），找不到時為 -1
+
+    Note:
+        Myers 位元平行演算法（近似子字串搜尋版本）：以整數的位元表示 DP 表的一整欄，
+        每個字元只需常數次整數運算
+    """
+    m = len(query)
+    if m <= max_edits:
+        return 0
+    peq = {}
+    for i, char in enumerate(query):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask, high = (1 << m) - 1, 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for j, char in enumerate(text):
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        if score <= max_edits:
+            return j + 1
+    return -1
+
+
+def find_match(query: str, text: str, max_edits: int, start: int = 0) -> Optional[Tuple[int, int]]:
+    """
+    在 text[start:] 中尋找與 query 編輯距離不超過 max_edits 的子字串（兩者皆須已正規化）
+
+    Returns:
+        Optional[Tuple[int, int]]: 第一個相符位置 (起點, 終點)；容錯比對的起點為估計值。找不到時為 None
+
+    Note:
+        - 先做完全比對；容錯比對以鴿籠原理切段，只在各段出現位置附近的視窗中驗證
+        - 重疊的視窗會合併，總計算量不超過對整段文字驗證一次
+    """
+    m = len(query)
+    position = text.find(query, start)
+    if position >= 0:
+        return position, position + m
+    if max_edits <= 0 or not query:
+        return None
+    piece_count = max_edits + 1
+    bounds = [m * i // piece_count for i in range(piece_count + 1)]
+    starts = set()
+    for offset, stop in zip(bounds, bounds[1:]):
+        piece = query[offset:stop]
+        position = text.find(piece, start)
+        while position >= 0:
+            starts.add(position - offset)
+            position = text.find(piece, position + 1)
+
+    windows = []
+    for window_start in sorted(starts):
+        low, high = max(start, window_start - max_edits), window_start + m + max_edits
+        if windows and low <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], high)
+        else:
+            windows.append([low, high])
+    for low, high in windows:
+        end = _match_end(query, text[low:high], max_edits)
+        if end >= 0:
+            end += low
+            return max(low, end - m), end
+    return None
+
+
+def fuzzy_contains(query: str, text: str, max_edits: int) -> bool:
+    """text 中是否有與 query 編輯距離不超過 max_edits 的子字串（兩者皆須已正規化）"""
+    return find_match(query, text, max_edits) is not None
+
+
+def searchable_text(scholarship: Dict) -> str:
+    """關鍵字搜尋的範圍：獎學金名稱與申請資格（正規化後）"""
+    return normalize_text(f"{scholarship.get('scholarship_name', '')} {scholarship.get('eligibility', '')}")
+
+
+def keyword_matches(scholarship: Dict, keyword: str) -> bool:
+    """單筆獎學金的關鍵字比對（不使用索引，供 filters.check_keyword_match 使用）"""
+    query = normalize_text(keyword).strip()
+    return fuzzy_contains(query, searchable_text(scholarship), max_edits_for(query))
+
+
+# ==================== 索引 ====================
+
+class SearchIndex:
+    """
+    預先正規化的搜尋文字與查詢結果快取（所有 session 共用，搭配 st.cache_resource）
+
+    每個查詢的結果是一份 posting list：相符獎學金的位置 → 第一個相符的 (起點, 終點)，
+    優先取申請資格中的位置。正規化不改變長度，位置可直接用於原文，
+    顯示搜尋摘要時不需要重新掃描全文（見 ui_components.build_search_snippet_html）。
+    """
+
+    def __init__(self, scholarships: List[Dict], max_cached_queries: int = MAX_CACHED_QUERIES):
+        self.texts = [searchable_text(s) for s in scholarships]
+        # 申請資格在搜尋文字中的起點（名稱 + 一個空白之後）
+        self.eligibility_starts = [len(s.get('scholarship_name', '')) + 1 for s in scholarships]
+        # 每筆的字元集合：距離 ≤ k 的相符子字串至多缺少查詢中的 k 個字元，先以集合運算排除大部分獎學金
+        self.charsets = [frozenset(text) for text in self.texts]
+        self.max_cached_queries = max_cached_queries
+        self._cache: "OrderedDict[str, Dict[int, Tuple[int, int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def postings(self, keyword: str, max_edits: Optional[int] = None) -> Dict[int, Tuple[int, int]]:
+        """
+        搜尋關鍵字並回傳相符位置
+
+        Args:
+            keyword (str): 使用者輸入的關鍵字
+            max_edits (Optional[int]): 允許的錯字數，預設依查詢長度決定
+
+        Returns:
+            Dict[int, Tuple[int, int]]: 依語料順序排列的 相符獎學金位置 → 在搜尋文字中的 (起點, 終點)
+        """
+        query = normalize_text(keyword).strip()
+        if max_edits is None:
+            max_edits = max_edits_for(query)
+        cache_key = f"{max_edits}:{query}"
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+        query_chars = set(query)
+        postings = {}
+        for i, text in enumerate(self.texts):
+            if query not in text and (max_edits <= 0 or len(query_chars - self.charsets[i]) > max_edits):
+                continue
+            span = find_match(query, text, max_edits, self.eligibility_starts[i]) or find_match(query, text, max_edits)
+            if span is not None:
+                postings[i] = span
+        with self._lock:
+            self._cache[cache_key] = postings
+            while len(self._cache) > self.max_cached_queries:
+                self._cache.popitem(last=False)
+        return postings
+
+    def search(self, keyword: str, max_edits: Optional[int] = None) -> List[int]:
+        """
+        搜尋關鍵字
+
+        Returns:
+            List[int]: 依語料順序排列的相符獎學金位置
+        """
+        return list(self.postings(keyword, max_edits))
@@ -0,0 +1,197 @@
+"""
+篩選條件選擇率統計與查詢計畫
+
+設計原則：
+1. 各類別之間為 AND 邏輯，最容易淘汰 group 的條件越早檢查，平均需要評估的條件數越少
+2. 先驗選擇率：由語料分布（各類別、各標籤值出現在多少 group）估計
+3. 觀察選擇率：由實際查詢中每個條件的通過率累積，隨流量逐漸取代先驗估計
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, List
+
+from filters import (
+    FILTER_CATEGORIES, UNMENTIONED_FIELDS, UNLIMITED_AS_UNLABELED_FIELDS,
+    SPECIAL_STUDENT_STATUS, extract_tags_from_group, iter_match_groups
+)
+
+
+# ==================== 配置 ====================
+
+# 先驗估計相當於多少次觀察（觀察次數超過此值後，觀察通過率的權重大於先驗）
+PRIOR_WEIGHT = 50
+
+
+# ==================== 查詢計畫 ====================
+
+class QueryPlan:
+    """
+    單次查詢的執行計畫：類別的檢查順序，以及本次查詢中各類別的評估/通過次數
+
+    Attributes:
+        categories (List[str]): 依估計通過率由低到高排列的啟用類別
+        estimates (Dict[str, float]): 各類別的估計通過率
+        evaluations (Dict[str, int]): 本次查詢中各類別被評估的次數
+        passes (Dict[str, int]): 本次查詢中各類別通過的次數
+    """
+
+    def __init__(self, categories: List[str], keys: Dict[str, tuple], estimates: Dict[str, float]):
+        self.categories = categories
+        self.keys = keys
+        self.estimates = estimates
+        self.evaluations = dict.fromkeys(categories, 0)
+        self.passes = dict.fromkeys(categories, 0)
+
+    def record(self, category: str, matched: bool):
+        """記錄一次條件評估結果（由 filters.check_group_match 呼叫）"""
+        self.evaluations[category] += 1
+        if matched:
+            self.passes[category] += 1
+
+    @property
+    def total_evaluations(self) -> int:
+        return sum(self.evaluations.values())
+
+    def describe(self) -> List[Dict]:
+        """
+        回傳可直接顯示於除錯面板的計畫內容
+
+        Returns:
+            List[Dict]: 依檢查順序排列，每列包含類別、選擇、估計通過率與本次評估/通過次數
+        """
+        return [
+            {
+                "順序": i + 1,
+                "類別": category,
+                "選擇": "、".join(self.keys[category]),
+                "估計通過率": round(self.estimates[category], 3),
+                "評估次數": self.evaluations[category],
+                "通過次數": self.passes[category],
+            }
+            for i, category in enumerate(self.categories)
+        ]
+
+
+# ==================== 選擇率統計 ====================
+
+class SelectivityStats:
+    """
+    累積各類別/標籤值的選擇率統計，並據以產生查詢計畫
+
+    Note:
+        - 同一個實例由所有 session 共用（搭配 st.cache_resource），更新時以 lock 保護
+        - 觀察統計以「類別 + 使用者選擇組合」為鍵
+    """
+
+    def __init__(self):
+        self.total_groups = 0
+        # category -> 未標註該類別的 group 數
+        self.unlabeled_counts = defaultdict(int)
+        # category -> value -> 標註該值的 group 數
+        self.value_counts = defaultdict(lambda: defaultdict(int))
+        # (category, selection key) -> [評估次數, 通過次數]
+        self.observed = defaultdict(lambda: [0, 0])
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_corpus(cls, scholarships: List[Dict]) -> "SelectivityStats":
+        """
+        由語料分布建立先驗統計
+
+        Args:
+            scholarships (List[Dict]): 獎學金資料列表
+
+        Returns:
+            SelectivityStats: 已載入語料分布的統計物件
+        """
+        stats = cls()
+        for scholarship in scholarships:
+            for group in iter_match_groups(scholarship):
+                stats.total_groups += 1
+                for category in FILTER_CATEGORIES:
+                    values = set(extract_tags_from_group(group, category))
+                    if category in UNLIMITED_AS_UNLABELED_FIELDS:
+                        values.discard("不限")
+                    if not values:
+                        stats.unlabeled_counts[category] += 1
+                    for value in values:
+                        stats.value_counts[category][value] += 1
+        return stats
+
+    def prior_pass_rate(self, category: str, selections: List[str]) -> float:
+        """
+        依語料分布估計某類別選擇的通過率（忽略排除條件，作為排序依據已足夠）
+
+        Args:
+            category (str): 篩選類別
+            selections (List[str]): 使用者在該類別的選擇列表
+
+        Returns:
+            float: 介於 0 與 1 之間的估計通過率
+        """
+        if not self.total_groups:
+            return 1.0
+        marker = "未提及" if category in UNMENTIONED_FIELDS else "不限/未明定"
+        user_set = set(selections)
+        other_values = user_set - {marker}
+        if category == "學籍狀態" and marker in user_set and other_values & SPECIAL_STUDENT_STATUS:
+            other_values = other_values & SPECIAL_STUDENT_STATUS
+
+        unlabeled_rate = self.unlabeled_counts[category] / self.total_groups
+        counts = self.value_counts[category]
+        match_rate = min(1.0, sum(counts[v] for v in other_values) / self.total_groups)
+
+        if marker in user_set and not other_values:
+            return unlabeled_rate
+        if marker not in user_set:
+            return match_rate
+        return min(1.0, unlabeled_rate + match_rate)
+
+    def estimate(self, category: str, key: tuple) -> float:
+        """
+        結合先驗估計與觀察通過率
+
+        Args:
+            category (str): 篩選類別
+            key (tuple): 排序後的使用者選擇
+
+        Returns:
+            float: 估計通過率
+        """
+        prior = self.prior_pass_rate(category, list(key))
+        evaluations, passes = self.observed.get((category, key), (0, 0))
+        return (prior * PRIOR_WEIGHT + passes) / (PRIOR_WEIGHT + evaluations)
+
+    def plan(self, filters: Dict) -> QueryPlan:
+        """
+        依估計通過率由低到高排列啟用的篩選類別
+
+        Args:
+            filters (Dict): 使用者在 sidebar 選擇的篩選條件字典
+
+        Returns:
+            QueryPlan: 查詢計畫（通過率相同時維持 FILTER_CATEGORIES 順序）
+        """
+        keys = {
+            category: tuple(sorted(filters[category]))
+            for category in FILTER_CATEGORIES if filters.get(category)
+        }
+        estimates = {category: self.estimate(category, key) for category, key in keys.items()}
+        categories = sorted(keys, key=lambda c: estimates[c])
+        return QueryPlan(categories, keys, estimates)
+
+    def commit(self, plan: QueryPlan):
+        """
+        將查詢計畫中的評估結果併入觀察統計
+
+        Args:
+            plan (QueryPlan): 已執行完畢的查詢計畫
+        """
+        with self._lock:
+            for category in plan.categories:
+                evaluations = plan.evaluations[category]
+                if evaluations:
+                    observed = self.observed[(category, plan.keys[category])]
+                    observed[0] += evaluations
+                    observed[1] += plan.passes[category]
@@ -0,0 +1,106 @@
+"""
+Session 記憶體用量統計
+
+估計每個 session 的 session_state 佔用多少記憶體，並彙總所有 session 的用量，
+用於估算申請季尖峰時單一 instance 可承載的 session 數。
+
+Note:
+    - 語料由所有 session 共用（見 data_loader.load_scholarships），不計入個別 session
+    - 估計值以 sys.getsizeof 遞迴加總，array / numpy 陣列會計入其資料緩衝區
+"""
+
+import sys
+import threading
+import time
+from typing import Dict
+
+
+# ==================== 配置 ====================
+
+# 超過此秒數沒有回報的 session 視為已結束，不計入彙總
+SESSION_TTL_SECONDS = 30 * 60
+
+
+def deep_sizeof(obj, seen=None) -> int:
+    """
+    遞迴估計物件佔用的 bytes（共用物件只計算一次）
+
+    Args:
+        obj: 任意 Python 物件
+        seen (set, optional): 已計算過的物件 id
+
+    Returns:
+        int: 估計的 bytes
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "nbytes") and not isinstance(obj, memoryview):
+        # numpy 陣列：getsizeof 不一定包含 view 的資料緩衝區
+        size = max(size, int(obj.nbytes))
+    return size
+
+
+def session_state_footprint(session_state) -> Dict[str, int]:
+    """
+    計算 session_state 中每個鍵佔用的 bytes
+
+    Args:
+        session_state: st.session_state 或任何 mapping
+
+    Returns:
+        Dict[str, int]: 鍵 → bytes，依用量由大到小排列
+    """
+    seen = set()
+    sizes = {str(key): deep_sizeof(session_state[key], seen) for key in list(session_state.keys())}
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+
+
+class SessionMemoryRegistry:
+    """
+    彙總所有 session 最近一次回報的記憶體用量（由所有 session 共用，搭配 st.cache_resource）
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._peak_total = 0
+        self._lock = threading.Lock()
+
+    def record(self, session_id: str, nbytes: int):
+        """
+        記錄某個 session 目前的用量
+
+        Args:
+            session_id (str): Streamlit session id
+            nbytes (int): 該 session 的 session_state 用量
+        """
+        now = time.time()
+        with self._lock:
+            self._sessions[session_id] = (nbytes, now)
+            for sid, (_, seen_at) in list(self._sessions.items()):
+                if now - seen_at > SESSION_TTL_SECONDS:
+                    del self._sessions[sid]
+            total = sum(n for n, _ in self._sessions.values())
+            self._peak_total = max(self._peak_total, total)
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: 活躍 session 數、總用量、單一 session 最大用量與歷史尖峰總用量
+        """
+        with self._lock:
+            sizes = [n for n, _ in self._sessions.values()]
+            return {
+                "sessions": len(sizes),
+                "total_bytes": sum(sizes),
+                "max_session_bytes": max(sizes, default=0),
+                "peak_total_bytes": self._peak_total,
+            }
@@ -0,0 +1,176 @@
+"""
+分片篩選引擎：以常駐的 process pool 平行篩選大型語料（選用）
+
+合併多個學校與學年度後，單一 Python 執行緒逐筆呼叫 check_scholarship_match 會成為瓶頸。
+本引擎把語料依位置切成連續的分片，每個分片由一個常駐的 worker process 負責：
+
+- 建立時將每個分片 pickle 後寫入 multiprocessing.shared_memory，worker 啟動時從共享記憶體還原，
+  不經由 pipe 傳送整份語料；共享記憶體只用於傳送，所有 worker 載入完成後即釋放
+- worker 常駐保存自己的分片，以及分片的搜尋索引與查詢計畫統計（與 app 的 python 引擎相同的比對流程）
+- 查詢時只把篩選條件送往每個 worker，各自回傳已排序的語料位置，再以 heapq.merge 合併
+- worker 意外結束時，該分片改在目前的 process 內篩選，結果不受影響
+
+記憶體：獎學金是巢狀的 dict，比對邏輯（filters.check_scholarship_match）直接走訪這些物件，
+無法以唯讀的共享表示在 process 之間共用。因此每個 worker 保存自己分片的私有副本與索引，
+所有 worker 合計約多一份語料（app 的 process 仍保有完整語料）；需要跨 process 共用時，
+應改用 matrix_engine 那樣以陣列表示的引擎。
+
+process 的啟動與通訊有固定成本，只有語料筆數達到 SHARDED_MIN_CORPUS 時 app 才會使用本引擎，
+小型語料仍走 process 內的 python 引擎。結果與 filters.check_scholarship_match 完全一致。
+"""
+
+import heapq
+import math
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+from filters import check_scholarship_match, check_undetermined_amount
+from search_index import SearchIndex
+from selectivity import SelectivityStats
+
+
+# ==================== 配置 ====================
+
+# 每個分片至少的獎學金筆數（語料較小時減少分片數，避免通訊成本大於平行化的收益）
+MIN_SHARD_SIZE = 2000
+
+
+# ==================== 分片篩選 ====================
+
+class _Shard:
+    """
+    一個分片的獎學金與其索引（worker 內常駐；worker 失效時也在 app 的 process 內使用）
+    """
+
+    def __init__(self, scholarships: List[Dict], offset: int):
+        self.scholarships = scholarships
+        self.offset = offset
+        self.search_index = SearchIndex(scholarships)
+        self.selectivity_stats = SelectivityStats.from_corpus(scholarships)
+
+    def filter_indices(self, filters: Dict) -> List[int]:
+        """與 app 的 python 引擎相同：關鍵字以搜尋索引比對，其他條件依查詢計畫逐筆檢查"""
+        plan = self.selectivity_stats.plan(filters)
+        candidates = self.search_index.search(filters["keyword"]) if filters.get("keyword") else range(len(self.scholarships))
+        category_filters = {k: v for k, v in filters.items() if k != "keyword"}
+        exclude_undetermined = filters.get("exclude_undetermined_amount")
+        result = [
+            self.offset + i for i in candidates
+            if check_scholarship_match(self.scholarships[i], category_filters, plan)
+            and (not exclude_undetermined or not check_undetermined_amount(self.scholarships[i]))
+        ]
+        self.selectivity_stats.commit(plan)
+        return sorted(result)
+
+
+# worker process 內的分片（由 _init_worker 設定）
+_worker_shard: Optional[_Shard] = None
+
+
+def _init_worker(shm_name: str, size: int, offset: int):
+    """worker 啟動時從共享記憶體還原分片"""
+    global _worker_shard
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        scholarships = pickle.loads(shm.buf[:size])
+    finally:
+        shm.close()
+    _worker_shard = _Shard(scholarships, offset)
+
+
+def _worker_ready() -> int:
+    return len(_worker_shard.scholarships)
+
+
+def _worker_filter(filters: Dict) -> List[int]:
+    return _worker_shard.filter_indices(filters)
+
+
+# ==================== 引擎 ====================
+
+class ShardedFilterEngine:
+    """
+    以常駐 process pool 分片篩選的引擎
+
+    Attributes:
+        shard_bounds (List[tuple]): 每個分片的 (起始位置, 結束位置)
+        executors (List[ProcessPoolExecutor]): 每個分片一個單 worker 的 pool，確保分片固定由同一個 process 負責
+    """
+
+    def __init__(self, scholarships: List[Dict], workers: int):
+        self.scholarships = scholarships
+        shard_count = max(1, min(workers, math.ceil(len(scholarships) / MIN_SHARD_SIZE)))
+        shard_size = math.ceil(len(scholarships) / shard_count) if scholarships else 0
+        self.shard_bounds = [
+            (start, min(start + shard_size, len(scholarships)))
+            for start in range(0, len(scholarships), shard_size or 1)
+        ]
+        self._fallback_shards: Dict[int, _Shard] = {}
+
+        # Streamlit 以多執行緒服務 session，fork 有死結風險，一律使用 spawn
+        context = multiprocessing.get_context("spawn")
+        self.executors = []
+        segments = []
+        try:
+            for start, stop in self.shard_bounds:
+                blob = pickle.dumps(scholarships[start:stop], protocol=pickle.HIGHEST_PROTOCOL)
+                shm = shared_memory.SharedMemory(create=True, size=max(len(blob), 1))
+                shm.buf[:len(blob)] = blob
+                segments.append(shm)
+                self.executors.append(ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(shm.name, len(blob), start),
+                ))
+            # 等所有 worker 從共享記憶體載入完成後即可釋放
+            for executor in self.executors:
+                executor.submit(_worker_ready).result()
+        except BaseException:
+            self.close()
+            raise
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+    def _filter_shard_locally(self, shard: int, filters: Dict) -> List[int]:
+        """worker 失效時，在目前的 process 內篩選該分片"""
+        if shard not in self._fallback_shards:
+            start, stop = self.shard_bounds[shard]
+            self._fallback_shards[shard] = _Shard(self.scholarships[start:stop], start)
+        return self._fallback_shards[shard].filter_indices(filters)
+
+    def filter_indices(self, filters: Dict) -> List[int]:
+        """
+        Args:
+            filters (Dict): 使用者在 sidebar 選擇的篩選條件字典
+
+        Returns:
+            List[int]: 符合條件的獎學金在語料中的位置（依語料順序）
+        """
+        futures = []
+        for executor in self.executors:
+            try:
+                futures.append(executor.submit(_worker_filter, filters))
+            except BrokenProcessPool:
+                futures.append(None)
+        partials = []
+        for shard, future in enumerate(futures):
+            try:
+                if future is None:
+                    raise BrokenProcessPool
+                partials.append(future.result())
+            except BrokenProcessPool:
+                partials.append(self._filter_shard_locally(shard, filters))
+        return list(heapq.merge(*partials))
+
+    def close(self):
+        """結束所有 worker process（等待執行中的查詢完成）"""
+        for executor in self.executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self.executors = []
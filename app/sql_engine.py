@@ -0,0 +1,284 @@
+"""
+SQLite 篩選引擎（選用）
+
+將合併後、已標註的獎學金語料載入正規化的關聯式資料表，並把 sidebar 的篩選條件字典
+轉換為單一 SQL 查詢。結果與 filters.check_scholarship_match 完全一致。
+
+資料表：
+- scholarships：每筆獎學金一列（idx 為在語料中的位置）
+- groups：實際用來比對的 group（已結合 common_tags，見 filters.iter_match_groups），
+  以及最嚴格的學業門檻（見 filters.extract_academic_thresholds，沒有門檻時為 NULL）
+- requirements：每個 group 的原始標籤
+- requirement_values：經 filters.extract_tags_from_group / extract_excluded_tags_from_group
+  正規化後的標籤值（excluded = 1 表示否定條件），篩選查詢只使用這張表
+
+關鍵字：scholarships.search_text 為正規化後的搜尋文字（見 search_index.searchable_text）。
+build_query 只把完全比對寫成 instr()，因此 CLI 產生的資料庫可以直接用其他工具執行同一個 SQL；
+容許錯字的關鍵字（search_index.max_edits_for > 0）無法以 SQL 表達，由 SqliteFilterEngine 在 Python 中過濾。
+
+使用方式：
+    python app/sql_engine.py --input data/merged/scholarships_merged_300.json --db-file data/scholarships_query.db
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Tuple
+
+from filters import (
+    FILTER_CATEGORIES, UNMENTIONED_FIELDS, UNLIMITED_AS_UNLABELED_FIELDS, SPECIAL_STUDENT_STATUS, HIGHER_IS_STRICTER,
+    extract_tags_from_group, extract_excluded_tags_from_group, extract_academic_thresholds, iter_match_groups,
+    check_undetermined_amount
+)
+from search_index import normalize_text, max_edits_for, fuzzy_contains, searchable_text
+
+
+# 學業成績評估標準 → groups 的門檻欄位
+ACADEMIC_COLUMNS = {"GPA": "min_gpa", "百分制": "min_average", "排名": "max_rank_percent"}
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scholarships (
+    idx INTEGER PRIMARY KEY,
+    id TEXT,
+    scholarship_name TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    url TEXT,
+    search_text TEXT,
+    amount_undetermined INTEGER
+);
+CREATE TABLE IF NOT EXISTS groups (
+    group_id INTEGER PRIMARY KEY,
+    scholarship_idx INTEGER REFERENCES scholarships(idx),
+    group_name TEXT,
+    min_gpa REAL,
+    min_average REAL,
+    max_rank_percent REAL
+);
+CREATE TABLE IF NOT EXISTS requirements (
+    group_id INTEGER REFERENCES groups(group_id),
+    tag_category TEXT,
+    condition_type TEXT,
+    tag_value TEXT,
+    standardized_value TEXT
+);
+CREATE TABLE IF NOT EXISTS requirement_values (
+    group_id INTEGER REFERENCES groups(group_id),
+    tag_category TEXT,
+    value TEXT,
+    excluded INTEGER
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_groups_scholarship ON groups(scholarship_idx);
+CREATE INDEX IF NOT EXISTS idx_requirements_category_value ON requirements(tag_category, standardized_value);
+CREATE INDEX IF NOT EXISTS idx_requirement_values_group ON requirement_values(group_id, tag_category, excluded, value);
+CREATE INDEX IF NOT EXISTS idx_requirement_values_category_value ON requirement_values(tag_category, value, excluded);
+"""
+
+
+def load_corpus(conn: sqlite3.Connection, scholarships: List[Dict]):
+    """
+    將獎學金語料寫入正規化資料表（會先刪除既有資料表，舊版資料庫檔案也會以目前的 schema 重建）
+
+    Args:
+        conn (sqlite3.Connection): 資料庫連線
+        scholarships (List[Dict]): 合併後的獎學金資料列表
+    """
+    for table in ("requirement_values", "requirements", "groups", "scholarships"):
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.executescript(SCHEMA)
+
+    scholarship_rows, group_rows, requirement_rows, value_rows = [], [], [], []
+    group_id = 0
+    for idx, scholarship in enumerate(scholarships):
+        name = scholarship.get("scholarship_name", "")
+        search_text = searchable_text(scholarship)
+        scholarship_rows.append((
+            idx, str(scholarship.get("id")), name,
+            scholarship.get("start_date"), scholarship.get("end_date"), scholarship.get("url"),
+            search_text, int(check_undetermined_amount(scholarship))
+        ))
+        for group in iter_match_groups(scholarship):
+            thresholds = extract_academic_thresholds(group)
+            group_rows.append((group_id, idx, group.get("group_name"),
+                               *(thresholds.get(metric) for metric in ACADEMIC_COLUMNS)))
+            for req in group["requirements"]:
+                requirement_rows.append((
+                    group_id, req.get("tag_category"), req.get("condition_type"),
+                    req.get("tag_value"), req.get("standardized_value")
+                ))
+            for category in FILTER_CATEGORIES:
+                for value in set(extract_tags_from_group(group, category)):
+                    value_rows.append((group_id, category, value, 0))
+                for value in set(extract_excluded_tags_from_group(group, category)):
+                    value_rows.append((group_id, category, value, 1))
+            group_id += 1
+
+    conn.executemany("INSERT INTO scholarships VALUES (?, ?, ?, ?, ?, ?, ?, ?)", scholarship_rows)
+    conn.executemany("INSERT INTO groups VALUES (?, ?, ?, ?, ?, ?)", group_rows)
+    conn.executemany("INSERT INTO requirements VALUES (?, ?, ?, ?, ?)", requirement_rows)
+    conn.executemany("INSERT INTO requirement_values VALUES (?, ?, ?, ?)", value_rows)
+    conn.executescript(INDEXES)
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+# ==================== 篩選條件 → SQL ====================
+
+def _placeholders(values) -> str:
+    return ", ".join("?" for _ in values)
+
+
+def _values_exist(category: str, values=None, excluded: bool = False) -> Tuple[str, list]:
+    """
+    產生「group 在該類別有（符合 values 的）包含/排除標籤」的 EXISTS 子查詢
+    """
+    sql = (
+        "EXISTS (SELECT 1 FROM requirement_values v WHERE v.group_id = g.group_id "
+        "AND v.tag_category = ? AND v.excluded = ?"
+    )
+    params = [category, int(excluded)]
+    if not excluded and category in UNLIMITED_AS_UNLABELED_FIELDS:
+        # 將標註「不限」的獎學金視為未標註
+        sql += " AND v.value <> '不限'"
+    if values is not None:
+        values = sorted(values)
+        sql += f" AND v.value IN ({_placeholders(values)})"
+        params.extend(values)
+    return sql + ")", params
+
+
+def _category_condition(category: str, selections: List[str]) -> Tuple[str, list]:
+    """
+    將單一類別的選擇轉換為 SQL 條件（語意與 filters.check_category_match 相同）
+    """
+    user_set = set(selections)
+
+    # 1. 排除條件：使用者選擇的所有選項都在排除列表中時不顯示
+    user_values = sorted(user_set)
+    exclusion_sql = (
+        "(SELECT COUNT(DISTINCT v.value) FROM requirement_values v WHERE v.group_id = g.group_id "
+        f"AND v.tag_category = ? AND v.excluded = 1 AND v.value IN ({_placeholders(user_values)})) < ?"
+    )
+    exclusion_params = [category, *user_values, len(user_values)]
+
+    # 2. 處理「不限/未明定」或「未提及」選項（OR 邏輯）
+    marker = "未提及" if category in UNMENTIONED_FIELDS else "不限/未明定"
+    has_marker = marker in user_set
+    other_values = user_set - {marker}
+    if category == "學籍狀態" and has_marker and other_values & SPECIAL_STUDENT_STATUS:
+        # 特殊學籍（延畢生、休學擬復學）必須明確標註
+        other_values = other_values & SPECIAL_STUDENT_STATUS
+
+    labeled_sql, labeled_params = _values_exist(category)
+    if has_marker and not other_values:
+        sql, params = f"NOT {labeled_sql}", labeled_params
+    elif not has_marker:
+        sql, params = _values_exist(category, other_values)
+    else:
+        match_sql, match_params = _values_exist(category, other_values)
+        sql, params = f"(NOT {labeled_sql} OR {match_sql})", labeled_params + match_params
+
+    return f"{exclusion_sql} AND {sql}", exclusion_params + params
+
+
+def build_query(filters: Dict) -> Tuple[str, list]:
+    """
+    將 sidebar 的篩選條件字典轉換為單一 SQL 查詢
+
+    Args:
+        filters (Dict): 使用者在 sidebar 選擇的篩選條件字典
+
+    Returns:
+        Tuple[str, list]: (SQL 字串, 參數列表)，查詢結果為依語料順序排列的 scholarships.idx
+    """
+    where, params = [], []
+
+    # 關鍵字搜尋（search_text 已於載入時正規化）：只有完全比對寫入 SQL，容錯比對見 SqliteFilterEngine.filter_indices
+    if filters.get("keyword"):
+        query = normalize_text(filters["keyword"]).strip()
+        if max_edits_for(query) == 0:
+            where.append("instr(s.search_text, ?) > 0")
+            params.append(query)
+
+    if filters.get("exclude_undetermined_amount"):
+        where.append("s.amount_undetermined = 0")
+
+    # 只要有任一 group 符合所有類別條件與學業門檻即可顯示
+    group_conditions, group_params = ["g.scholarship_idx = s.idx"], []
+    for category in FILTER_CATEGORIES:
+        if filters.get(category):
+            sql, category_params = _category_condition(category, filters[category])
+            group_conditions.append(sql)
+            group_params.extend(category_params)
+    for metric, score in (filters.get("學業成績") or {}).items():
+        if score is None or metric not in ACADEMIC_COLUMNS:
+            continue
+        column = ACADEMIC_COLUMNS[metric]
+        operator = "<=" if metric in HIGHER_IS_STRICTER else ">="
+        group_conditions.append(f"(g.{column} IS NULL OR g.{column} {operator} ?)")
+        group_params.append(score)
+    where.append(f"EXISTS (SELECT 1 FROM groups g WHERE {' AND '.join(group_conditions)})")
+    params.extend(group_params)
+
+    return f"SELECT s.idx FROM scholarships s WHERE {' AND '.join(where)} ORDER BY s.idx", params
+
+
+# ==================== 引擎 ====================
+
+class SqliteFilterEngine:
+    """
+    以 SQLite 執行篩選的引擎
+
+    Note:
+        - 連線會被多個 Streamlit session 共用，查詢時以 lock 保護
+        - 預設使用記憶體資料庫；指定 db_path 可讓其他工具查詢同一份資料
+        - 容許錯字的關鍵字在 SQL 結果上以 fuzzy_contains 過濾（搜尋文字第一次需要時從資料庫讀取）
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._search_texts = None
+
+    @classmethod
+    def from_scholarships(cls, scholarships: List[Dict], db_path: str = ":memory:") -> "SqliteFilterEngine":
+        engine = cls(db_path)
+        with engine._lock:
+            load_corpus(engine.conn, scholarships)
+        return engine
+
+    def filter_indices(self, filters: Dict) -> List[int]:
+        """
+        Args:
+            filters (Dict): 使用者在 sidebar 選擇的篩選條件字典
+
+        Returns:
+            List[int]: 符合條件的獎學金在語料中的位置（依語料順序）
+        """
+        sql, params = build_query(filters)
+        with self._lock:
+            indices = [row[0] for row in self.conn.execute(sql, params)]
+            query = normalize_text(filters.get("keyword") or "").strip()
+            max_edits = max_edits_for(query)
+            if not query or max_edits == 0:
+                return indices
+            if self._search_texts is None:
+                self._search_texts = [row[0] for row in self.conn.execute("SELECT search_text FROM scholarships ORDER BY idx")]
+        return [i for i in indices if fuzzy_contains(query, self._search_texts[i], max_edits)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="將合併後的獎學金語料載入 SQLite 查詢資料庫")
+    parser.add_argument("--input", default="data/merged/scholarships_merged_300.json", help="合併後的 JSON 檔案")
+    parser.add_argument("--db-file", default="data/scholarships_query.db", help="輸出的 SQLite 資料庫")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    SqliteFilterEngine.from_scholarships(data, args.db_file)
+    print(f"✓ 已載入 {len(data)} 筆獎學金到 {args.db_file}")
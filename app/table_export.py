@@ -0,0 +1,177 @@
+"""
+篩選結果表格匯出（CSV / XLSX）
+
+供輔導老師把目前的篩選、排序結果匯出成試算表。每筆獎學金的顯示欄位
+（名稱、日期、新台幣金額、名額、網址與攤平的主要資格條件）在第一次匯出時預先計算一次，
+匯出時依排序順序逐塊寫入暫存檔（超過 SPOOL_BYTES 才落地到磁碟），不使用 pandas，
+即使匯出多個學年的完整語料，記憶體用量也有上限。
+
+XLSX 使用 openpyxl 的 write_only 模式逐列寫入；openpyxl 為選用套件，只在匯出 XLSX 時 import。
+"""
+
+import csv
+import importlib.util
+import io
+import tempfile
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from filters import extract_tags_from_group, extract_excluded_tags_from_group, iter_match_groups
+from ui_components import extract_amounts_and_quotas
+
+
+# ==================== 配置 ====================
+
+# 攤平成欄位的資格條件類別
+REQUIREMENT_COLUMNS = [
+    "學制", "年級", "學籍狀態", "學院", "國籍身分", "設籍地", "就讀地",
+    "特殊身份", "家庭境遇", "經濟相關證明", "補助/獎學金排斥",
+]
+
+HEADER = (
+    ["獎學金名稱", "申請開始日期", "申請截止日期", "獎助金額下限（新台幣）", "獎助金額上限（新台幣）", "獎助名額", "官方公告"]
+    + REQUIREMENT_COLUMNS
+    + ["學業成績要求"]
+)
+
+# 每次寫入的列數，以及暫存檔留在記憶體中的上限
+CHUNK_ROWS = 500
+SPOOL_BYTES = 8 * 1024 * 1024
+
+
+# ==================== 顯示欄位 ====================
+
+def _unique(values: Iterable[str]) -> List[str]:
+    seen = {}
+    for value in values:
+        if value:
+            seen.setdefault(value, None)
+    return list(seen)
+
+
+def build_export_row(scholarship: Dict) -> Tuple:
+    """
+    預先計算一筆獎學金的匯出欄位
+
+    Returns:
+        Tuple: 與 HEADER 對應的欄位值（金額為整數，其餘為字串）
+
+    Note:
+        - 資格條件取所有 group（已結合 common_tags）的聯集，以「、」連接
+        - 否定條件以「不含：」標示，例如「不含：碩士、博士」
+    """
+    amounts, quotas = extract_amounts_and_quotas(scholarship)
+    quota_values = [q[0] for q in quotas if q[0] > 0]
+    if quota_values:
+        min_q, max_q = min(quota_values), max(quota_values)
+        quota_text = f"{min_q}" if min_q == max_q else f"{min_q}~{max_q}"
+    else:
+        quota_text = ""
+
+    groups = list(iter_match_groups(scholarship))
+    requirement_values = []
+    for category in REQUIREMENT_COLUMNS:
+        included = _unique(v for g in groups for v in extract_tags_from_group(g, category))
+        excluded = _unique(v for g in groups for v in extract_excluded_tags_from_group(g, category))
+        text = "、".join(included)
+        if excluded:
+            text = f"{text}；不含：{'、'.join(excluded)}" if text else f"不含：{'、'.join(excluded)}"
+        requirement_values.append(text)
+    academic = _unique(
+        req.get("tag_value", "") for g in groups for req in g.get("requirements", [])
+        if req.get("tag_category") == "核心學業要求"
+    )
+
+    return (
+        scholarship.get("scholarship_name", ""),
+        scholarship.get("start_date") or "",
+        scholarship.get("end_date") or "",
+        int(min(a[0] for a in amounts)) if amounts else "",
+        int(max(a[0] for a in amounts)) if amounts else "",
+        quota_text,
+        scholarship.get("url") or "",
+        *requirement_values,
+        "；".join(academic),
+    )
+
+
+# ==================== 匯出 ====================
+
+def xlsx_available() -> bool:
+    """是否已安裝 openpyxl（不實際 import）"""
+    return importlib.util.find_spec("openpyxl") is not None
+
+
+class TableExporter:
+    """
+    以預先計算的顯示欄位匯出 CSV / XLSX（所有 session 共用，搭配 st.cache_resource）
+    """
+
+    def __init__(self, scholarships: List[Dict]):
+        self.scholarships = scholarships
+        self._rows: Optional[List[Tuple]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> List[Tuple]:
+        """依語料順序排列的匯出欄位（第一次使用時建立）"""
+        if self._rows is None:
+            with self._lock:
+                if self._rows is None:
+                    self._rows = [build_export_row(s) for s in self.scholarships]
+        return self._rows
+
+    def iter_csv(self, order: Sequence[int], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+        """
+        依排序順序逐塊產生 CSV（UTF-8 含 BOM，Excel 可直接開啟中文）
+
+        Args:
+            order (Sequence[int]): 排序後的獎學金位置
+            chunk_rows (int): 每塊的列數
+
+        Yields:
+            bytes: CSV 片段
+        """
+        rows = self.rows
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(HEADER)
+        yield "\ufeff".encode("utf-8") + buffer.getvalue().encode("utf-8")
+        for start in range(0, len(order), chunk_rows):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows[i] for i in order[start:start + chunk_rows])
+            yield buffer.getvalue().encode("utf-8")
+
+    def export_csv(self, order: Sequence[int]):
+        """
+        匯出 CSV
+
+        Returns:
+            SpooledTemporaryFile: 已回到開頭、可直接交給 st.download_button 的檔案
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        for chunk in self.iter_csv(order):
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
+
+    def export_xlsx(self, order: Sequence[int]):
+        """
+        匯出 XLSX（openpyxl write_only 模式逐列寫入）
+
+        Returns:
+            SpooledTemporaryFile: 已回到開頭、可直接交給 st.download_button 的檔案
+        """
+        from openpyxl import Workbook
+
+        rows = self.rows
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("獎學金")
+        sheet.append(HEADER)
+        for i in order:
+            sheet.append(rows[i])
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        workbook.save(spool)
+        spool.seek(0)
+        return spool
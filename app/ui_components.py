@@ -1,4 +1,3 @@
-import pandas as pd
 import streamlit as st
 from typing import List, Dict
 
@@ -18,7 +17,10 @@ def extract_obligations_from_group(group: Dict) -> List[str]:
 
 from collections import defaultdict
 import html
-from utils import format_number
+import re
+from utils import format_number, extract_numeric_info_from_tags
+from constants import EXCHANGE_RATES
+from filters import filter_cache_key
 
 #--- 排序按鈕相關函式 ---
 def toggle_sort(key):
@@ -38,6 +40,83 @@ def get_sort_label(label, key):
         return f"{label} {arrow}"
     return label
 
+#--- 提取金額與名額函式 ---
+def extract_amounts_and_quotas(scholarship):
+    """
+    掃描所有 groups 與 common_tags，提取獎助金額（已換算新台幣）與名額
+
+    Returns:
+        tuple: (amounts, quotas)，格式皆為 [(數值, 原始文字), ...]
+    """
+    groups = scholarship.get("tags", {}).get("groups", [])
+    common_tags = scholarship.get("tags", {}).get("common_tags", [])
+
+    amounts = []  # 格式: [(5000, "清寒組每名五千"), (10000, "優秀組每名一萬")]
+    quotas = []   # 格式: [(10, "每組十名"), (5, "特殊名額五名")]
+
+    # 1. 建立一個包含所有 requirements 的大列表
+    all_requirements = list(common_tags)
+    for group in groups:
+        all_requirements.extend(group.get("requirements", []))
+
+    # 2. 遍歷所有條件，提取數值
+    for req in all_requirements:
+        cat = req.get("tag_category")
+        raw_text = req.get("tag_value", "")
+
+        # 必須使用安全取值 (or {}) 來防止 NoneType Error
+        numerical_data = req.get("numerical") or {}
+        num_val = numerical_data.get("num_value")
+        unit = numerical_data.get("unit", "")
+
+        # 如果 numerical 沒值，嘗試從 standardized_value 補救
+        if num_val is None:
+            std_val = req.get("standardized_value")
+            if std_val and str(std_val).replace(",", "").replace(".", "").isdigit():
+                try:
+                    num_val = float(str(std_val).replace(",", ""))
+                except:
+                    pass
+
+        if num_val is None:
+            continue
+        if cat == "獎助金額":
+            # 匯率換算
+            if unit:
+                unit_clean = unit.strip().upper()
+                rate = EXCHANGE_RATES.get(unit_clean)
+                if not rate:
+                    for key, r in EXCHANGE_RATES.items():
+                        if key in unit_clean:
+                            rate = r
+                            break
+                if rate:
+                    num_val = num_val * rate
+            if float(num_val) > 0:
+                amounts.append((float(num_val), raw_text))
+        elif cat == "獎助名額":
+            quotas.append((int(float(num_val)), raw_text))
+    return amounts, quotas
+
+#--- 卡片標題列函式 ---
+def get_card_header(scholarship):
+    """
+    收合卡片的標題列：名稱｜截止日期｜金額範圍｜名額範圍
+    """
+    amounts, quotas = extract_amounts_and_quotas(scholarship)
+    parts = [scholarship.get('scholarship_name', '未命名獎學金')]
+    parts.append(f"截止 {scholarship.get('end_date') or '未定'}")
+    if amounts:
+        min_amt, max_amt = int(min(a[0] for a in amounts)), int(max(a[0] for a in amounts))
+        parts.append(f"{min_amt:,} 元" if min_amt == max_amt else f"{min_amt:,} ~ {max_amt:,} 元")
+    else:
+        parts.append("金額未定")
+    valid_quotas = [q[0] for q in quotas if q[0] > 0]
+    if valid_quotas:
+        min_q, max_q = min(valid_quotas), max(valid_quotas)
+        parts.append(f"{min_q} 名" if min_q == max_q else f"{min_q} ~ {max_q} 名")
+    return "　｜　".join(parts)
+
 # --- 生成 Tooltip HTML ---
 def create_tooltip_html(display_text, raw_texts):
     # 過濾空值並去重
@@ -58,11 +137,14 @@ def create_tooltip_html(display_text, raw_texts):
     </span>
     """
 
-# --- 核心渲染函式 (負責分組與畫圖) ---
-def render_requirements_grid(requirements_list):
-    if not requirements_list:
-        return
+# --- 資格條件格子 HTML (依類別與條件類型分組) ---
+def build_requirement_cells(requirements_list):
+    """
+    將資格條件依 (類別, 條件類型) 分組，每組產生一個格子的 HTML
 
+    Returns:
+        list: 每個格子的 HTML 字串（類別標題 + 帶 Tooltip 的顯示值）
+    """
     # 1. 分組邏輯：將相同「類別」且相同「條件類型」的歸類在一起
     # Key: (類別名稱, 條件類型)
     # Value: [req1, req2, ...] (條件物件的列表)
@@ -73,14 +155,8 @@ def render_requirements_grid(requirements_list):
         cond = req.get("condition_type", "")
         grouped_data[(cat, cond)].append(req)
 
-    # 2. 畫圖邏輯
-    cols = st.columns(3)
-    # 將 dict 轉為 list 以便 enumerate
-    grouped_items = list(grouped_data.items())
-    
-    for i, ((category, condition_type), req_group) in enumerate(grouped_items):
-        col = cols[i % 3]
-        
+    cells = []
+    for (category, condition_type), req_group in grouped_data.items():
         display_values = set()  # 用 set 來自動去除重複的顯示文字 (例如: "其他", "其他" -> "其他")
         tooltip_texts = []      # 收集所有原始說明文字
         
@@ -121,7 +197,7 @@ def render_requirements_grid(requirements_list):
             if d_text:
                 display_values.add(d_text)
         
-        # 3. 組合最終結果
+        # 組合最終結果
         # 如果集合中有多個不同的值 (例如: "英文", "日文")，用頓號連接
         final_display_str = "、".join(sorted(list(display_values)))
         if not final_display_str:
@@ -132,7 +208,116 @@ def render_requirements_grid(requirements_list):
         
         # 處理標題
         cat_label = category + ("（可選/多選一）" if condition_type == '包含' else "")
-        col.markdown(f"<b>{cat_label}</b><br>{final_html}", unsafe_allow_html=True)
+        cells.append(f"<b>{cat_label}</b><br>{final_html}")
+    return cells
+
+# --- 核心渲染函式 (負責分組與畫圖) ---
+def render_requirements_grid(requirements_list):
+    if not requirements_list:
+        return
+
+    cols = st.columns(3)
+    for i, cell_html in enumerate(build_requirement_cells(requirements_list)):
+        cols[i % 3].markdown(cell_html, unsafe_allow_html=True)
+
+# --- 整理要顯示的資格條件 ---
+# 不在資格格子中顯示的類別（另外列出或不顯示）
+HIDDEN_REQUIREMENT_CATEGORIES = ["應繳文件", "領獎學金後的義務", "其他（用於無法歸類的特殊要求）"]
+
+def get_display_requirements(requirements, tags):
+    """
+    過濾掉不顯示的類別，並在缺少金額、名額時補上 AI 提取的數值
+
+    Args:
+        requirements: 原始條件列表（common_tags 或某個 group 的 requirements）
+        tags: 用來提取金額、名額的 tags（整筆獎學金的 tags，或 {"groups": [group]}）
+    """
+    display = [req for req in requirements if req.get("tag_category") not in HIDDEN_REQUIREMENT_CATEGORIES]
+    tag_cats = [r.get("tag_category") for r in display]
+
+    if "獎助金額" not in tag_cats:
+        ai_amount, raw_amount = extract_numeric_info_from_tags(tags, "獎助金額")
+        if ai_amount:
+            display.append({"tag_category": "獎助金額", "standardized_value": ai_amount, "tag_value": raw_amount})
+
+    if "獎助名額" not in tag_cats:
+        ai_quota, raw_quota = extract_numeric_info_from_tags(tags, "獎助名額")
+        if ai_quota:
+            display.append({"tag_category": "獎助名額", "standardized_value": ai_quota, "tag_value": raw_quota})
+    return display
+
+#--- 附加檔案連結函式 ---
+def build_attachment_links_html(attachments):
+    """將「檔名 [網址] | 檔名 [網址]」格式的附件字串轉為並列的連結 HTML"""
+    att_links = []
+    for att in attachments.split('|'):
+        att = att.strip()
+        m = re.match(r"(.+?)\s*\[(https?://[^\]]+)\]", att)
+        if m:
+            name, url = m.group(1), m.group(2)
+            att_links.append(f"<a href='{url}' target='_blank'>{name}</a>")
+        else:
+            att_links.append(att)
+    return " | ".join(att_links)
+
+
+#--- 搜尋摘要 ---
+SNIPPET_RADIUS = 40
+
+def build_search_snippet_html(scholarship, span, radius=SNIPPET_RADIUS):
+    """
+    依搜尋索引記錄的相符位置（見 search_index.SearchIndex.postings），從申請資格中截取一段標示關鍵字的摘要
+
+    Args:
+        scholarship (Dict): 獎學金資料
+        span (Tuple[int, int]): 相符位置在「名稱 + 空白 + 申請資格」中的 (起點, 終點)
+        radius (int): 相符位置前後各保留的字數
+
+    Returns:
+        Optional[str]: 摘要 HTML；相符位置只在名稱中（標題列已顯示）時回傳 None
+    """
+    eligibility = scholarship.get('eligibility', '') or ''
+    offset = len(scholarship.get('scholarship_name', '')) + 1
+    start, end = span[0] - offset, span[1] - offset
+    if end <= 0:
+        return None
+    start = max(start, 0)
+    left, right = max(0, start - radius), min(len(eligibility), end + radius)
+    return (
+        "<div class='search-snippet'>"
+        + ("…" if left > 0 else "")
+        + html.escape(eligibility[left:start])
+        + f"<mark>{html.escape(eligibility[start:end])}</mark>"
+        + html.escape(eligibility[end:right])
+        + ("…" if right < len(eligibility) else "")
+        + "</div>"
+    )
+
+
+#--- 相似獎學金 ---
+def get_similar_scholarships(scholarship, scholarships_by_id):
+    """
+    依離線預先計算的 similar_scholarships 欄位（見 scripts/data_processing/build_similar_scholarships.py）
+    取得相似獎學金，語料中已不存在的 ID 會略過
+
+    Args:
+        scholarship (Dict): 獎學金資料
+        scholarships_by_id (Dict): 獎學金 ID（字串）→ 獎學金資料
+
+    Returns:
+        List[Dict]: 相似獎學金，依相似度由高到低排列
+    """
+    similar = []
+    for item in scholarship.get("similar_scholarships") or []:
+        neighbour = scholarships_by_id.get(str(item.get("id")))
+        if neighbour is not None:
+            similar.append(neighbour)
+    return similar
+
+
+def build_similar_link(scholarship):
+    """相似獎學金的連結：以名稱作為關鍵字的分享網址（見 url_state.py）"""
+    return "?" + filter_cache_key({"keyword": scholarship.get("scholarship_name", "")})
 
 
 # def get_requirements_df(group: Dict, exclude_categories: List[str] = None) -> pd.DataFrame:
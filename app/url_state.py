@@ -0,0 +1,183 @@
+"""
+以網址查詢參數保存篩選、排序與分頁狀態
+
+篩選條件以 filters.filter_cache_key() 的精簡標準形式寫入 st.query_params，
+例如 ?deg=碩士&college=工學院&econ=低收入戶&sort=end_date&order=asc&page=2，
+輔導老師可直接把網址傳給學生。開啟網址時解碼並填入 sidebar 的 widget。
+選擇了預設檢視以外的資料範圍時，分割區 ID 也一併寫入（例如 &corpus=ntu-114,ntu-113）。
+
+同一個標準字串也是 warm_cache / result_cache 的快取鍵，因此熱門的分享連結不需要重新計算。
+"""
+
+from typing import Collection, Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl
+
+import streamlit as st
+
+from constants import FILTER_OPTIONS
+from filters import FILTER_PARAM_NAMES, SCORE_PARAM_NAMES, filter_cache_key
+
+
+# ==================== 配置 ====================
+
+# 篩選欄位 → sidebar widget key
+FILTER_WIDGET_KEYS = {
+    "keyword": "sidebar_keyword",
+    "exclude_undetermined_amount": "filter_exclude_undetermined",
+    "學制": "filter_degree",
+    "年級": "filter_grade",
+    "學籍狀態": "filter_status",
+    "學院": "filter_college",
+    "國籍身分": "filter_nationality",
+    "設籍地": "filter_domicile",
+    "就讀地": "filter_study_loc",
+    "特殊身份": "filter_special",
+    "家庭境遇": "filter_family",
+    "經濟相關證明": "filter_economic",
+    "補助/獎學金排斥": "filter_exclusion",
+}
+SCORE_WIDGET_KEYS = {"GPA": "filter_gpa", "百分制": "filter_average", "排名": "filter_rank"}
+
+# 學業成績的合法範圍（與 sidebar number_input 相同）
+SCORE_RANGES = {"GPA": (0.0, 4.3), "百分制": (0.0, 100.0), "排名": (0.0, 100.0)}
+
+# 資料範圍（分割區 ID 以逗號連接；預設檢視不寫入）
+PARTITION_PARAM = "corpus"
+PARTITION_WIDGET_KEY = "corpus_partitions"
+
+SORT_FIELDS = {"amount", "end_date", "match"}
+DEFAULT_SORT = ("amount", "desc")
+
+
+# ==================== 編碼與解碼 ====================
+
+def encode_state(filters: Dict, sort_by: str, sort_order: str, page: int, partitions: Sequence[str] = ()) -> Dict[str, str]:
+    """
+    將目前狀態編碼為查詢參數（預設的排序、第 1 頁與預設檢視不寫入，讓網址保持精簡）
+
+    Args:
+        partitions (Sequence[str]): 預設檢視以外的資料範圍（選擇預設檢視時為空）
+
+    Returns:
+        Dict[str, str]: 查詢參數
+    """
+    params = dict(parse_qsl(filter_cache_key(filters)))
+    if partitions:
+        params[PARTITION_PARAM] = ",".join(partitions)
+    if (sort_by, sort_order) != DEFAULT_SORT:
+        params["sort"] = sort_by
+        params["order"] = sort_order
+    if page > 1:
+        params["page"] = str(page)
+    return params
+
+
+def decode_state(params: Mapping[str, str], partition_ids: Collection[str] = ()) -> Tuple[Dict, Optional[Tuple[str, str]], int, List[str]]:
+    """
+    解碼查詢參數，忽略無法辨識的參數與不在選項中的值
+
+    Args:
+        params (Mapping[str, str]): st.query_params 或等價的字典
+        partition_ids (Collection[str]): manifest 中的分割區 ID（不在其中的分割區忽略）
+
+    Returns:
+        Tuple[Dict, Optional[Tuple[str, str]], int, List[str]]: (篩選條件, (排序欄位, 方向) 或 None, 頁碼, 資料範圍)
+    """
+    filters = {}
+    for field, param in FILTER_PARAM_NAMES.items():
+        value = params.get(param)
+        if not value:
+            continue
+        if field == "keyword":
+            filters[field] = value
+        elif field == "exclude_undetermined_amount":
+            filters[field] = value == "1"
+        else:
+            selected = [v for v in value.split(",") if v in FILTER_OPTIONS[field]]
+            if selected:
+                filters[field] = selected
+
+    scores = {}
+    for metric, param in SCORE_PARAM_NAMES.items():
+        try:
+            score = float(params.get(param, ""))
+        except ValueError:
+            continue
+        low, high = SCORE_RANGES[metric]
+        if low <= score <= high:
+            scores[metric] = score
+    if scores:
+        filters["學業成績"] = scores
+
+    sort = None
+    if params.get("sort") in SORT_FIELDS and params.get("order") in ("asc", "desc"):
+        sort = (params["sort"], params["order"])
+
+    try:
+        page = max(1, int(params.get("page", "1")))
+    except ValueError:
+        page = 1
+
+    partitions = [p for p in (params.get(PARTITION_PARAM) or "").split(",") if p in partition_ids]
+    return filters, sort, page, partitions
+
+
+# ==================== Streamlit 整合 ====================
+
+def apply_filters_to_widgets(filters: Dict, reset: bool = False, partitions: Optional[Sequence[str]] = None):
+    """
+    將篩選條件填入 sidebar widget 的 session state
+
+    Args:
+        filters (Dict): 篩選條件（原始或已標準化皆可）
+        reset (bool): 是否把 filters 中沒有的條件清空（載入設定檔時使用）
+        partitions (Optional[Sequence[str]]): 資料範圍；空的列表表示回到預設檢視，None 表示不變更
+
+    Note:
+        需在建立 widget 之前呼叫（或在按鈕的 on_click callback 中呼叫）
+    """
+    defaults = {"keyword": "", "exclude_undetermined_amount": False}
+    for field, key in FILTER_WIDGET_KEYS.items():
+        if field in filters:
+            st.session_state[key] = filters[field]
+        elif reset:
+            st.session_state[key] = defaults.get(field, [])
+    scores = filters.get("學業成績") or {}
+    for metric, key in SCORE_WIDGET_KEYS.items():
+        if scores.get(metric) is not None:
+            st.session_state[key] = scores[metric]
+        elif reset:
+            st.session_state[key] = None
+    if partitions:
+        st.session_state[PARTITION_WIDGET_KEY] = list(partitions)
+    elif partitions is not None:
+        # 移除後 app 重新以預設檢視初始化資料範圍 widget
+        st.session_state.pop(PARTITION_WIDGET_KEY, None)
+
+
+def restore_from_query_params(partition_ids: Collection[str] = ()):
+    """
+    每個 session 第一次執行時，以網址參數填入 sidebar widget、資料範圍、排序與頁碼
+
+    Args:
+        partition_ids (Collection[str]): manifest 中的分割區 ID
+
+    Note:
+        需在建立 sidebar widget 之前呼叫；之後的 rerun 以 widget 狀態為準
+    """
+    if st.session_state.get("url_state_restored"):
+        return
+    st.session_state["url_state_restored"] = True
+
+    filters, sort, page, partitions = decode_state(st.query_params, partition_ids)
+    apply_filters_to_widgets(filters, partitions=partitions or None)
+    if sort is not None:
+        st.session_state["sort_by"], st.session_state["sort_order"] = sort
+    st.session_state["current_page"] = page
+
+
+def sync_query_params(filters: Dict, sort_by: str, sort_order: str, page: int, partitions: Sequence[str] = ()):
+    """將目前狀態寫回網址（內容相同時不更新）"""
+    params = encode_state(filters, sort_by, sort_order, page, partitions)
+    if st.query_params.to_dict() != params:
+        st.query_params.from_dict(params)
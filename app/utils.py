@@ -80,7 +80,11 @@ def get_min_amount_and_quota(scholarship):
 
 #--- 提取結束日期函式 ---
 def get_end_date(scholarship):
-    date_str = scholarship.get("end_date", "")
+    return parse_date(scholarship.get("end_date", ""))
+
+#--- 解析日期函式 ---
+def parse_date(date_str):
+    """解析 YYYY-MM-DD 或 YYYY/MM/DD 格式的日期，無法解析時回傳 None"""
     if not date_str:
         return None
     for fmt in ("%Y-%m-%d", "%Y/%m/%d"):
@@ -101,3 +105,15 @@ def format_number(val, tag_category=None):
         return str(int(round(float(val))))
     except Exception:
         return val
+
+#--- 語料版本函式 ---
+def compute_corpus_version(path):
+    """
+    以檔案內容的 SHA-256 作為語料版本，語料更新後預先計算的快取即失效
+    """
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
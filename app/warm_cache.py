@@ -0,0 +1,210 @@
+"""
+熱門篩選組合預熱快取
+
+在語料建置時，將熱門的篩選組合（設定檔指定，或從查詢紀錄中統計出現次數最多者）
+預先計算成篩選結果與各排序方式的完整順序，寫入 JSON 檔案。
+app 啟動時載入，遇到相同的篩選組合就直接使用快取結果，不需要執行篩選引擎與排序。
+
+快取檔記錄建置時的語料版本（utils.compute_corpus_version），語料更新後版本不符即整份失效；
+篩選語意改變時調高 CACHE_FORMAT，舊格式的快取檔同樣整份失效。
+
+使用方式（在專案根目錄執行）：
+    # 使用設定檔中的篩選組合（JSON 列表，每個元素為篩選條件字典）
+    python app/warm_cache.py --popular data/popular_filters.json
+    # 從查詢紀錄統計最常見的 50 組篩選條件
+    python app/warm_cache.py --query-log logs/query_log.jsonl --top 50
+"""
+
+import argparse
+import json
+import os
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional
+
+from filters import check_scholarship_match, check_undetermined_amount, canonicalize_filters, filter_cache_key
+from ranking import build_sort_keys
+from query_log import read_query_log
+from utils import compute_corpus_version
+
+
+# ==================== 配置 ====================
+
+DEFAULT_CACHE_FILE = "data/merged/warm_cache.json"
+
+# 快取檔格式（2：學業成績門檻改為以 group 為單位檢查）
+CACHE_FORMAT = 2
+
+# 預先計算的排序方式（與結果頁的排序按鈕一致）
+SORT_MODES = [("amount", True), ("amount", False), ("end_date", True), ("end_date", False)]
+
+
+def sort_mode_key(sort_by: str, descending: bool) -> str:
+    """排序方式在快取檔中的鍵，例如 amount:desc"""
+    return f"{sort_by}:{'desc' if descending else 'asc'}"
+
+
+# ==================== 熱門組合來源 ====================
+
+def load_popular_filters(path: str) -> List[Dict]:
+    """
+    讀取設定檔中的熱門篩選組合
+
+    Args:
+        path (str): JSON 檔案路徑，內容為篩選條件字典的列表
+
+    Returns:
+        List[Dict]: 標準化後的篩選條件列表
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return [canonicalize_filters(filters) for filters in json.load(f)]
+
+
+def mine_popular_filters(records: List[Dict], top: int) -> List[Dict]:
+    """
+    從查詢紀錄統計最常出現的篩選組合
+
+    Args:
+        records (List[Dict]): 查詢紀錄（見 query_log.QueryLogger）
+        top (int): 取出現次數最多的前 N 組
+
+    Returns:
+        List[Dict]: 標準化後的篩選條件列表（依出現次數遞減）
+
+    Note:
+        同一 session 在同一組條件下翻頁、切換排序會產生多筆紀錄，只計算一次
+    """
+    counts = Counter()
+    examples = {}
+    seen = set()
+    for record in records:
+        filters = record.get("filters", {})
+        key = filter_cache_key(filters)
+        if (record.get("session"), key) in seen:
+            continue
+        seen.add((record.get("session"), key))
+        counts[key] += 1
+        examples.setdefault(key, canonicalize_filters(filters))
+    return [examples[key] for key, _ in counts.most_common(top)]
+
+
+# ==================== 建置 ====================
+
+def build_warm_cache(scholarships: List[Dict], popular_filters: List[Dict], corpus_version: str) -> Dict:
+    """
+    預先計算熱門篩選組合的結果
+
+    Args:
+        scholarships (List[Dict]): 獎學金資料列表
+        popular_filters (List[Dict]): 要預先計算的篩選條件（未篩選的預設畫面一律包含在內）
+        corpus_version (str): 目前語料版本
+
+    Returns:
+        Dict: 可直接寫成 JSON 的快取內容
+            {"format": int, "corpus_version": str, "entries": [{"filters", "indices", "orders": {排序方式: 順序}}]}
+    """
+    sort_keys = build_sort_keys(scholarships)
+
+    entries = {}
+    for filters in [canonicalize_filters({})] + popular_filters:
+        key = filter_cache_key(filters)
+        if key in entries:
+            continue
+        indices = [
+            i for i, s in enumerate(scholarships)
+            if check_scholarship_match(s, filters) and (not filters.get("exclude_undetermined_amount") or not check_undetermined_amount(s))
+        ]
+        entries[key] = {
+            "filters": filters,
+            "indices": indices,
+            "orders": {
+                sort_mode_key(sort_by, descending): sorted(indices, key=sort_keys[sort_by].__getitem__, reverse=descending)
+                for sort_by, descending in SORT_MODES
+            },
+        }
+    return {"format": CACHE_FORMAT, "corpus_version": corpus_version, "entries": list(entries.values())}
+
+
+# ==================== 載入與查詢 ====================
+
+class WarmCacheEntry:
+    """單一篩選組合的預先計算結果（以 array('I') 保存）"""
+
+    __slots__ = ("indices", "orders")
+
+    def __init__(self, indices: List[int], orders: Dict[str, List[int]]):
+        self.indices = array("I", indices)
+        self.orders = {mode: array("I", order) for mode, order in orders.items()}
+
+    def order(self, sort_by: str, descending: bool) -> Optional[array]:
+        """取得指定排序方式的完整順序，沒有預先計算時回傳 None"""
+        return self.orders.get(sort_mode_key(sort_by, descending))
+
+
+class WarmCache:
+    """
+    啟動時載入的熱門篩選組合快取（唯讀，所有 session 共用）
+    """
+
+    def __init__(self, entries: Optional[Dict[str, WarmCacheEntry]] = None, status: str = "未建置"):
+        self.entries = entries or {}
+        self.status = status
+
+    @classmethod
+    def load(cls, path: str, corpus_version: str) -> "WarmCache":
+        """
+        載入快取檔
+
+        Args:
+            path (str): 快取檔路徑
+            corpus_version (str): 目前語料版本，與快取檔不符時整份失效
+
+        Returns:
+            WarmCache: 快取檔不存在、格式或版本不符時為空快取（status 說明原因）
+        """
+        if not os.path.exists(path):
+            return cls(status="未建置")
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != CACHE_FORMAT:
+            return cls(status=f"快取檔格式不符（快取 {data.get('format')}，目前 {CACHE_FORMAT}），請重新建置")
+        if data.get("corpus_version") != corpus_version:
+            return cls(status=f"語料版本不符（快取 {data.get('corpus_version')}，目前 {corpus_version}），已失效")
+        entries = {
+            filter_cache_key(entry["filters"]): WarmCacheEntry(entry["indices"], entry["orders"])
+            for entry in data.get("entries", [])
+        }
+        return cls(entries, status=f"已載入 {len(entries)} 組")
+
+    def get(self, filters: Dict) -> Optional[WarmCacheEntry]:
+        """查詢篩選條件的預先計算結果，沒有時回傳 None"""
+        if not self.entries:
+            return None
+        return self.entries.get(filter_cache_key(filters))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="預先計算熱門篩選組合的結果")
+    parser.add_argument("--input", default="data/merged/scholarships_merged_300.json", help="合併後的 JSON 檔案")
+    parser.add_argument("--output", default=DEFAULT_CACHE_FILE, help="輸出的快取檔")
+    parser.add_argument("--popular", default=None, help="熱門篩選組合設定檔（篩選條件字典的 JSON 列表）")
+    parser.add_argument("--query-log", default=None, help="查詢紀錄檔，從中統計熱門篩選組合（含輪替檔）")
+    parser.add_argument("--top", type=int, default=50, help="從查詢紀錄取出現次數最多的前 N 組")
+    args = parser.parse_args()
+
+    popular = []
+    if args.popular:
+        popular.extend(load_popular_filters(args.popular))
+    if args.query_log:
+        records = read_query_log(args.query_log)
+        popular.extend(mine_popular_filters(records, args.top))
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    cache = build_warm_cache(data, popular, compute_corpus_version(args.input))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"✓ 已預先計算 {len(cache['entries'])} 組篩選條件（語料版本 {cache['corpus_version']}）到 {args.output}")
@@ -0,0 +1,276 @@
+"""
+Streamlit 多 session 負載測試
+
+以 streamlit.testing.v1.AppTest 同時模擬 N 個 session，
+每個 session 重播一段接近真實使用的操作序列（勾選篩選條件、逐字輸入關鍵字、排序、翻頁），
+並回報：
+1. 每次 rerun 的延遲 p50 / p95 / p99
+2. 吞吐量（reruns/秒）、CPU 使用量（核心數）與 RSS 合計
+3. 飽和點：吞吐量不再明顯成長、或 p95 超過 SLO 的並行數
+
+AppTest 不是 thread-safe，因此每個 session 在各自的 process（spawn）中執行：
+先以一次未計時的 run 載入語料與索引，所有 session 都預熱完成後才同時開始操作。
+各 process 的 st.cache_resource 彼此獨立，因此結果反映的是並行 rerun 爭用 CPU 時的延遲與吞吐量；
+RSS 合計包含每個 process 各自的語料副本，會高於單一 instance 的實際記憶體用量。
+
+任何 session 執行失敗（例外或 process 異常結束）都會立即中止測試並以非零狀態結束，
+不會被當成飽和點。
+
+使用方式（在專案根目錄執行）：
+    python scripts/benchmarks/load_test.py --levels 1,2,4,8,16 --actions 30
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import sys
+import threading
+import time
+from typing import Dict, List
+
+from streamlit.testing.v1 import AppTest
+
+# --- Configuration ---
+# AppTest 以呼叫端檔案解析相對路徑，因此使用絕對路徑（需在專案根目錄執行）
+APP_FILE = os.path.abspath(os.path.join("app", "app.py"))
+APP_DIR = os.path.abspath("app")
+
+# sidebar 多選篩選條件的 widget key
+FILTER_WIDGET_KEYS = [
+    "filter_degree", "filter_grade", "filter_status", "filter_college",
+    "filter_nationality", "filter_domicile", "filter_study_loc",
+    "filter_economic", "filter_family", "filter_special", "filter_exclusion",
+]
+
+# 模擬輸入的關鍵字（逐字輸入，每個字觸發一次 rerun）
+KEYWORDS = ["清寒", "原住民", "研究生", "基金會", "僑生", "工學院"]
+
+# 操作類型與權重
+ACTIONS = [("toggle_filter", 5), ("type_keyword", 2), ("clear_keyword", 1), ("sort", 2), ("paginate", 3)]
+# ---------------------
+
+
+def percentile(values: List[float], p: float) -> float:
+    """最近秩法百分位數"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def current_rss_bytes() -> int:
+    """目前 process 的 RSS（Linux 讀取 /proc，其他平台退回最大 RSS）"""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # macOS 的 ru_maxrss 單位為 bytes，Linux 為 KB
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def new_session(timeout: float) -> AppTest:
+    """建立一個已略過歡迎視窗的 session"""
+    at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+    at.session_state["has_seen_welcome"] = True
+    return at
+
+
+def timed_run(at: AppTest, latencies: List[float]):
+    start = time.perf_counter()
+    at.run()
+    latencies.append(time.perf_counter() - start)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def perform_action(at: AppTest, action: str, rng: random.Random, latencies: List[float]):
+    """執行一個使用者操作，每次觸發 rerun 都記錄延遲"""
+    if action == "toggle_filter":
+        widget = at.sidebar.multiselect(key=rng.choice(FILTER_WIDGET_KEYS))
+        option = rng.choice(widget.options)
+        if option in widget.value:
+            widget.unselect(option)
+        else:
+            widget.select(option)
+        timed_run(at, latencies)
+    elif action == "type_keyword":
+        keyword = rng.choice(KEYWORDS)
+        for i in range(1, len(keyword) + 1):
+            at.sidebar.text_input(key="sidebar_keyword").input(keyword[:i])
+            timed_run(at, latencies)
+    elif action == "clear_keyword":
+        at.sidebar.text_input(key="sidebar_keyword").input("")
+        timed_run(at, latencies)
+    elif action == "sort":
+        at.button(key=rng.choice(["sort_amount", "sort_enddate"])).click()
+        timed_run(at, latencies)
+    elif action == "paginate":
+        candidates = [key for key in ("next_page", "prev_page") if not at.button(key=key).disabled]
+        if candidates:
+            at.button(key=rng.choice(candidates)).click()
+            timed_run(at, latencies)
+
+
+def simulate_session(seed: int, n_actions: int, timeout: float, barrier, reports):
+    """
+    在獨立 process 中模擬單一 session 的完整操作序列
+
+    Args:
+        seed (int): 亂數種子（同時作為 session 編號）
+        n_actions (int): 操作數
+        timeout (float): 單次 rerun 的逾時秒數
+        barrier (multiprocessing.Barrier): 所有 session 預熱完成後同時開始
+        reports (multiprocessing.Queue): 回傳 {"seed", "latencies", "start", "end", "cpu", "rss", "error"}
+    """
+    # 與 `streamlit run app/app.py` 相同：app 內模組以平面方式 import
+    sys.path.insert(0, APP_DIR)
+    rng = random.Random(seed)
+    names, weights = zip(*ACTIONS)
+    latencies = []
+    report = {"seed": seed, "latencies": latencies, "start": 0.0, "end": 0.0, "cpu": 0.0, "rss": 0, "error": None}
+    try:
+        try:
+            # 預熱：載入語料並建立索引（不計時）
+            timed_run(new_session(timeout), [])
+            # AppTest 在沒有 ScriptRunContext 的 thread 上設定 widget，略過大量警告（需在 AppTest 設定 logger 之後）
+            logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+        except Exception:
+            barrier.abort()
+            raise
+        barrier.wait()
+
+        cpu_start = time.process_time()
+        report["start"] = time.time()
+        at = new_session(timeout)
+        timed_run(at, latencies)
+        for action in rng.choices(names, weights=weights, k=n_actions):
+            perform_action(at, action, rng, latencies)
+        report["end"] = time.time()
+        report["cpu"] = time.process_time() - cpu_start
+        report["rss"] = current_rss_bytes()
+    except threading.BrokenBarrierError:
+        report["error"] = "其他 session 預熱失敗，未開始"
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+    reports.put(report)
+
+
+def run_level(concurrency: int, n_actions: int, timeout: float, seed: int) -> Dict:
+    """
+    以指定並行數執行一輪負載測試（每個 session 一個 process）
+
+    Returns:
+        Dict: 延遲百分位數、吞吐量、CPU、RSS 合計與錯誤訊息
+    """
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(concurrency)
+    reports = ctx.Queue()
+    processes = [
+        ctx.Process(target=simulate_session, args=(seed * 1000 + i, n_actions, timeout, barrier, reports))
+        for i in range(concurrency)
+    ]
+    for p in processes:
+        p.start()
+
+    # process 異常結束（例如被 OOM killer 終止）時不會回報，不能無限等待
+    collected = []
+    while len(collected) < concurrency:
+        try:
+            collected.append(reports.get(timeout=1.0))
+        except queue.Empty:
+            if not any(p.is_alive() for p in processes):
+                break
+    for p in processes:
+        p.join()
+
+    errors = [f"session {r['seed']}: {r['error']}" for r in collected if r["error"]]
+    if len(collected) < concurrency:
+        reported = {r["seed"] for r in collected}
+        errors.extend(
+            f"session {seed * 1000 + i}: process 異常結束（exit code {p.exitcode}）"
+            for i, p in enumerate(processes) if seed * 1000 + i not in reported
+        )
+
+    latencies = [latency for r in collected for latency in r["latencies"]]
+    wall = max((r["end"] for r in collected), default=0.0) - min((r["start"] for r in collected), default=0.0)
+    return {
+        "concurrency": concurrency,
+        "reruns": len(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "throughput": len(latencies) / wall if wall > 0 else 0.0,
+        "cpu_cores": sum(r["cpu"] for r in collected) / wall if wall > 0 else 0.0,
+        "rss_mb": sum(r["rss"] for r in collected) / 1024 / 1024,
+        "errors": errors,
+    }
+
+
+def find_saturation(results: List[Dict], slo_p95: float, min_gain: float) -> Dict:
+    """
+    找出飽和點：p95 超過 SLO，或吞吐量成長低於 min_gain 的第一個並行數
+
+    Returns:
+        Dict: {"saturated_at": 並行數或 None, "max_sustainable": 最後一個未飽和的並行數}
+
+    Note:
+        - 只接受沒有錯誤的結果；有錯誤的一輪在 main 中直接中止，不視為飽和
+    """
+    max_sustainable = None
+    for prev, cur in zip([None] + results[:-1], results):
+        saturated = cur["p95"] > slo_p95
+        if prev is not None and cur["throughput"] < prev["throughput"] * (1 + min_gain):
+            saturated = True
+        if saturated:
+            return {"saturated_at": cur["concurrency"], "max_sustainable": max_sustainable}
+        max_sustainable = cur["concurrency"]
+    return {"saturated_at": None, "max_sustainable": max_sustainable}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamlit 多 session 負載測試")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="逐輪測試的並行 session 數（逗號分隔）")
+    parser.add_argument("--actions", type=int, default=20, help="每個 session 的操作數")
+    parser.add_argument("--slo-p95", type=float, default=1.0, help="p95 rerun 延遲上限（秒）")
+    parser.add_argument("--min-gain", type=float, default=0.1, help="並行數增加時，吞吐量至少需成長的比例")
+    parser.add_argument("--timeout", type=float, default=60.0, help="單次 rerun 的逾時秒數")
+    parser.add_argument("--seed", type=int, default=0, help="亂數種子")
+    args = parser.parse_args()
+
+    levels = [int(x) for x in args.levels.split(",")]
+
+    results = []
+    print(f"{'並行數':>6} {'reruns':>7} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8} {'reruns/s':>9} {'CPU核':>6} {'RSS合計(MB)':>11}")
+    for level in levels:
+        r = run_level(level, args.actions, args.timeout, args.seed)
+        if r["errors"]:
+            print(f"❌ 並行數 {level} 有 {len(r['errors'])} 個 session 執行失敗，中止測試：")
+            for error in r["errors"]:
+                print(f"  ❌ {error}")
+            sys.exit(1)
+        results.append(r)
+        print(
+            f"{r['concurrency']:>6} {r['reruns']:>7} {r['p50']:>8.3f} {r['p95']:>8.3f} {r['p99']:>8.3f} "
+            f"{r['throughput']:>9.2f} {r['cpu_cores']:>6.2f} {r['rss_mb']:>11.1f}"
+        )
+
+    saturation = find_saturation(results, args.slo_p95, args.min_gain)
+    print("\n--- 結果 ---")
+    if saturation["saturated_at"] is None:
+        print(f"在測試範圍內尚未飽和（最高 {levels[-1]} 個並行 session）")
+    else:
+        print(f"飽和點：{saturation['saturated_at']} 個並行 session")
+        print(f"建議單一 instance 承載上限：{saturation['max_sustainable'] or '少於 ' + str(levels[0])} 個並行 session")
+
+
+if __name__ == "__main__":
+    main()
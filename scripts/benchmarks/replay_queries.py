@@ -0,0 +1,156 @@
+"""
+查詢紀錄重播基準測試
+
+讀取 app 記錄的查詢紀錄（見 app/query_log.py，含輪替檔案），依原順序對各篩選引擎重播，
+並回報每個引擎的延遲分布（p50 / p95 / p99 / 平均 / 最大）與結果是否一致。
+
+可用的引擎：
+- python：filters.check_scholarship_match，依固定順序檢查類別
+- planned：同上，但使用 selectivity.SelectivityStats 的查詢計畫（統計會隨重播累積）
+- sqlite：sql_engine.SqliteFilterEngine
+- matrix：matrix_engine.MatrixFilterEngine
+- sharded：sharded_engine.ShardedFilterEngine（worker 數為 CPU 核心數）
+
+使用方式（在專案根目錄執行）：
+    python scripts/benchmarks/replay_queries.py --log logs/query_log.jsonl --engines python,planned,matrix
+
+以 python 為第一個引擎（預設）時，「結果不一致」為 0 即表示該引擎與 check_scholarship_match 的結果完全相同。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+# --- Configuration ---
+APP_DIR = os.path.abspath("app")
+DATA_FILE = os.path.join("data", "merged", "scholarships_merged_300.json")
+# ---------------------
+
+sys.path.insert(0, APP_DIR)
+
+from filters import check_scholarship_match, check_undetermined_amount  # noqa: E402
+from selectivity import SelectivityStats  # noqa: E402
+from query_log import read_query_log  # noqa: E402
+
+
+def build_engines(scholarships: List[Dict], names: List[str]) -> Dict[str, Callable[[Dict], List[int]]]:
+    """
+    建立要比較的篩選引擎
+
+    Returns:
+        Dict[str, Callable]: 引擎名稱 → 接受篩選條件、回傳獎學金位置列表的函式
+    """
+    engines = {}
+    for name in names:
+        if name == "python":
+            engines[name] = lambda f: [
+                i for i, s in enumerate(scholarships)
+                if check_scholarship_match(s, f) and (not f.get("exclude_undetermined_amount") or not check_undetermined_amount(s))
+            ]
+        elif name == "planned":
+            stats = SelectivityStats.from_corpus(scholarships)
+
+            def run_planned(f, stats=stats):
+                plan = stats.plan(f)
+                result = [
+                    i for i, s in enumerate(scholarships)
+                    if check_scholarship_match(s, f, plan) and (not f.get("exclude_undetermined_amount") or not check_undetermined_amount(s))
+                ]
+                stats.commit(plan)
+                return result
+            engines[name] = run_planned
+        elif name == "sqlite":
+            from sql_engine import SqliteFilterEngine
+            engines[name] = SqliteFilterEngine.from_scholarships(scholarships).filter_indices
+        elif name == "matrix":
+            from matrix_engine import MatrixFilterEngine
+            engines[name] = MatrixFilterEngine(scholarships).filter_indices
+        elif name == "sharded":
+            from sharded_engine import ShardedFilterEngine
+            # 重播結束後以 close_engines() 結束 worker process
+            engines[name] = ShardedFilterEngine(scholarships, os.cpu_count() or 1).filter_indices
+        else:
+            raise ValueError(f"未知的引擎：{name}")
+    return engines
+
+
+def close_engines(engines: Dict[str, Callable]):
+    """結束引擎持有的資源（分片引擎的 worker process）"""
+    for engine in engines.values():
+        close = getattr(getattr(engine, "__self__", None), "close", None)
+        if close is not None:
+            close()
+
+
+def percentile(values: List[float], p: float) -> float:
+    """最近秩法百分位數"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def replay(records: List[Dict], engines: Dict[str, Callable], repeat: int) -> Dict:
+    """
+    依序重播所有查詢
+
+    Returns:
+        Dict: 引擎名稱 → {"latencies": [...毫秒], "mismatches": 與第一個引擎結果不同的查詢數}
+    """
+    results = {name: {"latencies": [], "mismatches": 0} for name in engines}
+    for _ in range(repeat):
+        for record in records:
+            filters = record.get("filters", {})
+            reference = None
+            for name, engine in engines.items():
+                start = time.perf_counter()
+                indices = engine(filters)
+                results[name]["latencies"].append((time.perf_counter() - start) * 1000)
+                if reference is None:
+                    reference = indices
+                elif indices != reference:
+                    results[name]["mismatches"] += 1
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="以查詢紀錄重播比較篩選引擎")
+    parser.add_argument("--log", default=os.path.join("logs", "query_log.jsonl"), help="查詢紀錄檔（SCHOLARSHIP_QUERY_LOG 的路徑）")
+    parser.add_argument("--data", default=DATA_FILE, help="合併後的獎學金 JSON")
+    parser.add_argument("--engines", default="python,planned,sqlite,matrix,sharded", help="要比較的引擎（逗號分隔，第一個為結果比對基準）")
+    parser.add_argument("--repeat", type=int, default=1, help="重播次數")
+    parser.add_argument("--limit", type=int, default=None, help="只重播前 N 筆查詢")
+    args = parser.parse_args()
+
+    records = read_query_log(args.log)
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print(f"❌ 找不到查詢紀錄：{args.log}")
+        return
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        scholarships = json.load(f)
+
+    print(f"--- 重播 {len(records)} 筆查詢 × {args.repeat} 次，語料 {len(scholarships)} 筆 ---")
+    engines = build_engines(scholarships, args.engines.split(","))
+    try:
+        results = replay(records, engines, args.repeat)
+    finally:
+        close_engines(engines)
+
+    print(f"\n{'引擎':<10} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'平均(ms)':>9} {'最大(ms)':>9} {'結果不一致':>8}")
+    for name, r in results.items():
+        lat = r["latencies"]
+        print(
+            f"{name:<10} {percentile(lat, 50):>9.3f} {percentile(lat, 95):>9.3f} {percentile(lat, 99):>9.3f} "
+            f"{sum(lat) / len(lat):>9.3f} {max(lat):>9.3f} {r['mismatches']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
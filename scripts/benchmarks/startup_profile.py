@@ -0,0 +1,166 @@
+"""
+App 冷啟動分析與時間預算
+
+在全新的 Python process 中（以 -X importtime 執行）依序量測冷啟動各階段：
+1. import：import app/app.py（含 Streamlit 與所有模組層級的 import）
+2. corpus：載入語料
+3. indexes：建立請求路徑需要的共用資源（選擇率統計、學業成績索引、排序鍵、預熱快取）
+4. first_run：第一個 session 的第一次完整 rerun（AppTest）
+
+並解析 -X importtime 的輸出，列出累計 import 時間最長的模組。
+超過 --budget-ms，或比 --baseline 記錄的結果慢超過 --tolerance 時，以結束碼 1 結束，
+可直接放進 CI 檢查冷啟動是否退步。
+
+使用方式（在專案根目錄執行）：
+    python scripts/benchmarks/startup_profile.py --budget-ms 3000
+    python scripts/benchmarks/startup_profile.py --save-baseline scripts/benchmarks/startup_baseline.json
+    python scripts/benchmarks/startup_profile.py --baseline scripts/benchmarks/startup_baseline.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# --- Configuration ---
+APP_DIR = os.path.abspath("app")
+APP_FILE = os.path.join(APP_DIR, "app.py")
+# 冷啟動階段不應載入的重量級模組（只在選用功能第一次使用時才 import）
+HEAVY_MODULES = ["pandas", "numpy", "sklearn", "scipy"]
+# ---------------------
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)\s*$")
+
+
+def run_child():
+    """在子 process 中量測各階段耗時，結果以 JSON 寫到 stdout（-X importtime 的輸出在 stderr）"""
+    phases = {}
+    sys.path.insert(0, APP_DIR)
+
+    start = time.perf_counter()
+    import app  # noqa: F401
+    phases["import"] = time.perf_counter() - start
+    loaded_heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    start = time.perf_counter()
+    selection = app.load_corpus_manifest().default_selection
+    scholarships = app.load_scholarships(selection)
+    phases["corpus"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app.get_selectivity_stats(selection)
+    app.get_academic_index(selection)
+    app.get_sort_keys(selection)
+    app.get_warm_cache(selection)
+    phases["indexes"] = time.perf_counter() - start
+
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP_FILE, default_timeout=120)
+    at.session_state["has_seen_welcome"] = True
+    start = time.perf_counter()
+    at.run()
+    phases["first_run"] = time.perf_counter() - start
+
+    json.dump({
+        "phases_ms": {k: round(v * 1000, 1) for k, v in phases.items()},
+        "corpus_size": len(scholarships),
+        "heavy_modules_on_import": loaded_heavy,
+        "exception": at.exception[0].message if at.exception else None,
+    }, sys.stdout)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    解析 -X importtime 的輸出
+
+    Returns:
+        List[Tuple[str, int, int]]: (模組名稱, 自身耗時 us, 累計耗時 us)
+    """
+    rows = []
+    for line in stderr.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2))))
+    return rows
+
+
+def profile() -> Dict:
+    """以全新的子 process 執行一次冷啟動量測"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child"],
+        capture_output=True, text=True, encoding="utf-8"
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(proc.stderr)
+    result["total_ms"] = round(sum(result["phases_ms"].values()), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="App 冷啟動分析與時間預算")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=3, help="冷啟動次數（取中位數）")
+    parser.add_argument("--top", type=int, default=15, help="列出累計 import 時間最長的前 N 個模組")
+    parser.add_argument("--budget-ms", type=float, default=None, help="冷啟動總時間上限（毫秒）")
+    parser.add_argument("--baseline", default=None, help="基準結果 JSON，比基準慢超過 tolerance 即失敗")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="相對基準可容許的退步比例")
+    parser.add_argument("--save-baseline", default=None, help="將本次結果寫入基準 JSON")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return
+
+    results = []
+    for i in range(args.runs):
+        r = profile()
+        if r["exception"]:
+            print(f"❌ App 執行失敗：{r['exception']}")
+            sys.exit(1)
+        results.append(r)
+        print(f"第 {i + 1} 次：{r['total_ms']:.1f} ms  " + "  ".join(f"{k}={v:.1f}" for k, v in r["phases_ms"].items()))
+
+    results.sort(key=lambda r: r["total_ms"])
+    median = results[len(results) // 2]
+
+    print(f"\n--- 冷啟動各階段（中位數，語料 {median['corpus_size']} 筆）---")
+    for phase, ms in median["phases_ms"].items():
+        print(f"{phase:<10} {ms:>9.1f} ms")
+    print(f"{'total':<10} {median['total_ms']:>9.1f} ms")
+
+    print(f"\n--- 累計 import 時間前 {args.top} 名 ---")
+    for name, self_us, cumulative_us in sorted(median["imports"], key=lambda x: -x[2])[:args.top]:
+        print(f"{cumulative_us / 1000:>9.1f} ms  (自身 {self_us / 1000:>7.1f} ms)  {name}")
+
+    failed = False
+    if median["heavy_modules_on_import"]:
+        print(f"\n❌ 冷啟動時載入了重量級模組：{', '.join(median['heavy_modules_on_import'])}")
+        failed = True
+    if args.budget_ms is not None and median["total_ms"] > args.budget_ms:
+        print(f"\n❌ 冷啟動 {median['total_ms']:.1f} ms 超過預算 {args.budget_ms:.1f} ms")
+        failed = True
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        limit = baseline["total_ms"] * (1 + args.tolerance)
+        if median["total_ms"] > limit:
+            print(f"\n❌ 冷啟動 {median['total_ms']:.1f} ms 比基準 {baseline['total_ms']:.1f} ms 慢超過 {args.tolerance:.0%}")
+            failed = True
+        else:
+            print(f"\n✓ 冷啟動 {median['total_ms']:.1f} ms（基準 {baseline['total_ms']:.1f} ms，上限 {limit:.1f} ms）")
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"total_ms": median["total_ms"], "phases_ms": median["phases_ms"]}, f, ensure_ascii=False, indent=2)
+        print(f"✓ 已寫入基準：{args.save_baseline}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
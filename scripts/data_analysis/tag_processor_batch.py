@@ -2,8 +2,9 @@ import os
 import json
 from google import genai
 from google.genai import types
-from pydantic import BaseModel, Field, ValidationError
-from typing import List, Literal, Optional, Any
+from pydantic import ValidationError
+
+from tag_schema import CATEGORIES, FinalTagsStructure
 
 # --- 1. 配置與初始化 ---
 MODEL_NAME = 'gemini-2.5-flash'
@@ -29,58 +30,7 @@ except Exception:
     raise # 在無法連接時拋出錯誤，確保程序停止。
 
 
-# --- 2. 最終版 19 個類別定義 (用於 Pydantic Literal 限制) ---
-CATEGORIES = Literal[
-    "學制", "年級", "學籍狀態", "學院", 
-    "國籍身分", "設籍地", "就讀地", 
-    "特殊身份", "家庭境遇","經濟相關證明", 
-    "核心學業要求", "操行/品德", "特殊能力/專長",
-    "補助/獎學金排斥", "領獎學金後的義務", "獎助金額", "獎助名額", "應繳文件",
-    "其他（用於無法歸類的特殊要求）"
-]
-CONDITION_TYPES = Literal["限於", "包含", "屬性"]
-
-
-# --- 3. Pydantic 巢狀結構定義 ---
-
-class NumericalAttributes(BaseModel):
-    # 用於儲存可計算的數值資訊
-    num_value: float = Field(description="核心數值")
-    unit: Optional[str] = Field(None, description="單位")
-    # 針對成績的額外欄位
-    academic_scope: Optional[Literal["學期", "學年", "不適用"]] = Field(None, description="範圍")
-    academic_metric: Optional[Literal["百分制", "GPA", "排名", "操行"]] = Field(None, description="評估標準或類型")
-
-class SubTag(BaseModel):
-    """描述單一的條件、限制或屬性"""
-    tag_category: CATEGORIES = Field(description="標籤大類別")
-    condition_type: CONDITION_TYPES = Field(description="條件類型")
-    
-    # 原始文本 (給人類看)
-    tag_value: str = Field(description="原始描述")
-    
-    # 標準化值 (給前端篩選用)
-    standardized_value: Optional[str] = Field(None, description="標準化詞彙")
-    
-    # 數值資料 (給前端排序/計算用)
-    numerical: Optional[NumericalAttributes] = Field(None, description="數值資料")
-
-class ScholarshipGroup(BaseModel):
-    """代表獎學金內的一個獨立申請組別或階段。"""
-    group_name: str = Field(
-        description="組別名稱"
-    )
-    requirements: List[SubTag] = Field(
-        description="此組別的申請條件或屬性"
-    )
-
-class FinalTagsStructure(BaseModel):
-    # 最終輸出結構：包含所有組別和頂層 common tags
-    groups: List[ScholarshipGroup] = Field(
-        default_factory=list)
-    common_tags: List[SubTag] = Field(
-        default_factory=list)
-
+# --- 2-3. 類別定義與 Pydantic 巢狀結構 (定義於 tag_schema.py，與合併後的驗證共用) ---
 
 # 最終用於 API 呼叫的 Schema (JSON Schema 格式)
 FINAL_SCHEMA_PYDANTIC = FinalTagsStructure.model_json_schema()
@@ -0,0 +1,63 @@
+"""
+AI 標籤輸出的 Pydantic 結構定義
+
+tag_processor_batch.py（要求 Gemini 依此結構輸出並驗證）與 validate_tags.py（合併後的語料驗證）共用。
+本模組不依賴 GCP 設定，可以單獨匯入。
+"""
+
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+# --- 1. 最終版 19 個類別定義 (用於 Pydantic Literal 限制) ---
+CATEGORIES = Literal[
+    "學制", "年級", "學籍狀態", "學院", 
+    "國籍身分", "設籍地", "就讀地", 
+    "特殊身份", "家庭境遇","經濟相關證明", 
+    "核心學業要求", "操行/品德", "特殊能力/專長",
+    "補助/獎學金排斥", "領獎學金後的義務", "獎助金額", "獎助名額", "應繳文件",
+    "其他（用於無法歸類的特殊要求）"
+]
+CONDITION_TYPES = Literal["限於", "包含", "屬性"]
+
+
+# --- 2. Pydantic 巢狀結構定義 ---
+
+class NumericalAttributes(BaseModel):
+    # 用於儲存可計算的數值資訊
+    num_value: float = Field(description="核心數值")
+    unit: Optional[str] = Field(None, description="單位")
+    # 針對成績的額外欄位
+    academic_scope: Optional[Literal["學期", "學年", "不適用"]] = Field(None, description="範圍")
+    academic_metric: Optional[Literal["百分制", "GPA", "排名", "操行"]] = Field(None, description="評估標準或類型")
+
+class SubTag(BaseModel):
+    """描述單一的條件、限制或屬性"""
+    tag_category: CATEGORIES = Field(description="標籤大類別")
+    condition_type: CONDITION_TYPES = Field(description="條件類型")
+    
+    # 原始文本 (給人類看)
+    tag_value: str = Field(description="原始描述")
+    
+    # 標準化值 (給前端篩選用)
+    standardized_value: Optional[str] = Field(None, description="標準化詞彙")
+    
+    # 數值資料 (給前端排序/計算用)
+    numerical: Optional[NumericalAttributes] = Field(None, description="數值資料")
+
+class ScholarshipGroup(BaseModel):
+    """代表獎學金內的一個獨立申請組別或階段。"""
+    group_name: str = Field(
+        description="組別名稱"
+    )
+    requirements: List[SubTag] = Field(
+        description="此組別的申請條件或屬性"
+    )
+
+class FinalTagsStructure(BaseModel):
+    # 最終輸出結構：包含所有組別和頂層 common tags
+    groups: List[ScholarshipGroup] = Field(
+        default_factory=list)
+    common_tags: List[SubTag] = Field(
+        default_factory=list)
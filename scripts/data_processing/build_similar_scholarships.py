@@ -0,0 +1,172 @@
+"""
+相似獎學金推薦（離線預先計算）
+
+為每筆獎學金找出內容最相近的前 k 筆，寫回整合資料的 `similar_scholarships` 欄位，
+App 顯示「相似獎學金」時只需要依 ID 查表，執行期間不做任何相似度計算。
+
+向量由兩部分組成（各自 L2 正規化後依權重合併）：
+1. 文本：full_text_for_llm 的字元 2~3-gram TF-IDF（中文不需斷詞；沒有全文時改用名稱 + 申請資格）
+2. 標籤簽章：每個已標準化的資格條件（例如「學院=工學院」、「學制!=博士」）的 TF-IDF
+
+可選擇以 TruncatedSVD（LSA）降維；相似度為餘弦相似度，以分塊的稀疏矩陣乘積計算
+（每次 block_size 列 × 全部語料），記憶體用量為 O(block_size × N)，不需要兩兩比較的 Python 迴圈。
+
+使用方式（在專案根目錄執行）：
+    python scripts/data_processing/build_similar_scholarships.py
+    python scripts/data_processing/build_similar_scholarships.py --top-k 8 --svd-components 0
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+# --- Configuration ---
+APP_DIR = os.path.abspath("app")
+MERGED_FILE = os.path.join("data", "merged", "scholarships_merged_300.json")
+FULL_TEXT_FILE = os.path.join("data", "processed", "scholarships_with_full_text_for_llm.json")
+OUTPUT_FIELD = "similar_scholarships"
+# ---------------------
+
+sys.path.insert(0, APP_DIR)
+
+from filters import is_negative_condition  # noqa: E402
+
+
+def build_text(scholarship: Dict, full_texts: Dict) -> str:
+    """取得獎學金的全文（優先使用 full_text_for_llm）"""
+    text = scholarship.get("full_text_for_llm") or full_texts.get(scholarship.get("id"))
+    if text:
+        return text
+    return f"{scholarship.get('scholarship_name', '')}\n{scholarship.get('eligibility', '')}"
+
+
+def build_tag_signature(scholarship: Dict) -> List[str]:
+    """
+    將已標準化的資格條件轉為標籤簽章
+
+    Returns:
+        List[str]: 例如 ["學院=工學院", "學制!=博士", ...]
+    """
+    tags = scholarship.get("tags", {})
+    requirements = list(tags.get("common_tags", []))
+    for group in tags.get("groups", []):
+        requirements.extend(group.get("requirements", []))
+
+    signature = []
+    for req in requirements:
+        std_val = req.get("standardized_value")
+        if not std_val:
+            continue
+        op = "!=" if is_negative_condition(req.get("tag_value", "")) else "="
+        signature.extend(f"{req.get('tag_category')}{op}{v.strip()}" for v in std_val.split(","))
+    return signature
+
+
+def build_vectors(scholarships: List[Dict], full_texts: Dict, tag_weight: float, svd_components: int):
+    """
+    建立每筆獎學金的向量（每列已 L2 正規化）
+
+    Returns:
+        scipy.sparse.csr_matrix 或 np.ndarray: N × D 的向量矩陣
+    """
+    text_vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 3), min_df=2, sublinear_tf=True)
+    text_matrix = text_vectorizer.fit_transform([build_text(s, full_texts) for s in scholarships])
+
+    tag_vectorizer = TfidfVectorizer(analyzer=lambda signature: signature)
+    tag_matrix = tag_vectorizer.fit_transform([build_tag_signature(s) for s in scholarships])
+
+    matrix = sparse.hstack([
+        normalize(text_matrix) * (1.0 - tag_weight),
+        normalize(tag_matrix) * tag_weight,
+    ]).tocsr()
+
+    if 0 < svd_components < min(matrix.shape):
+        matrix = TruncatedSVD(n_components=svd_components, random_state=0).fit_transform(matrix)
+    return normalize(matrix)
+
+
+def top_k_neighbours(vectors, k: int, block_size: int):
+    """
+    以分塊矩陣乘積計算每筆的前 k 個最相似獎學金
+
+    Args:
+        vectors: 已正規化的 N × D 向量（稀疏或密集）
+        k (int): 每筆保留的鄰居數
+        block_size (int): 每次計算的列數
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (鄰居位置 N × k, 相似度 N × k)，依相似度由高到低排列
+    """
+    n = vectors.shape[0]
+    k = min(k, n - 1)
+    neighbours = np.zeros((n, k), dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    transposed = vectors.T
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = vectors[start:stop] @ transposed
+        block = block.toarray() if sparse.issparse(block) else np.asarray(block)
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # 排除自己
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        neighbours[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+    return neighbours, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="預先計算相似獎學金推薦")
+    parser.add_argument("--input", default=MERGED_FILE, help="整合後的獎學金 JSON")
+    parser.add_argument("--full-text", default=FULL_TEXT_FILE, help="含 full_text_for_llm 的 JSON（找不到時改用名稱與申請資格）")
+    parser.add_argument("--output", default=None, help="輸出檔案（預設覆寫 --input）")
+    parser.add_argument("--top-k", type=int, default=5, help="每筆保留的相似獎學金數")
+    parser.add_argument("--min-score", type=float, default=0.1, help="相似度低於此值的鄰居不保留")
+    parser.add_argument("--tag-weight", type=float, default=0.4, help="標籤簽章在向量中的權重（0~1）")
+    parser.add_argument("--svd-components", type=int, default=100, help="LSA 維度（0 表示不降維）")
+    parser.add_argument("--block-size", type=int, default=512, help="分塊矩陣乘積每塊的列數")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        scholarships = json.load(f)
+    print(f"載入 {len(scholarships)} 筆獎學金：{args.input}")
+    if len(scholarships) < 2:
+        print("❌ 獎學金少於 2 筆，無法計算相似度")
+        sys.exit(1)
+
+    full_texts = {}
+    if os.path.exists(args.full_text):
+        with open(args.full_text, "r", encoding="utf-8") as f:
+            full_texts = {item.get("id"): item.get("full_text_for_llm") for item in json.load(f)}
+        print(f"載入全文：{args.full_text}")
+    else:
+        print(f"⚠️ 找不到全文檔案 {args.full_text}，改用名稱與申請資格")
+
+    vectors = build_vectors(scholarships, full_texts, args.tag_weight, args.svd_components)
+    print(f"向量維度：{vectors.shape[1]}")
+    neighbours, scores = top_k_neighbours(vectors, args.top_k, args.block_size)
+
+    for i, scholarship in enumerate(scholarships):
+        scholarship[OUTPUT_FIELD] = [
+            {"id": scholarships[j].get("id"), "score": round(float(score), 4)}
+            for j, score in zip(neighbours[i], scores[i])
+            if score >= args.min_score
+        ]
+
+    output = args.output or args.input
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(scholarships, f, indent=4, ensure_ascii=False)
+    with_neighbours = sum(1 for s in scholarships if s[OUTPUT_FIELD])
+    print(f"✓ 已寫入 {output}（{with_neighbours}/{len(scholarships)} 筆有相似獎學金）")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import os
 import json
 
+from validate_tags import validate_scholarships, print_report
+
 # 測試腳本：合併單筆 result_ID.json 與原始獎學金元數據
 
 # 設定路徑
@@ -110,7 +112,11 @@ def batch_merge_scholarships(limit=30):
             fail_count += 1
             print(f"❌ ID {scholarship_id} 合併失敗")
     
-    # 4. 輸出為單一 JSON 檔案
+    # 4. 驗證標籤結構：修復常見的 LLM 格式問題，無法修復的獎學金不寫入語料
+    merged_list, report = validate_scholarships(merged_list)
+    print_report(report)
+
+    # 5. 輸出為單一 JSON 檔案
     output_file = os.path.join(OUTPUT_DIR, f"scholarships_merged_{limit}.json")
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(merged_list, f, indent=4, ensure_ascii=False)
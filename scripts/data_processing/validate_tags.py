@@ -0,0 +1,236 @@
+"""
+合併後語料的標籤結構驗證與修復
+
+App 假設每筆獎學金都有格式正確的 tags.groups[].requirements[]；LLM 輸出的格式錯誤會讓後續的
+.get 串接默默回傳錯誤的結果（例如缺少的條件被當成「不限」）。本步驟在產生語料快照時執行：
+
+1. 以 TypeAdapter(List[FinalTagsStructure]) 一次驗證整份語料的 tags（pydantic-core 編譯的驗證器，
+   300 筆約數十毫秒），全部通過時不做任何修改
+2. 只有驗證失敗的獎學金才逐筆修復：
+   - 常見的 LLM 格式問題直接修正（類別/類型前後空白、類別寫成「其他」、standardized_value 為列表、
+     tag_value 缺少、數值為含千分位的字串、group_name 缺少、groups / common_tags 為 null）
+   - 修正後仍不合法的條件或組別整筆移除
+   - tags 不是物件、groups / common_tags 不是列表（也不是 null）的獎學金無法修復，從語料中剔除
+3. 輸出精簡報告：通過 / 修復 / 剔除筆數、各問題類型的次數，以及每筆修復或剔除的獎學金與問題位置
+
+結構定義沿用 tag_processor_batch.py 要求 LLM 輸出的 FinalTagsStructure（見 scripts/data_analysis/tag_schema.py）。
+
+使用方式（在專案根目錄執行；merge_tags_with_metadata.py 合併時也會自動執行）：
+    python scripts/data_processing/validate_tags.py
+    python scripts/data_processing/validate_tags.py --input data/merged/scholarships_merged_300.json --report data/merged/validation_report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+# --- Configuration ---
+SCHEMA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data_analysis"))
+MERGED_FILE = os.path.join("data", "merged", "scholarships_merged_300.json")
+REPORT_FILE = os.path.join("data", "merged", "validation_report.json")
+OTHER_CATEGORY = "其他（用於無法歸類的特殊要求）"
+# ---------------------
+
+sys.path.insert(0, SCHEMA_DIR)
+
+from tag_schema import FinalTagsStructure, ScholarshipGroup, SubTag  # noqa: E402
+
+TAGS_ADAPTER = TypeAdapter(List[FinalTagsStructure])
+
+# 問題（修正或移除）的位置與類型，例如 ("groups[0].requirements[2]", "tag_category 寫成「其他」，已修正")
+Issue = Tuple[str, str]
+
+
+def _error_summary(error: ValidationError) -> str:
+    """取第一個驗證錯誤作為簡短說明，例如「condition_type literal_error」"""
+    first = error.errors(include_url=False)[0]
+    field = ".".join(str(part) for part in first["loc"]) or "（整體）"
+    return f"{field} {first['type']}"
+
+
+def repair_requirement(req, where: str) -> Tuple[Optional[Dict], List[Issue]]:
+    """
+    修復單一條件
+
+    Args:
+        req: 原始條件（應為 SubTag 格式的字典）
+        where (str): 條件在 tags 中的位置（用於報告）
+
+    Returns:
+        Tuple[Optional[Dict], List[Issue]]: (修復後的條件，無法修復時為 None, 問題列表)
+    """
+    if not isinstance(req, dict):
+        return None, [(where, "條件不是物件，已移除")]
+
+    fixed = dict(req)
+    issues = []
+    for field in ("tag_category", "condition_type"):
+        value = fixed.get(field)
+        if isinstance(value, str) and value != value.strip():
+            fixed[field] = value.strip()
+            issues.append((where, f"{field} 有多餘空白，已修正"))
+    if fixed.get("tag_category") == "其他":
+        fixed["tag_category"] = OTHER_CATEGORY
+        issues.append((where, "tag_category 寫成「其他」，已修正"))
+    if isinstance(fixed.get("standardized_value"), list):
+        fixed["standardized_value"] = ", ".join(str(v) for v in fixed["standardized_value"])
+        issues.append((where, "standardized_value 為列表，已合併為字串"))
+    if not isinstance(fixed.get("tag_value"), str):
+        fixed["tag_value"] = fixed.get("standardized_value") or ""
+        issues.append((where, "缺少 tag_value，已以 standardized_value 補上"))
+
+    numerical = fixed.get("numerical")
+    if isinstance(numerical, dict) and isinstance(numerical.get("num_value"), str):
+        try:
+            fixed["numerical"] = {**numerical, "num_value": float(numerical["num_value"].replace(",", ""))}
+            issues.append((where, "num_value 為字串，已轉為數字"))
+        except ValueError:
+            fixed["numerical"] = None
+            issues.append((where, "num_value 無法解析，已移除數值資料"))
+
+    try:
+        return SubTag.model_validate(fixed).model_dump(exclude_unset=True), issues
+    except ValidationError as e:
+        return None, issues + [(where, f"{_error_summary(e)}，已移除")]
+
+
+def repair_tags(tags) -> Tuple[Optional[Dict], List[Issue]]:
+    """
+    修復一筆獎學金的 tags
+
+    Returns:
+        Tuple[Optional[Dict], List[Issue]]: (修復後的 tags，無法修復時為 None, 問題列表)
+    """
+    if not isinstance(tags, dict):
+        return None, [("tags", "tags 不是物件，無法修復")]
+    issues = []
+    # LLM 輸出 null 時視為沒有條件（與 app 顯示為不限相同），改為空列表
+    for field in ("groups", "common_tags"):
+        if field in tags and tags[field] is None:
+            issues.append((field, f"{field} 為 null，已改為空列表"))
+    groups = tags.get("groups") or []
+    common_tags = tags.get("common_tags") or []
+    if not isinstance(groups, list) or not isinstance(common_tags, list):
+        return None, issues + [("tags", "groups 或 common_tags 不是列表，無法修復")]
+
+    fixed_common = []
+    for i, req in enumerate(common_tags):
+        fixed, req_issues = repair_requirement(req, f"common_tags[{i}]")
+        issues.extend(req_issues)
+        if fixed is not None:
+            fixed_common.append(fixed)
+
+    fixed_groups = []
+    for g, group in enumerate(groups):
+        where = f"groups[{g}]"
+        if not isinstance(group, dict) or not isinstance(group.get("requirements", []), list):
+            issues.append((where, "組別格式錯誤，已移除"))
+            continue
+        group_name = group.get("group_name")
+        if not isinstance(group_name, str) or not group_name:
+            group_name = "未命名組別"
+            issues.append((where, "缺少 group_name，已補上"))
+        requirements = []
+        for i, req in enumerate(group.get("requirements", [])):
+            fixed, req_issues = repair_requirement(req, f"{where}.requirements[{i}]")
+            issues.extend(req_issues)
+            if fixed is not None:
+                requirements.append(fixed)
+        try:
+            fixed_groups.append(ScholarshipGroup.model_validate({**group, "group_name": group_name, "requirements": requirements}).model_dump(exclude_unset=True))
+        except ValidationError as e:
+            issues.append((where, f"{_error_summary(e)}，已移除"))
+
+    return {**tags, "groups": fixed_groups, "common_tags": fixed_common}, issues
+
+
+def validate_scholarships(scholarships: List[Dict]) -> Tuple[List[Dict], Dict]:
+    """
+    驗證整份語料的 tags，修復或剔除不合法的獎學金
+
+    Args:
+        scholarships (List[Dict]): 合併後的獎學金列表（不會被修改）
+
+    Returns:
+        Tuple[List[Dict], Dict]: (驗證後的語料, 報告)
+
+    Note:
+        全部通過時只呼叫一次批次驗證，直接回傳原本的列表
+    """
+    tags_list = [s.get("tags") for s in scholarships]
+    invalid = set()
+    try:
+        TAGS_ADAPTER.validate_python(tags_list)
+    except ValidationError as e:
+        invalid = {error["loc"][0] for error in e.errors(include_url=False)}
+
+    report = {"total": len(scholarships), "valid": len(scholarships) - len(invalid), "repaired": 0, "rejected": 0, "issue_counts": {}, "records": []}
+    if not invalid:
+        return scholarships, report
+
+    issue_counts = Counter()
+    validated = []
+    for i, scholarship in enumerate(scholarships):
+        if i not in invalid:
+            validated.append(scholarship)
+            continue
+        fixed, issues = repair_tags(scholarship.get("tags"))
+        status = "rejected" if fixed is None else "repaired"
+        report[status] += 1
+        issue_counts.update(kind for _, kind in issues)
+        report["records"].append({
+            "id": scholarship.get("id"),
+            "name": scholarship.get("scholarship_name"),
+            "status": status,
+            "issues": [f"{where}：{kind}" for where, kind in issues],
+        })
+        if fixed is not None:
+            validated.append({**scholarship, "tags": fixed})
+    report["issue_counts"] = dict(issue_counts.most_common())
+    return validated, report
+
+
+def print_report(report: Dict):
+    """在終端機印出精簡報告"""
+    print(f"✓ 通過 {report['valid']} 筆｜修復 {report['repaired']} 筆｜剔除 {report['rejected']} 筆（共 {report['total']} 筆）")
+    for kind, count in report["issue_counts"].items():
+        print(f"  - {kind}：{count} 次")
+    for record in report["records"]:
+        mark = "🔧" if record["status"] == "repaired" else "❌"
+        print(f"{mark} ID {record['id']} {record['name'] or ''}（{len(record['issues'])} 個問題）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="驗證合併後語料的標籤結構，修復或剔除不合法的獎學金")
+    parser.add_argument("--input", default=MERGED_FILE, help="合併後的獎學金 JSON")
+    parser.add_argument("--output", default=None, help="輸出檔案（預設覆寫 --input，且只在有修復或剔除時寫入）")
+    parser.add_argument("--report", default=REPORT_FILE, help="驗證報告 JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ 找不到檔案：{args.input}")
+        sys.exit(1)
+    with open(args.input, "r", encoding="utf-8") as f:
+        scholarships = json.load(f)
+
+    validated, report = validate_scholarships(scholarships)
+    print_report(report)
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"報告：{args.report}")
+
+    if args.output or report["repaired"] or report["rejected"]:
+        output = args.output or args.input
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(validated, f, indent=4, ensure_ascii=False)
+        print(f"✓ 已寫入 {output}（{len(validated)} 筆）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+學業成績門檻必須與類別條件由同一個 group 符合
+
+獎學金有兩個 group：碩士（GPA ≥ 4.0）與大學（無門檻）。
+GPA 3.0 的碩士生不符合任何 group，所有引擎都不應顯示這筆獎學金。
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from filters import check_scholarship_match  # noqa: E402
+from matrix_engine import MatrixFilterEngine  # noqa: E402
+from profiles import ProfileIndex  # noqa: E402
+from rejection_funnel import ACADEMIC_STAGE, build_rejection_funnel  # noqa: E402
+from selectivity import SelectivityStats  # noqa: E402
+from sql_engine import SqliteFilterEngine  # noqa: E402
+
+
+def _requirement(category, value, numerical=None):
+    return {"tag_category": category, "condition_type": "資格", "tag_value": value,
+            "standardized_value": value, "numerical": numerical}
+
+
+SCHOLARSHIPS = [{
+    "id": 1,
+    "scholarship_name": "兩個 group 的獎學金",
+    "tags": {
+        "common_tags": [],
+        "groups": [
+            {"group_name": "A", "requirements": [
+                _requirement("學制", "碩士"),
+                _requirement("核心學業要求", "GPA 4.0 以上", {"academic_metric": "GPA", "num_value": 4.0, "unit": "分"}),
+            ]},
+            {"group_name": "B", "requirements": [_requirement("學制", "大學")]},
+        ],
+    },
+}]
+
+
+def _filters(level, gpa):
+    # 與 sidebar 相同的形式：未填寫的成績為 None
+    return {"學制": [level], "學業成績": {"GPA": gpa, "百分制": None, "排名": None}}
+
+
+def _engines():
+    sql_engine = SqliteFilterEngine.from_scholarships(SCHOLARSHIPS)
+    matrix_engine = MatrixFilterEngine(SCHOLARSHIPS)
+    stats = SelectivityStats.from_corpus(SCHOLARSHIPS)
+    return {
+        "python": lambda f: [i for i, s in enumerate(SCHOLARSHIPS) if check_scholarship_match(s, f)],
+        "planned": lambda f: [i for i, s in enumerate(SCHOLARSHIPS) if check_scholarship_match(s, f, stats.plan(f))],
+        "sqlite": sql_engine.filter_indices,
+        "matrix": matrix_engine.filter_indices,
+        "profiles": lambda f: [0] if ProfileIndex({1: f}).match(SCHOLARSHIPS) else [],
+    }
+
+
+@pytest.mark.parametrize("level, gpa, expected", [
+    ("碩士", 3.0, []),   # 碩士 group 未達門檻，大學 group 學制不符
+    ("碩士", 4.0, [0]),
+    ("大學", 3.0, [0]),  # 大學 group 沒有門檻
+    ("碩士", None, [0]),
+])
+def test_academic_threshold_is_checked_per_group(level, gpa, expected):
+    filters = _filters(level, gpa)
+    for name, engine in _engines().items():
+        assert engine(filters) == expected, name
+
+
+def test_rejection_funnel_attributes_academic_stage():
+    funnel = build_rejection_funnel(SCHOLARSHIPS, _filters("碩士", 3.0))
+    assert funnel.rejected == {ACADEMIC_STAGE: 1}